@@ -0,0 +1,42 @@
+# This program generates team and product reports for every job listed in a manifest file.
+# The team map and product master are read once and shared by every job, and the jobs are run in a pool of
+# worker processes. The status and timing of each job are printed at the end. See README for more information.
+
+import time
+from argparse import Namespace
+from utils import batch, parser, file_IO
+from utils.models import BatchJob, JobResult, Product
+
+
+def main() -> None:
+    """
+        Main function for generating the reports of every job in a manifest file
+        using files specified by command line arguments
+    """
+
+    # Parse command line arguments
+    cl_args: Namespace = parser.parse_batch_input()
+
+    if cl_args.top is not None and cl_args.top < 1:
+        print("Error: --top must be at least 1.\n")
+        exit()
+
+    start: float = time.perf_counter()
+
+    # Read shared input files and manifest
+    team_map: dict[int, str] = file_IO.read_team_map(cl_args.team_map_fn, cl_args.use_cache)
+    prod_master: dict[int, Product] = file_IO.read_prod_master(cl_args.prod_master_fn, cl_args.use_cache)
+    jobs: list[BatchJob] = file_IO.read_manifest(cl_args.manifest_fn)
+
+    # Run jobs
+    results: list[JobResult] = batch.run_batch(team_map=team_map,
+                                               prod_master=prod_master,
+                                               jobs=jobs,
+                                               workers=cl_args.workers,
+                                               top=cl_args.top)
+
+    print(batch.format_results(results, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+from .generate_data import generate_prod_master, generate_sales, generate_team_map
@@ -0,0 +1,87 @@
+# Defines functions for generating synthetic team map, product master, and sales csv files for benchmarks.
+# Products and teams are drawn with a Zipf-like skew, so a few products and teams account for most sales.
+
+import csv
+import random
+from itertools import accumulate
+
+# Number of sales generated at a time
+SALES_BLOCK_SIZE: int = 10_000
+
+
+def get_cum_weights(count: int, skew: float) -> list[float]:
+    """
+        Gets cumulative Zipf-like weights for drawing ids, where id k has weight 1 / k ** skew
+
+        :param count: number of ids (int)
+        :param skew: skew of the weights, 0 for uniform (float)
+
+        :returns: list of cumulative weights (float)
+    """
+
+    return list(accumulate(1 / k ** skew for k in range(1, count + 1)))
+
+
+def generate_team_map(file_path: str, teams: int) -> None:
+    """
+        Writes a team map file with a header
+
+        :param file_path: path of the file to write (str)
+        :param teams: number of teams (int)
+    """
+
+    with open(file_path, 'w', newline='', encoding="utf-8") as outfile:
+        file_writer = csv.writer(outfile)
+        file_writer.writerow(("TeamId", "Name"))
+        file_writer.writerows((team_id, f"Team {team_id}") for team_id in range(1, teams + 1))
+
+
+def generate_prod_master(file_path: str, products: int, seed: int = 0) -> None:
+    """
+        Writes a product master file
+
+        :param file_path: path of the file to write (str)
+        :param products: number of products (int)
+        :param seed: seed for the random prices and lot sizes (int)
+    """
+
+    rng = random.Random(seed)
+
+    with open(file_path, 'w', newline='', encoding="utf-8") as outfile:
+        csv.writer(outfile).writerows(
+            (prod_id, f"Product {prod_id}", f"{rng.randint(1, 100_000) / 100:.2f}", rng.choice((1, 10, 25, 100)))
+            for prod_id in range(1, products + 1)
+        )
+
+
+def generate_sales(file_path: str, rows: int, products: int, teams: int, skew: float = 1.0, seed: int = 0) -> None:
+    """
+        Writes a sales file
+
+        :param file_path: path of the file to write (str)
+        :param rows: number of sales (int)
+        :param products: number of products to draw from (int)
+        :param teams: number of teams to draw from (int)
+        :param skew: skew of the product and team draws, 0 for uniform (float)
+        :param seed: seed for the random sales (int)
+    """
+
+    rng = random.Random(seed)
+    prod_ids: range = range(1, products + 1)
+    team_ids: range = range(1, teams + 1)
+    prod_weights: list[float] = get_cum_weights(products, skew)
+    team_weights: list[float] = get_cum_weights(teams, skew)
+
+    with open(file_path, 'w', newline='', encoding="utf-8") as outfile:
+        file_writer = csv.writer(outfile)
+
+        for block_start in range(0, rows, SALES_BLOCK_SIZE):
+            block_size: int = min(SALES_BLOCK_SIZE, rows - block_start)
+
+            file_writer.writerows(zip(
+                range(block_start + 1, block_start + block_size + 1),
+                rng.choices(prod_ids, cum_weights=prod_weights, k=block_size),
+                rng.choices(team_ids, cum_weights=team_weights, k=block_size),
+                (rng.randint(1, 100) for _ in range(block_size)),
+                (rng.choice((0, 0, 0, 5, 10, 12.5, 25)) for _ in range(block_size))
+            ))
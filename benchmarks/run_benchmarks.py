@@ -0,0 +1,281 @@
+# Benchmarks each stage of the report pipeline on synthetic data.
+# Each stage is timed separately, and its throughput and peak memory are reported.
+# Results are saved as JSON so they can be compared across commits.
+#
+# Run from the repository folder with:
+#     python -m benchmarks.run_benchmarks --rows 1000000 --output bench_results.json
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any
+from benchmarks.generate_data import generate_prod_master, generate_sales, generate_team_map
+from utils import file_IO, sales_calc
+from utils.models import ProductSaleData
+from utils.file_IO.config import CACHE_FOLDER, DESTINATION_FOLDER, SOURCE_FOLDER
+
+# Names of the generated input files and the written output files
+TEAM_MAP_FILE: str = "BenchTeamMap.csv"
+PROD_MASTER_FILE: str = "BenchProductMaster.csv"
+SALES_FILE: str = "BenchSales.csv"
+TEAM_RPT_FILE: str = "BenchTeamReport.csv"
+PROD_RPT_FILE: str = "BenchProductReport.csv"
+
+
+def parse_bench_input() -> argparse.Namespace:
+    """
+        Parses user arguments in command line for the benchmark
+
+        :returns: Namespace of command line args
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmarks each stage of the report pipeline on synthetic data.")
+
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of sales to generate")
+    parser.add_argument("--products", type=int, default=1_000, help="Number of products to generate")
+    parser.add_argument("--teams", type=int, default=50, help="Number of teams to generate")
+    parser.add_argument("--skew", type=float, default=1.0,
+                        help="Zipf-like skew of the product and team ids in the sales, 0 for uniform")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated data")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of times to run each stage, the best is kept")
+    parser.add_argument("--output", type=str, default=None, help="Path of the JSON results file to write")
+
+    return parser.parse_args()
+
+
+def run_stage(name: str, rows: int, repeat: int, func: Callable[[], Any]) -> tuple[dict, Any]:
+    """
+        Times a stage of the pipeline, then runs it again to measure its peak memory
+
+        :param name: name of the stage (str)
+        :param rows: number of rows the stage processes (int)
+        :param repeat: number of timed runs, the fastest is kept (int)
+        :param func: function that runs the stage
+
+        :returns: tuple of stage results (dict) and the return value of the stage
+    """
+
+    wall_times: list[float] = []
+    cpu_times: list[float] = []
+
+    # Console messages from the readers and writers are hidden
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            wall_start: float = time.perf_counter()
+            cpu_start: float = time.process_time()
+            result: Any = func()
+            cpu_times.append(time.process_time() - cpu_start)
+            wall_times.append(time.perf_counter() - wall_start)
+
+        # Memory is measured in a separate run, since tracing slows the stage down
+        tracemalloc.start()
+        func()
+        peak_memory: int = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    wall_time: float = min(wall_times)
+
+    stage: dict = {
+        "stage": name,
+        "rows": rows,
+        "wall_s": wall_time,
+        "cpu_s": min(cpu_times),
+        "rows_per_s": rows / wall_time if wall_time else None,
+        "peak_memory_bytes": peak_memory
+    }
+
+    print(f"{name:<28} {wall_time:>9.3f} s {stage['rows_per_s'] or 0:>14,.0f} rows/s "
+          f"{peak_memory / 2 ** 20:>9.1f} MiB")
+
+    return stage, result
+
+
+def get_commit() -> str | None:
+    """
+        Gets the current git commit of the repository
+
+        :returns: commit hash (str), or None if it cannot be found
+    """
+
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"],
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              capture_output=True, text=True, check=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(cl_args: argparse.Namespace) -> dict:
+    """
+        Generates synthetic input files and benchmarks each stage of the pipeline on them
+
+        :param cl_args: Namespace of command line args
+
+        :returns: benchmark results (dict)
+    """
+
+    stages: list[dict] = []
+    repeat: int = cl_args.repeat
+
+    print(f"{'Stage':<28} {'Wall time':>11} {'Throughput':>21} {'Peak memory':>13}")
+
+    def add_stage(name: str, rows: int, func: Callable[[], Any]) -> Any:
+        stage, result = run_stage(name, rows, repeat, func)
+        stages.append(stage)
+        return result
+
+    # The readers and writers use paths relative to the working folder, so a temporary folder is used
+    with tempfile.TemporaryDirectory() as work_dir:
+        cwd: str = os.getcwd()
+        os.chdir(work_dir)
+
+        try:
+            os.makedirs(SOURCE_FOLDER, exist_ok=True)
+            os.makedirs(DESTINATION_FOLDER, exist_ok=True)
+
+            generate_team_map(f"{SOURCE_FOLDER}\\{TEAM_MAP_FILE}", cl_args.teams)
+            generate_prod_master(f"{SOURCE_FOLDER}\\{PROD_MASTER_FILE}", cl_args.products, cl_args.seed)
+            generate_sales(f"{SOURCE_FOLDER}\\{SALES_FILE}", cl_args.rows, cl_args.products, cl_args.teams,
+                           cl_args.skew, cl_args.seed)
+
+            team_map = add_stage("read_team_map", cl_args.teams,
+                                 lambda: file_IO.read_team_map(TEAM_MAP_FILE))
+            prod_master = add_stage("read_prod_master", cl_args.products,
+                                    lambda: file_IO.read_prod_master(PROD_MASTER_FILE))
+            add_stage("fast_read_prod_master", cl_args.products,
+                      lambda: file_IO.fast_read_prod_master(PROD_MASTER_FILE))
+            sales_data = add_stage("read_sales", cl_args.rows,
+                                   lambda: file_IO.read_sales(SALES_FILE))
+            sales_table = add_stage("fast_read_sales", cl_args.rows,
+                                    lambda: file_IO.fast_read_sales(SALES_FILE))
+            add_stage("mmap_read_sales", cl_args.rows,
+                      lambda: file_IO.mmap_read_sales(SALES_FILE))
+            add_stage("mmap_read_sales (workers)", cl_args.rows,
+                      lambda: file_IO.mmap_read_sales(SALES_FILE, workers=os.cpu_count() or 1))
+
+            add_stage("validate_sales", cl_args.rows,
+                      lambda: sales_calc.validate_sales([sales_data], team_map=team_map, prod_master=prod_master))
+            add_stage("validate_sales (table)", cl_args.rows,
+                      lambda: sales_calc.validate_sales([sales_table], team_map=team_map, prod_master=prod_master))
+
+            team_rpt, prod_rpt = add_stage("calc_sales_rpt", cl_args.rows,
+                                           lambda: sales_calc.calc_sales_rpt(team_map=team_map,
+                                                                             prod_master=prod_master,
+                                                                             sales_data=sales_data))
+            add_stage("calc_sales_rpt_fixed", cl_args.rows,
+                      lambda: sales_calc.calc_sales_rpt_fixed(team_map=team_map,
+                                                              prod_master=prod_master,
+                                                              sales_data=sales_data))
+            add_stage("calc_sales_rpt_columnar", cl_args.rows,
+                      lambda: sales_calc.calc_sales_rpt_columnar(team_map=team_map,
+                                                                 prod_master=prod_master,
+                                                                 sales_data=sales_table))
+
+            # The product master is imported into the database once, and then only the products the sales refer to
+            # are looked up on each run
+            os.makedirs(CACHE_FOLDER, exist_ok=True)
+            db_path: str = file_IO.db_read_prod_master(file_name=PROD_MASTER_FILE).db_path
+
+            def calc_sales_rpt_db() -> tuple:
+                db_prod_master = file_IO.DbProductMaster(db_path)
+                db_prod_master.prefetch(sales_table.prod_ids)
+
+                return sales_calc.calc_sales_rpt(team_map=team_map, prod_master=db_prod_master, sales_data=sales_data)
+
+            add_stage("calc_sales_rpt (sqlite)", cl_args.rows, calc_sales_rpt_db)
+
+            # The lazy product master is indexed, then only the products the sales refer to are read
+            add_stage("lazy_read_prod_master", cl_args.products,
+                      lambda: file_IO.lazy_read_prod_master(PROD_MASTER_FILE))
+
+            def calc_sales_rpt_lazy() -> tuple:
+                lazy_prod_master = file_IO.lazy_read_prod_master(PROD_MASTER_FILE)
+
+                try:
+                    return sales_calc.calc_sales_rpt(team_map=team_map,
+                                                     prod_master=lazy_prod_master,
+                                                     sales_data=sales_data)
+
+                finally:
+                    lazy_prod_master.close()
+
+            add_stage("lazy_read + calc_sales_rpt", cl_args.rows, calc_sales_rpt_lazy)
+            add_stage("stream_sales + calc_sales_rpt", cl_args.rows,
+                      lambda: sales_calc.calc_sales_rpt(team_map=team_map,
+                                                        prod_master=prod_master,
+                                                        sales_data=chain.from_iterable(
+                                                            file_IO.stream_sales(SALES_FILE))))
+
+            # The approximate mode reads the sales itself, so it is compared with the stream stages above
+            add_stage("stream_sales + approx", cl_args.rows,
+                      lambda: sales_calc.calc_sales_rpt_approx(team_map=team_map,
+                                                               prod_master=prod_master,
+                                                               sales_batches=file_IO.stream_sales(SALES_FILE),
+                                                               seed=0))
+            add_stage("fast_stream_sales + approx", cl_args.rows,
+                      lambda: sales_calc.calc_sales_rpt_approx(team_map=team_map,
+                                                               prod_master=prod_master,
+                                                               sales_batches=file_IO.fast_stream_sales(SALES_FILE),
+                                                               seed=0))
+
+            add_stage("write_team_rpt", len(team_rpt), lambda: file_IO.write_team_rpt(TEAM_RPT_FILE, team_rpt))
+            add_stage("write_prod_rpt", len(prod_rpt), lambda: file_IO.write_prod_rpt(PROD_RPT_FILE, prod_rpt))
+
+            # A product report with one row per sale, to time writing large reports
+            large_prod_rpt: dict[str, ProductSaleData] = {
+                f"Sale {index}": ProductSaleData(gross_rev=sale.lots_sold * prod_master[sale.prod_id].unit_price,
+                                                 units_sold=sale.lots_sold,
+                                                 disc_cost=sale.discount)
+                for index, sale in enumerate(sales_data)
+            }
+
+            add_stage("write_prod_rpt (large)", len(large_prod_rpt),
+                      lambda: file_IO.write_prod_rpt(PROD_RPT_FILE, large_prod_rpt))
+
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": get_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": {
+            "rows": cl_args.rows,
+            "products": cl_args.products,
+            "teams": cl_args.teams,
+            "skew": cl_args.skew,
+            "seed": cl_args.seed,
+            "repeat": cl_args.repeat
+        },
+        "stages": stages
+    }
+
+
+def main() -> None:
+    """Main function for running the benchmarks using settings specified by command line arguments"""
+
+    cl_args: argparse.Namespace = parse_bench_input()
+    results: dict = run_benchmarks(cl_args)
+
+    if cl_args.output is not None:
+        with open(cl_args.output, 'w', encoding="utf-8") as outfile:
+            json.dump(results, outfile, indent=2)
+
+        print(f"\nResults written at {cl_args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,176 @@
 # command line arguments. See README for more information.
 
 from decimal import Decimal  # Decimal is used to avoid rounding errors
-from utils import parser, sales_calc, file_IO
-from utils.models import Product, ProductSaleData, Sale
+from itertools import chain
+from utils import parser, pipeline, profiling, sales_calc, file_IO
+from utils.models import ApproxReport, Product, ProductSaleData, Sale, SalesCube, SalesTable, ValidationReport
 from argparse import Namespace
+from collections.abc import Callable, Iterable, Iterator, Mapping
+
+
+def stream_sales_batches(cl_args: Namespace) -> Iterator[list[Sale] | SalesTable]:
+    """
+        Streams the sales file in batches with the reader specified by command line arguments
+
+        :param cl_args: Namespace of command line args
+
+        :returns: iterator of batches of sales (Sale), or of tables of sales (SalesTable)
+    """
+
+    # Sales are streamed in batches so the sales file never has to fit in memory
+    if cl_args.reader == "fast":
+        sales_batches: Iterator[list[Sale] | SalesTable] = file_IO.fast_stream_sales(cl_args.sales_fn)
+    elif cl_args.reader == "mmap":
+        sales_batches: Iterator[list[Sale] | SalesTable] = file_IO.mmap_stream_sales(cl_args.sales_fn)
+    else:
+        sales_batches: Iterator[list[Sale] | SalesTable] = file_IO.stream_sales(cl_args.sales_fn,
+                                                                                use_cache=cl_args.use_cache)
+
+    if cl_args.pipeline:
+        # The next batches are read in a background thread while the current batch is aggregated
+        sales_batches = pipeline.prefetch(sales_batches)
+
+    return sales_batches
+
+
+def stream_sales_data(cl_args: Namespace) -> Iterator[Sale]:
+    """
+        Streams the sales file with the reader specified by command line arguments
+
+        :param cl_args: Namespace of command line args
+
+        :returns: iterator of sales (Sale)
+    """
+
+    return chain.from_iterable(stream_sales_batches(cl_args))
+
+
+def streams_sales(cl_args: Namespace) -> bool:
+    """
+        Checks if the sales file is streamed into the calculation, rather than read by the calculation mode itself
+
+        :param cl_args: Namespace of command line args
+
+        :returns: bool
+    """
+
+    return not (cl_args.start_date is not None or cl_args.end_date is not None
+                or cl_args.incremental or cl_args.workers > 1)
+
+
+def read_team_map(cl_args: Namespace) -> Mapping[int, str]:
+    """
+        Reads the team map file specified by command line arguments
+
+        :param cl_args: Namespace of command line args
+
+        :returns: mapping with key = team id (int), value = team name (str)
+    """
+
+    if cl_args.db_fn is not None:
+        return file_IO.db_read_team_map(cl_args.db_fn, cl_args.team_map_fn)
+
+    return file_IO.read_team_map(cl_args.team_map_fn, cl_args.use_cache)
+
+
+def read_prod_master(cl_args: Namespace) -> Mapping[int, Product]:
+    """
+        Reads the product master file with the reader specified by command line arguments
+
+        :param cl_args: Namespace of command line args
+
+        :returns: mapping with key = product id (int), value = Product
+    """
+
+    if cl_args.db_fn is not None:
+        return file_IO.db_read_prod_master(cl_args.db_fn, cl_args.prod_master_fn)
+
+    if cl_args.lazy_prod_master:
+        return file_IO.lazy_read_prod_master(cl_args.prod_master_fn)
+
+    if cl_args.reader in ("fast", "mmap"):
+        return file_IO.fast_read_prod_master(cl_args.prod_master_fn)
+
+    return file_IO.read_prod_master(cl_args.prod_master_fn, cl_args.use_cache)
+
+
+def prefetch_db_ids(sales_batches: Iterator[list[Sale] | SalesTable],
+                    team_map: file_IO.DbTeamMap,
+                    prod_master: file_IO.DbProductMaster
+                    ) -> Iterator[list[Sale] | SalesTable]:
+    """
+        Passes through batches of sales, first looking up the team ids and product ids of each batch
+        in the database with a few queries, instead of one query for each id
+
+        :param sales_batches: iterator of batches of sales (Sale), or of tables of sales (SalesTable)
+        :param team_map: team map in the database (DbTeamMap)
+        :param prod_master: product master in the database (DbProductMaster)
+
+        :returns: iterator of batches of sales (Sale), or of tables of sales (SalesTable)
+    """
+
+    for batch in sales_batches:
+        prod_ids, team_ids = sales_calc.get_batch_ids(batch)
+
+        prod_master.prefetch(prod_ids)
+        team_map.prefetch(team_ids)
+
+        yield batch
+
+
+def calc_reports(cl_args: Namespace,
+                 team_map: Mapping[int, str],
+                 prod_master: Mapping[int, Product],
+                 sales_data: Iterable[Sale] | None = None
+                 ) -> tuple[dict[str, Decimal], dict[str, ProductSaleData]]:
+    """
+        Calculates the team and product reports using the mode specified by command line arguments
+
+        :param cl_args: Namespace of command line args
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_data: optional sales already being streamed, used if the sales file is streamed
+            (Iterable[Sale] or None)
+
+        :returns: tuple of team report and product report
+    """
+
+    calc_func = {"columnar": sales_calc.calc_sales_rpt_columnar,
+                 "fixed": sales_calc.calc_sales_rpt_fixed}.get(cl_args.engine, sales_calc.calc_sales_rpt)
+
+    if cl_args.start_date is not None or cl_args.end_date is not None:
+        # Reports for the date range are merged from the saved reports of each day
+        return sales_calc.calc_sales_rpt_period(
+            team_map=team_map,
+            prod_master=prod_master,
+            sales_fn=file_IO.get_sales_file_name(cl_args.sales_fn),
+            start_date=cl_args.start_date,
+            end_date=cl_args.end_date,
+            hide_exc=True)
+
+    if cl_args.incremental:
+        # Only sales appended since the last run are read and added to the saved reports
+        return sales_calc.calc_sales_rpt_incremental(
+            team_map=team_map,
+            prod_master=prod_master,
+            sales_fn=file_IO.get_sales_file_name(cl_args.sales_fn),
+            hide_exc=True)
+
+    if cl_args.workers > 1:
+        # Sales file is split into line-aligned shards that are calculated in a process pool
+        return sales_calc.calc_sales_rpt_parallel(
+            team_map=team_map,
+            prod_master=prod_master,
+            sales_fn=file_IO.get_sales_file_name(cl_args.sales_fn),
+            workers=cl_args.workers,
+            hide_exc=True,
+            calc_func=calc_func,
+            reader=cl_args.reader)
+
+    return calc_func(team_map=team_map,
+                     sales_data=sales_data if sales_data is not None else stream_sales_data(cl_args),
+                     prod_master=prod_master,
+                     hide_exc=True)
 
 
 def main() -> None:
@@ -19,23 +186,220 @@ def main() -> None:
     # Parse command line arguments
     cl_args: Namespace = parser.parse_input()
 
+    if ((cl_args.start_date is not None or cl_args.end_date is not None)
+            and (cl_args.workers > 1 or cl_args.engine != "decimal" or cl_args.reader != "csv" or cl_args.incremental)):
+        print("Error: --start-date and --end-date cannot be used with --workers, --engine, --reader, "
+              "or --incremental.\n")
+        exit()
+
+    if cl_args.cube_report_fn is not None and (not streams_sales(cl_args) or cl_args.engine != "decimal"):
+        print("Error: --cube-report cannot be used with --start-date, --end-date, --incremental, --workers, "
+              "or --engine.\n")
+        exit()
+
+    if cl_args.on_invalid in ("skip", "quarantine") and not streams_sales(cl_args):
+        print(f"Error: --on-invalid={cl_args.on_invalid} cannot be used with --start-date, --end-date, "
+              f"--incremental, or --workers.\n")
+        exit()
+
+    if cl_args.incremental and (cl_args.engine != "decimal" or cl_args.workers > 1 or cl_args.reader != "csv"):
+        print("Error: --incremental cannot be used with --engine, --workers, or --reader.\n")
+        exit()
+
+    if cl_args.workers > 1 and cl_args.reader == "fast":
+        print("Error: --workers cannot be used with --reader=fast. Use --reader=mmap to parse each range of the "
+              "sales file column by column.\n")
+        exit()
+
+    if cl_args.lazy_prod_master and cl_args.db_fn is not None:
+        print("Error: --lazy-product-master cannot be used with --db.\n")
+        exit()
+
+    if cl_args.db_reports and cl_args.db_fn is None:
+        print("Error: --db-reports requires --db.\n")
+        exit()
+
+    if cl_args.approx and (not streams_sales(cl_args) or cl_args.cube_report_fn is not None or cl_args.db_reports):
+        print("Error: --approx cannot be used with --start-date, --end-date, --incremental, --workers, "
+              "--cube-report, or --db-reports.\n")
+        exit()
+
+    if cl_args.top is not None and cl_args.top < 1:
+        print("Error: --top must be at least 1.\n")
+        exit()
+
+    if cl_args.approx and cl_args.sample_size < 2:
+        print("Error: --sample-size must be at least 2.\n")
+        exit()
+
+    # Writing the profile as JSON or tracing memory implies profiling
+    profiler: profiling.Profiler | None = (profiling.start_profiling(cl_args.profile_memory)
+                                           if cl_args.profile or cl_args.profile_json_fn is not None
+                                           or cl_args.profile_memory else None)
+
     # Read input files
-    team_map: dict[int, str] = file_IO.read_team_map(cl_args.team_map_fn)
-    prod_master: dict[int, Product] = file_IO.read_prod_master(cl_args.prod_master_fn)
-    sales_data: tuple[Sale] = file_IO.read_sales(cl_args.sales_fn)
+    sales_batches: Iterator[list[Sale] | SalesTable] | None = None
+
+    if cl_args.pipeline:
+        with profiling.profile_stage("read team map + product master"):
+            # The sales file starts streaming in the background while both reference files are read at once
+            if streams_sales(cl_args):
+                sales_batches = stream_sales_batches(cl_args)
+
+            team_map, prod_master = pipeline.run_concurrently(lambda: read_team_map(cl_args),
+                                                              lambda: read_prod_master(cl_args))
+
+    else:
+        with profiling.profile_stage("read team map"):
+            team_map: Mapping[int, str] = read_team_map(cl_args)
+
+        with profiling.profile_stage("read product master"):
+            prod_master: Mapping[int, Product] = read_prod_master(cl_args)
+
+    if cl_args.db_fn is not None and streams_sales(cl_args):
+        # Only the teams and products the sales refer to are looked up, a batch of sales at a time
+        sales_batches = prefetch_db_ids(sales_batches if sales_batches is not None else stream_sales_batches(cl_args),
+                                        team_map, prod_master)
+
+    # Check the team and product ids of the sales
+    validation: ValidationReport | None = None
+    # Quarantined sales are written as they are found, so they are never all held in memory
+    quarantine: file_IO.QuarantineWriter | None = (file_IO.QuarantineWriter(cl_args.quarantine_fn)
+                                                   if cl_args.on_invalid == "quarantine" else None)
 
-    # Calculate report data
+    if cl_args.on_invalid == "fail":
+        with profiling.profile_stage("validate sales"):
+            # Every sale is checked before any are aggregated, so all invalid sales are reported at once
+            validation_batches: Iterator[list[Sale] | SalesTable] = stream_sales_batches(cl_args)
+
+            if cl_args.db_fn is not None:
+                validation_batches = prefetch_db_ids(validation_batches, team_map, prod_master)
+
+            validation = sales_calc.validate_sales(validation_batches,
+                                                   team_map=team_map,
+                                                   prod_master=prod_master)
+
+        if validation.invalid_rows:
+            print(f"Error: {sales_calc.format_validation_report(validation)}\n")
+            exit()
+
+    elif cl_args.on_invalid is not None:
+        # Invalid sales are removed from each batch before it is aggregated
+        validation = ValidationReport()
+        sales_batches = sales_calc.filter_invalid_sales(sales_batches if sales_batches is not None
+                                                        else stream_sales_batches(cl_args),
+                                                        validation,
+                                                        team_map=team_map,
+                                                        prod_master=prod_master,
+                                                        quarantine=None if quarantine is None
+                                                        else quarantine.write_rows)
+
+    sales_data: Iterable[Sale] | None = chain.from_iterable(sales_batches) if sales_batches is not None else None
+
+    # Calculate report data. Streamed sales are read during this stage.
     team_report: dict[str, Decimal]
     prod_report: dict[str, ProductSaleData]
 
-    team_report, prod_report = sales_calc.calc_sales_rpt(team_map=team_map,
-                                                         sales_data=sales_data,
-                                                         prod_master=prod_master,
-                                                         hide_exc=True)
+    cube: SalesCube | None = None
+    approx_report: ApproxReport | None = None
+
+    try:
+        with profiling.profile_stage("read sales + calculate"):
+            if cl_args.approx:
+                # Reports are estimated from a sample of the sales, in memory that does not grow with the sales file
+                approx_report = sales_calc.calc_sales_rpt_approx(team_map=team_map,
+                                                                 prod_master=prod_master,
+                                                                 sales_batches=stream_sales_batches(cl_args)
+                                                                 if sales_batches is None else sales_batches,
+                                                                 sample_size=cl_args.sample_size,
+                                                                 hide_exc=True)
+
+            elif cl_args.cube_report_fn is not None:
+                # Team and product reports are derived from the team by product cube
+                cube = sales_calc.calc_sales_cube(team_map=team_map,
+                                                  prod_master=prod_master,
+                                                  sales_data=sales_data if sales_data is not None
+                                                  else stream_sales_data(cl_args),
+                                                  hide_exc=True)
+
+                team_report = sales_calc.cube_team_rpt(cube)
+                prod_report = sales_calc.cube_prod_rpt(cube)
+
+            else:
+                team_report, prod_report = calc_reports(cl_args, team_map, prod_master, sales_data)
+
+            if isinstance(prod_master, file_IO.LazyProductMaster):
+                # Products are read during the calculation, so the counters of their cache are recorded with it
+                for counter, count in prod_master.stats().items():
+                    profiling.record_rows(f"product_cache_{counter}", count)
+
+                prod_master.close()
+
+    except BaseException:
+        # The partly written quarantine file is removed if the run stops
+        if quarantine is not None:
+            quarantine.discard()
+
+        raise
+
+    if validation is not None and validation.invalid_rows:
+        print(f"Warning: {sales_calc.format_validation_report(validation)}")
+        print("These sales are left out of the reports.\n")
+
+    if approx_report is not None:
+        print(f"Approximate reports estimated from a sample of {approx_report.sampled} of {approx_report.sales} "
+              f"sales, with 95% confidence intervals.\n")
+
+    if cube is not None and (cl_args.cube_team is not None or cl_args.cube_product is not None):
+        cube = sales_calc.slice_cube(cube, cl_args.cube_team, cl_args.cube_product)
 
     # Write output files
-    file_IO.write_team_rpt(cl_args.team_report_fn, team_report)
-    file_IO.write_prod_rpt(cl_args.prod_report_fn, prod_report)
+    write_funcs: list[tuple[str, Callable[[], bool]]]
+
+    if approx_report is not None:
+        write_funcs = [
+            ("write team report",
+             lambda: file_IO.write_approx_team_rpt(cl_args.team_report_fn, approx_report.team_rpt, cl_args.top)),
+            ("write product report",
+             lambda: file_IO.write_approx_prod_rpt(cl_args.prod_report_fn, approx_report.prod_rpt, cl_args.top)),
+            ("write top units report",
+             lambda: file_IO.write_top_units_rpt(cl_args.top_units_report_fn, approx_report.top_units, cl_args.top))
+        ]
+
+    else:
+        write_funcs = [
+            ("write team report", lambda: file_IO.write_team_rpt(cl_args.team_report_fn, team_report, cl_args.top)),
+            ("write product report",
+             lambda: file_IO.write_prod_rpt(cl_args.prod_report_fn, prod_report, cl_args.top))
+        ]
+
+    if cube is not None:
+        write_funcs.append(("write team product report",
+                            lambda: file_IO.write_cube_rpt(cl_args.cube_report_fn, cube, cl_args.top)))
+
+    if quarantine is not None:
+        write_funcs.append(("write quarantine file", quarantine.close))
+
+    if cl_args.db_reports:
+        write_funcs.append(("save reports to database",
+                            lambda: file_IO.save_rpts_to_db(cl_args.db_fn, cl_args.sales_fn, team_report, prod_report)))
+
+    if cl_args.pipeline:
+        with profiling.profile_stage("write reports"):
+            # The output files are written at the same time
+            pipeline.run_concurrently(*(write_func for _, write_func in write_funcs))
+
+    else:
+        for stage_name, write_func in write_funcs:
+            with profiling.profile_stage(stage_name):
+                write_func()
+
+    if profiler is not None:
+        print(profiler.summary())
+
+        if cl_args.profile_json_fn is not None:
+            profiler.write_json(cl_args.profile_json_fn)
+            print(f"\nProfile trace written at {cl_args.profile_json_fn}")
 
 
 if __name__ == "__main__":
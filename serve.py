@@ -0,0 +1,49 @@
+# This program runs a report service that keeps the team map and product master in memory and answers report
+# requests for sales files over local HTTP or a Unix socket. The reference files are read again only when they
+# change, and recent results are cached, so each request avoids the startup of report.py.
+# See README for more information.
+
+from argparse import Namespace
+from utils import parser, service
+
+
+def main() -> None:
+    """
+        Main function for running the report service
+        using files and the address specified by command line arguments
+    """
+
+    # Parse command line arguments
+    cl_args: Namespace = parser.parse_serve_input()
+
+    report_service = service.ReportService(service.ReferenceTables(cl_args.team_map_fn,
+                                                                   cl_args.prod_master_fn,
+                                                                   cl_args.use_cache),
+                                           service.ResultCache(cl_args.cache_bytes),
+                                           cl_args.use_cache)
+
+    # Read the reference files now, so an invalid file is reported before the service starts
+    report_service.reference_tables.get()
+
+    try:
+        server = service.make_server(report_service, cl_args.host, cl_args.port, cl_args.socket_path)
+
+    except OSError as exc:
+        print(f"Error: Cannot listen on {cl_args.socket_path or f'{cl_args.host}:{cl_args.port}'}. {exc.strerror}\n")
+        exit()
+
+    print(f"Report service listening on {cl_args.socket_path or f'http://{cl_args.host}:{cl_args.port}'}")
+    print("Request reports with GET /report?sales={name of file}, and counters with GET /stats. Stop with Ctrl+C\n")
+
+    try:
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
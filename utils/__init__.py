@@ -1,3 +1,5 @@
-from .file_IO import read_team_map, read_prod_master, read_sales, write_prod_rpt, write_team_rpt
+from .file_IO import read_team_map, read_prod_master, read_sales, read_sales_table, stream_sales, \
+    write_prod_rpt, write_team_rpt
 from .parser import parse_input
-from .sales_calc import calc_sales_rpt
+from .profiling import profile_stage, start_profiling, stop_profiling
+from .sales_calc import add_sales, calc_sales_rpt
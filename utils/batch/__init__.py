@@ -0,0 +1 @@
+from .run_batch import format_results, run_batch, run_job
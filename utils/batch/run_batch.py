@@ -0,0 +1,148 @@
+# Defines functions for running a batch of report jobs in one process.
+# The team map and product master are shared by every job, so they are read once and passed to each worker process
+# when it starts instead of with every job. Each job streams its own sales file and writes its own reports.
+
+import contextlib
+import io
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import chain
+from ..file_IO.read import stream_sales
+from ..file_IO.write import check_outfile_name, write_prod_rpt, write_team_rpt
+from ..models import BatchJob, JobResult, Product, ProductSaleData, Sale
+from ..sales_calc import calc_sales_rpt
+
+# Reference tables shared by the jobs run in a worker process, set by set_shared_tables
+shared_team_map: dict[int, str] = {}
+shared_prod_master: dict[int, Product] = {}
+
+
+def set_shared_tables(team_map: dict[int, str], prod_master: dict[int, Product]) -> None:
+    """
+        Sets the reference tables used by the jobs run in this process. Called once when each worker starts.
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+    """
+
+    global shared_team_map, shared_prod_master
+
+    shared_team_map = team_map
+    shared_prod_master = prod_master
+
+
+def run_job(job: BatchJob, top: int | None = None) -> JobResult:
+    """
+        Calculates and writes the team and product reports of one job with the shared reference tables.
+        Messages printed by the job are captured instead of printed, and an invalid sales file
+        or any other error fails the job instead of exiting. Both report names are checked before the reports are
+        calculated, so a job with an invalid report name writes neither report.
+
+        :param job: job to run (BatchJob)
+        :param top: optional number of teams and products with the highest revenue to write (int or None)
+
+        :returns: outcome of the job (JobResult)
+    """
+
+    start: float = time.perf_counter()
+    output = io.StringIO()
+    success = False
+    sale_count = 0
+
+    def count_sales(sales_data: Iterable[Sale]) -> Iterable[Sale]:
+        nonlocal sale_count
+
+        for sale in sales_data:
+            sale_count += 1
+            yield sale
+
+    with contextlib.redirect_stdout(output):
+        try:
+            # Both report names are checked first, so a job with an invalid name writes neither report
+            if check_outfile_name(job.team_report_fn) and check_outfile_name(job.prod_report_fn):
+                team_rpt: dict[str, Decimal]
+                prod_rpt: dict[str, ProductSaleData]
+
+                sales_data: Iterable[Sale] = count_sales(chain.from_iterable(stream_sales(job.sales_fn)))
+
+                team_rpt, prod_rpt = calc_sales_rpt(team_map=shared_team_map,
+                                                    prod_master=shared_prod_master,
+                                                    sales_data=sales_data,
+                                                    hide_exc=True)
+
+                team_success: bool = write_team_rpt(job.team_report_fn, team_rpt, top)
+                prod_success: bool = write_prod_rpt(job.prod_report_fn, prod_rpt, top)
+
+                success = team_success and prod_success
+
+        except SystemExit:
+            # Readers exit after printing the reason a file is invalid
+            success = False
+
+        except Exception as exc:
+            # Any other error fails only this job, so the rest of the batch still runs
+            print(f"Error: {type(exc).__name__}: {exc}")
+            success = False
+
+    return JobResult(job=job,
+                     success=success,
+                     seconds=time.perf_counter() - start,
+                     sales=sale_count,
+                     message=output.getvalue().strip())
+
+
+def run_batch(*,
+              team_map: dict[int, str],
+              prod_master: dict[int, Product],
+              jobs: list[BatchJob],
+              workers: int = 1,
+              top: int | None = None
+              ) -> list[JobResult]:
+    """
+        Runs a batch of jobs with shared reference tables, using a pool of worker processes if workers > 1
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param jobs: list of jobs to run (BatchJob)
+        :param workers: number of worker processes (int)
+        :param top: optional number of teams and products with the highest revenue to write (int or None)
+
+        :returns: list of job outcomes (JobResult), in the order of the jobs
+    """
+
+    if workers <= 1:
+        set_shared_tables(team_map, prod_master)
+        return [run_job(job, top) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=set_shared_tables,
+                             initargs=(team_map, prod_master)) as executor:
+        return list(executor.map(run_job, jobs, [top] * len(jobs)))
+
+
+def format_results(results: list[JobResult], total_seconds: float) -> str:
+    """
+        Formats the status and timing of each job of a batch as a table
+
+        :param results: list of job outcomes (JobResult)
+        :param total_seconds: wall time of the whole batch (float)
+
+        :returns: formatted table (str)
+    """
+
+    lines: list[str] = [f"{'Sales File':<30} {'Status':<8} {'Sales':>12} {'Seconds':>10}"]
+
+    for result in results:
+        status: str = "ok" if result.success else "FAILED"
+        lines.append(f"{result.job.sales_fn:<30} {status:<8} {result.sales:>12,} {result.seconds:>10.3f}")
+
+    failed: list[JobResult] = [result for result in results if not result.success]
+
+    lines.append(f"\n{len(results) - len(failed)} of {len(results)} jobs succeeded in {total_seconds:.3f} seconds")
+
+    for result in failed:
+        lines.append(f"\n{result.job.sales_fn} failed:\n{result.message}")
+
+    return "\n".join(lines)
@@ -0,0 +1,95 @@
+import os
+import unittest
+from decimal import Decimal
+from ..run_batch import format_results, run_batch
+from ...file_IO.config import DESTINATION_FOLDER, SOURCE_FOLDER
+from ...file_IO.tests.temp_folder import TempFolderTestCase
+from ...models import BatchJob, JobResult, Product
+
+
+class TestRunBatch(TempFolderTestCase):
+    """Test case for run_batch"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with two sales files"""
+
+        super().setUp()
+
+        self.write_infile("SalesA.csv", "1,1,1,2,0\n2,2,2,1,10\n")
+        self.write_infile("SalesB.csv", "1,2,1,4,50\n")
+
+        self.team_map: dict[int, str] = {1: "Team A", 2: "Team B"}
+
+        self.prod_master: dict[int, Product] = {
+            1: Product(name="Product A", unit_price=Decimal("2.50"), lot_size=10),
+            2: Product(name="Product B", unit_price=Decimal("100"), lot_size=1)
+        }
+
+    def test_jobs(self) -> None:
+        """Test that each job writes its own reports, and that a failed job does not stop the batch"""
+
+        jobs: list[BatchJob] = [
+            BatchJob(sales_fn="SalesA.csv", team_report_fn="TeamA.csv", prod_report_fn="ProdA.csv"),
+            BatchJob(sales_fn="Missing.csv", team_report_fn="TeamM.csv", prod_report_fn="ProdM.csv"),
+            BatchJob(sales_fn="SalesB.csv", team_report_fn="TeamB.csv", prod_report_fn="ProdB.csv")
+        ]
+
+        results: list[JobResult] = run_batch(team_map=self.team_map, prod_master=self.prod_master, jobs=jobs)
+
+        self.assertEqual([result.success for result in results], [True, False, True])
+        self.assertEqual([result.sales for result in results], [2, 0, 1])
+        self.assertIn("Input file not found", results[1].message)
+
+        self.assertEqual(self.read_outfile("TeamA.csv").splitlines(),
+                         ["Team,GrossRevenue", "Team B,100.00", "Team A,50.00"])
+        self.assertEqual(self.read_outfile("ProdB.csv").splitlines(),
+                         ["Name,GrossRevenue,TotalUnits,DiscountCost", "Product B,400.00,4,200.00"])
+
+    def test_job_error(self) -> None:
+        """Test that an unexpected error fails only its job, with the error in its message"""
+
+        os.makedirs(f"{SOURCE_FOLDER}\\Folder.csv")
+
+        jobs: list[BatchJob] = [
+            BatchJob(sales_fn="Folder.csv", team_report_fn="TeamF.csv", prod_report_fn="ProdF.csv"),
+            BatchJob(sales_fn="SalesB.csv", team_report_fn="TeamB.csv", prod_report_fn="ProdB.csv")
+        ]
+
+        for workers in (1, 2):
+            results: list[JobResult] = run_batch(team_map=self.team_map, prod_master=self.prod_master, jobs=jobs,
+                                                 workers=workers)
+
+            self.assertEqual([result.success for result in results], [False, True])
+            # Opening a folder raises IsADirectoryError, or PermissionError on Windows
+            self.assertRegex(results[0].message, "IsADirectoryError|PermissionError")
+
+    def test_invalid_report_name(self) -> None:
+        """Test that a job with an invalid report name fails without writing either report"""
+
+        jobs: list[BatchJob] = [
+            BatchJob(sales_fn="SalesA.csv", team_report_fn="TeamA.csv", prod_report_fn="ProdA.txt"),
+            BatchJob(sales_fn="SalesB.csv", team_report_fn="TeamB.txt", prod_report_fn="ProdB.csv")
+        ]
+
+        results: list[JobResult] = run_batch(team_map=self.team_map, prod_master=self.prod_master, jobs=jobs)
+
+        self.assertEqual([result.success for result in results], [False, False])
+        self.assertIn("Output files must be specified", results[0].message)
+        self.assertFalse(any(os.path.exists(f"{DESTINATION_FOLDER}\\{name}")
+                             for name in ("TeamA.csv", "ProdA.txt", "TeamB.txt", "ProdB.csv")))
+
+    def test_format_results(self) -> None:
+        """Test that the results table lists each job and the reason a job failed"""
+
+        job = BatchJob(sales_fn="Missing.csv", team_report_fn="TeamM.csv", prod_report_fn="ProdM.csv")
+        table: str = format_results([JobResult(job=job, success=False, seconds=0.5, sales=0, message="Not found")],
+                                    1.0)
+
+        self.assertIn("Missing.csv", table)
+        self.assertIn("FAILED", table)
+        self.assertIn("0 of 1 jobs succeeded", table)
+        self.assertIn("Not found", table)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,2 +1,8 @@
-from .read import read_team_map, read_prod_master, read_sales
-from .write import write_prod_rpt, write_team_rpt
+from .fast_read import fast_read_prod_master, fast_read_sales, fast_stream_sales
+from .lazy_read import LazyProductMaster, lazy_read_prod_master
+from .mmap_read import mmap_read_sales, mmap_stream_sales, mmap_stream_sales_range
+from .read import get_sales_file_name, read_manifest, read_team_map, read_prod_master, read_sales, read_sales_table, \
+    stream_sales
+from .sqlite_db import DbProductMaster, DbTeamMap, db_read_prod_master, db_read_team_map, save_rpts_to_db
+from .write import QuarantineWriter, write_approx_prod_rpt, write_approx_team_rpt, write_cube_rpt, write_prod_rpt, \
+    write_team_rpt, write_top_units_rpt
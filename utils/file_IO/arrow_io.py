@@ -0,0 +1,229 @@
+# Defines functions for reading the input files from, and writing the reports to, Parquet and Arrow IPC files.
+# The files are read one record batch at a time (one row group at a time for Parquet), and only the columns used
+# are read. Columns are matched by position, in the same order as the columns of the .csv files.
+# pyarrow is only imported when one of these files is used, so it is not required for .csv files.
+
+from collections.abc import Iterable, Iterator
+from decimal import Decimal
+from types import ModuleType
+from typing import Any
+from ..models import Product, Sale
+from ..profiling import record_rows
+from .config import SALES_BATCH_SIZE, SOURCE_FOLDER
+
+# Suffixes of the supported columnar file formats
+PARQUET_SUFFIXES: tuple[str, ...] = (".parquet",)
+ARROW_SUFFIXES: tuple[str, ...] = (".arrow", ".feather", ".ipc")
+
+
+def is_columnar_file(file_name: str) -> bool:
+    """
+        Checks if a file is a Parquet or Arrow IPC file from its suffix
+
+        :param file_name: name of the file (str)
+
+        :returns: bool
+    """
+
+    return file_name.lower().endswith(PARQUET_SUFFIXES + ARROW_SUFFIXES)
+
+
+def import_pyarrow() -> ModuleType:
+    """
+        Imports pyarrow, or prints an error and exits if it is not installed
+
+        :returns: pyarrow module
+    """
+
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+    except ImportError:
+        print("Error: pyarrow is required to read and write Parquet and Arrow files.")
+        print("Install it with: pip install pyarrow")
+        exit()
+
+    return pyarrow
+
+
+def stream_columnar_infile(file_name: str,
+                           column_indexes: list[int],
+                           batch_size: int = SALES_BATCH_SIZE
+                           ) -> Iterator[list[list[Any]]]:
+    """
+        Opens a Parquet or Arrow IPC input file and returns an iterator over its record batches.
+        Only the given columns are read, and only one batch is held in memory at a time.
+
+        :param file_name: name of source file (str)
+        :param column_indexes: positions of the columns to read (list[int])
+        :param batch_size: maximum number of rows in each batch read from a Parquet file (int)
+
+        :returns: iterator of batches, each a list of the values of each column read (list[list])
+
+        :raises IndexError if the file has too few columns
+    """
+
+    pa: ModuleType = import_pyarrow()
+    file_path = f"{SOURCE_FOLDER}\\{file_name}"
+
+    # The file is opened here rather than in the generator so a missing file is reported immediately
+    try:
+        if file_name.lower().endswith(PARQUET_SUFFIXES):
+            parquet_file = pa.parquet.ParquetFile(file_path)
+            column_names: list[str] = parquet_file.schema_arrow.names
+
+        else:
+            ipc_file = pa.ipc.open_file(pa.memory_map(file_path, 'r'))
+            column_names: list[str] = ipc_file.schema.names
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+    except (pa.ArrowInvalid, OSError):
+        print(f"Error: Input file at {file_path} is not a valid {file_name.rsplit('.', 1)[-1]} file\n")
+        exit()
+
+    if max(column_indexes) >= len(column_names):
+        # A missing column is reported by the caller like a short row of a .csv file
+        raise IndexError(f"{file_path} has {len(column_names)} columns")
+
+    def batches() -> Iterator[list[list[Any]]]:
+        if file_name.lower().endswith(PARQUET_SUFFIXES):
+            # Batches are read one row group at a time, projected to the columns used
+            record_batches = parquet_file.iter_batches(batch_size=batch_size,
+                                                       columns=[column_names[index] for index in column_indexes])
+            projection: list[int] = list(range(len(column_indexes)))
+
+        else:
+            record_batches = (ipc_file.get_batch(index) for index in range(ipc_file.num_record_batches))
+            projection: list[int] = column_indexes
+
+        for record_batch in record_batches:
+            record_rows("rows_read", record_batch.num_rows)
+            yield [record_batch.column(index).to_pylist() for index in projection]
+
+    return batches()
+
+
+def to_decimals(values: Iterable[Any]) -> list[Decimal]:
+    """
+        Converts the values of a money or discount column to Decimal. Floats are converted from their
+        shortest repr, so 2.5 becomes Decimal("2.5") rather than its exact binary value.
+
+        :param values: iterable of values (int, float, str, or Decimal)
+
+        :returns: list of values (Decimal)
+
+        :raises TypeError or InvalidOperation if a value is missing or invalid
+    """
+
+    return [Decimal(repr(value)) if isinstance(value, float) else Decimal(value) for value in values]
+
+
+def to_ints(values: Iterable[Any]) -> list[int]:
+    """
+        Converts the values of an integer column to int
+
+        :param values: iterable of values (int or str)
+
+        :returns: list of values (int)
+
+        :raises TypeError or ValueError if a value is missing or invalid
+    """
+
+    return [int(value) for value in values]
+
+
+def read_columnar_team_map(file_name: str) -> dict[int, str]:
+    """
+        Reads a Parquet or Arrow IPC team map file
+
+        :param file_name: name of the file to be read (str)
+
+        :returns: dictionary with key = team id (int), value = team name (str)
+
+        :raises ValueError, TypeError, or IndexError if the file is invalid
+    """
+
+    team_map: dict[int, str] = {}
+
+    for team_ids, names in stream_columnar_infile(file_name, [0, 1]):
+        team_map.update(zip(to_ints(team_ids), (str(name) for name in names)))
+
+    return team_map
+
+
+def read_columnar_prod_master(file_name: str) -> dict[int, Product]:
+    """
+        Reads a Parquet or Arrow IPC product master file
+
+        :param file_name: name of the file to be read (str)
+
+        :returns: dictionary with key = product id (int), value = product info (Product)
+
+        :raises ValueError, TypeError, IndexError, or InvalidOperation if the file is invalid
+    """
+
+    prod_master: dict[int, Product] = {}
+
+    for prod_ids, names, unit_prices, lot_sizes in stream_columnar_infile(file_name, [0, 1, 2, 3]):
+        prod_master.update(
+            (prod_id, Product(name=str(name), unit_price=unit_price, lot_size=lot_size))
+            for prod_id, name, unit_price, lot_size
+            in zip(to_ints(prod_ids), names, to_decimals(unit_prices), to_ints(lot_sizes))
+        )
+
+    return prod_master
+
+
+def stream_columnar_sales(file_name: str, batch_size: int = SALES_BATCH_SIZE) -> Iterator[list[Sale]]:
+    """
+        Reads a Parquet or Arrow IPC sales file incrementally and returns an iterator over batches of sales data.
+        The sale id column is not read.
+
+        :param file_name: name of the file to be read (str)
+        :param batch_size: maximum number of sales in each batch read from a Parquet file (int)
+
+        :returns: iterator of lists of sales data (Sale)
+
+        :raises ValueError, TypeError, IndexError, or InvalidOperation if the file is invalid
+    """
+
+    for prod_ids, team_ids, lots_sold, discounts in stream_columnar_infile(file_name, [1, 2, 3, 4], batch_size):
+        yield [
+            Sale(prod_id=prod_id, team_id=team_id, lots_sold=lots, discount=discount)
+            for prod_id, team_id, lots, discount
+            in zip(to_ints(prod_ids), to_ints(team_ids), to_ints(lots_sold), to_decimals(discounts))
+        ]
+
+
+def write_columnar_outfile(file_path: str, file_rows: Iterable) -> None:
+    """
+        Writes rows to a Parquet or Arrow IPC output file. Reports are small once aggregated,
+        so all rows are written as one table.
+
+        :param file_path: path of the file to write (str)
+        :param file_rows: iterable of rows to write to the file, starting with the header row
+
+        :raises OSError if the file cannot be written
+    """
+
+    pa: ModuleType = import_pyarrow()
+
+    rows_iter: Iterator = iter(file_rows)
+    header: list[str] = list(next(rows_iter))
+    columns: list[list] = [list(column) for column in zip(*rows_iter)] or [[] for _ in header]
+
+    table = pa.table({name: pa.array(column) if column else pa.array([], pa.string())
+                      for name, column in zip(header, columns)})
+
+    if file_path.lower().endswith(PARQUET_SUFFIXES):
+        pa.parquet.write_table(table, file_path)
+
+    else:
+        with pa.ipc.new_file(file_path, table.schema) as writer:
+            writer.write_table(table)
+
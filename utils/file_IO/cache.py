@@ -0,0 +1,536 @@
+# Defines a binary cache of parsed input files, so unchanged input files do not have to be parsed again.
+# Each cache file holds the parsed table as chunks of fixed-width columns (array buffers, aligned to 8 bytes),
+# followed by a JSON footer that describes the chunks and the source file the cache was built from.
+# A cache is valid if the source file has the same path, modification time, and size as when it was read.
+# Each chunk has a CRC-32 of its columns, so a cache file that is damaged or cut short is dropped when it is loaded.
+# Decimals are stored exactly as an integer mantissa and a decimal exponent.
+# Sales are loaded from the cache as tables of columns (SalesTable), without parsing or creating an object per sale.
+
+import json
+import os
+import struct
+import zlib
+from array import array
+from typing import Any
+from collections.abc import Callable, Iterable, Iterator
+from decimal import Decimal
+from .config import CACHE_FOLDER
+from ..models import Product, Sale, SalesTable
+
+# Marks the start of a cache file. Changing the layout of the cache files should change the version.
+CACHE_MAGIC: bytes = b"SRGC0004"
+
+# Packs the length of the footer at the end of a cache file
+FOOTER_LENGTH = struct.Struct("<Q")
+
+
+class CorruptCacheError(Exception):
+    """Raised when a chunk of a cache file is cut short or does not match its CRC-32. The cache file is deleted."""
+
+
+def get_cache_path(file_name: str) -> str:
+    """
+        Gets the path of the cache for an input file
+
+        :param file_name: name of the input file (str)
+
+        :returns: path of the cache file (str)
+    """
+
+    return f"{CACHE_FOLDER}\\{file_name}.cache"
+
+
+def get_source_stat(source_path: str) -> os.stat_result | None:
+    """
+        Gets the size and modification time of an input file, to be taken before the file is read
+
+        :param source_path: path of the input file (str)
+
+        :returns: status of the file (os.stat_result), or None if it cannot be read
+    """
+
+    try:
+        return os.stat(source_path)
+
+    except OSError:
+        return None
+
+
+def compact_ints(values: Iterable[int]) -> array:
+    """
+        Packs integers into the narrowest signed integer column that holds them
+
+        :param values: integers to pack (int)
+
+        :returns: column of integers (array of int8, int16, int32, or int64)
+
+        :raises OverflowError if an integer does not fit in 64 bits
+    """
+
+    column: array = array('q', values)
+    low: int = min(column, default=0)
+    high: int = max(column, default=0)
+
+    for typecode in ('b', 'h', 'i'):
+        bits: int = array(typecode).itemsize * 8 - 1
+
+        if -(1 << bits) <= low and high < (1 << bits):
+            return array(typecode, column)
+
+    return column
+
+
+def split_decimals(values: Iterable[Decimal]) -> tuple[array, array]:
+    """
+        Splits decimals into integer mantissa and exponent columns
+
+        :param values: decimals to split (Decimal)
+
+        :returns: tuple of mantissa column (array of int64) and exponent column (array of int8)
+
+        :raises OverflowError or ValueError if a decimal cannot be stored, e.g. NaN or Infinity
+    """
+
+    mantissas: array = array('q')
+    exponents: array = array('b')
+
+    for value in values:
+        if not value.is_finite():
+            raise ValueError(f"Cannot store {value} in the cache")
+
+        exponent: int = value.as_tuple().exponent
+        exponents.append(exponent)
+        mantissas.append(int(value.scaleb(-exponent)))
+
+    return compact_ints(mantissas), exponents
+
+
+def join_decimals(mantissas: array, exponents: array) -> list[Decimal]:
+    """
+        Joins integer mantissa and exponent columns into decimals
+
+        :param mantissas: mantissa column (array of int64)
+        :param exponents: exponent column (array of int8)
+
+        :returns: list of decimals (Decimal)
+    """
+
+    return [Decimal(mantissa).scaleb(exponent) for mantissa, exponent in zip(mantissas, exponents)]
+
+
+def split_strings(values: Iterable[str]) -> tuple[array, array]:
+    """
+        Packs strings into a column of utf-8 bytes and a column of the offsets where each string ends
+
+        :param values: strings to pack (str)
+
+        :returns: tuple of bytes column (array of uint8) and end offset column (array of int64)
+    """
+
+    data: array = array('B')
+    ends: array = array('q')
+
+    for value in values:
+        data.frombytes(value.encode("utf-8"))
+        ends.append(len(data))
+
+    return data, ends
+
+
+def join_strings(data: array, ends: array) -> list[str]:
+    """
+        Unpacks strings from a column of utf-8 bytes and a column of end offsets
+
+        :param data: bytes column (array of uint8)
+        :param ends: end offset column (array of int64)
+
+        :returns: list of strings (str)
+    """
+
+    raw: bytes = data.tobytes()
+    starts: Iterable[int] = [0, *ends[:-1]] if ends else []
+
+    return [raw[start:end].decode("utf-8") for start, end in zip(starts, ends)]
+
+
+def sales_to_columns(sales_data: Iterable[Sale]) -> dict[str, array]:
+    """
+        Converts sales data to cache columns
+
+        :param sales_data: sales data (Sale)
+
+        :returns: dict with key = column name (str), value = column (array)
+    """
+
+    sales_data = tuple(sales_data)
+    disc_mants, disc_exps = split_decimals(sale.discount for sale in sales_data)
+
+    return {
+        "prod_ids": compact_ints(sale.prod_id for sale in sales_data),
+        "team_ids": compact_ints(sale.team_id for sale in sales_data),
+        "lots_sold": compact_ints(sale.lots_sold for sale in sales_data),
+        "disc_mants": disc_mants,
+        "disc_exps": disc_exps
+    }
+
+
+def columns_to_sales(columns: dict[str, array]) -> list[Sale]:
+    """
+        Converts cache columns to sales data
+
+        :param columns: dict with key = column name (str), value = column (array)
+
+        :returns: list of sales data (Sale)
+    """
+
+    return [
+        Sale(prod_id=prod_id, team_id=team_id, lots_sold=lots_sold, discount=discount)
+        for prod_id, team_id, lots_sold, discount in zip(columns["prod_ids"],
+                                                         columns["team_ids"],
+                                                         columns["lots_sold"],
+                                                         join_decimals(columns["disc_mants"], columns["disc_exps"]))
+    ]
+
+
+def sales_table_to_columns(sales_table: SalesTable) -> dict[str, array]:
+    """
+        Converts a sales table to cache columns
+
+        :param sales_table: sales data (SalesTable)
+
+        :returns: dict with key = column name (str), value = column (array)
+    """
+
+    return {name: compact_ints(column) for name, column in sales_table.columns().items()}
+
+
+def prod_master_to_columns(prod_master: dict[int, Product]) -> dict[str, array]:
+    """
+        Converts a product master to cache columns
+
+        :param prod_master: dict with key = product id (int), value = Product
+
+        :returns: dict with key = column name (str), value = column (array)
+    """
+
+    price_mants, price_exps = split_decimals(product.unit_price for product in prod_master.values())
+    name_data, name_ends = split_strings(product.name for product in prod_master.values())
+
+    return {
+        "prod_id": compact_ints(prod_master.keys()),
+        "price_mant": price_mants,
+        "price_exp": price_exps,
+        "lot_size": compact_ints(product.lot_size for product in prod_master.values()),
+        "name_data": name_data,
+        "name_ends": name_ends
+    }
+
+
+def columns_to_prod_master(columns: dict[str, array]) -> dict[int, Product]:
+    """
+        Converts cache columns to a product master
+
+        :param columns: dict with key = column name (str), value = column (array)
+
+        :returns: dict with key = product id (int), value = Product
+    """
+
+    return {
+        prod_id: Product(name=name, unit_price=unit_price, lot_size=lot_size)
+        for prod_id, name, unit_price, lot_size in zip(columns["prod_id"],
+                                                       join_strings(columns["name_data"], columns["name_ends"]),
+                                                       join_decimals(columns["price_mant"], columns["price_exp"]),
+                                                       columns["lot_size"])
+    }
+
+
+def team_map_to_columns(team_map: dict[int, str]) -> dict[str, array]:
+    """
+        Converts a team map to cache columns
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+
+        :returns: dict with key = column name (str), value = column (array)
+    """
+
+    name_data, name_ends = split_strings(team_map.values())
+
+    return {"team_id": compact_ints(team_map.keys()), "name_data": name_data, "name_ends": name_ends}
+
+
+def columns_to_team_map(columns: dict[str, array]) -> dict[int, str]:
+    """
+        Converts cache columns to a team map
+
+        :param columns: dict with key = column name (str), value = column (array)
+
+        :returns: dict with key = team id (int), value = team name (str)
+    """
+
+    return dict(zip(columns["team_id"], join_strings(columns["name_data"], columns["name_ends"])))
+
+
+class CacheWriter:
+    """Writes chunks of columns to a new cache file"""
+
+    def __init__(self, file_name: str, source_path: str, source_stat: os.stat_result):
+        """
+            Starts a new cache file for an input file. The cache replaces any existing cache when it is closed.
+
+            :param file_name: name of the input file (str)
+            :param source_path: path of the input file (str)
+            :param source_stat: status of the input file, taken before it was read (os.stat_result).
+                A file changed while it is read then has a new status, so the cache is not used for it.
+        """
+
+        self.cache_path: str = get_cache_path(file_name)
+        self.temp_path: str = f"{self.cache_path}.tmp"
+        self.source_path: str = source_path
+        self.source_stat: os.stat_result = source_stat
+        self.chunks: list[dict] = []
+
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        self.outfile = open(self.temp_path, 'wb')
+        self.outfile.write(CACHE_MAGIC)
+
+    def write_chunk(self, columns: dict[str, array]) -> None:
+        """
+            Writes a chunk of columns to the cache file
+
+            :param columns: dict with key = column name (str), value = column (array)
+        """
+
+        chunk_columns: dict = {}
+        crc: int = 0
+
+        for name, column in columns.items():
+            chunk_columns[name] = [self.outfile.tell(), column.typecode, len(column)]
+            column.tofile(self.outfile)
+            crc = zlib.crc32(column, crc)
+
+            # Pad so every column starts on an 8 byte boundary
+            self.outfile.write(bytes(-self.outfile.tell() % 8))
+
+        self.chunks.append({"columns": chunk_columns, "crc32": crc})
+
+    def close(self) -> None:
+        """Writes the footer and replaces any existing cache with the new cache file"""
+
+        footer: bytes = json.dumps({
+            "source": {
+                "path": self.source_path,
+                "mtime_ns": self.source_stat.st_mtime_ns,
+                "size": self.source_stat.st_size
+            },
+            "chunks": self.chunks
+        }).encode("utf-8")
+
+        self.outfile.write(footer)
+        self.outfile.write(FOOTER_LENGTH.pack(len(footer)))
+        self.outfile.close()
+
+        os.replace(self.temp_path, self.cache_path)
+
+    def discard(self) -> None:
+        """Deletes the new cache file without replacing any existing cache"""
+
+        self.outfile.close()
+
+        try:
+            os.remove(self.temp_path)
+
+        except OSError:
+            pass
+
+
+def save_cache(file_name: str,
+               source_path: str,
+               source_stat: os.stat_result | None,
+               to_columns: Callable[[Any], dict[str, array]],
+               table: Any
+               ) -> None:
+    """
+        Saves a parsed table as the cache for an input file.
+        Failing to save the cache is not an error, the file is just parsed again on the next run.
+
+        :param file_name: name of the input file (str)
+        :param source_path: path of the input file (str)
+        :param source_stat: status of the input file taken before it was read, see get_source_stat
+            (os.stat_result or None). The cache is not saved if this is None.
+        :param to_columns: function that converts the table to columns, e.g. team_map_to_columns
+        :param table: parsed table
+    """
+
+    if source_stat is None:
+        return
+
+    try:
+        columns: dict[str, array] = to_columns(table)
+        writer = CacheWriter(file_name, source_path, source_stat)
+
+    except (OSError, OverflowError, ValueError):
+        return
+
+    try:
+        writer.write_chunk(columns)
+        writer.close()
+
+    except OSError:
+        writer.discard()
+
+
+def cache_sales(file_name: str, source_path: str, batches: Iterator[list[Sale]]) -> Iterator[list[Sale]]:
+    """
+        Passes through batches of sales data while saving them as the cache for the sales file.
+        The cache is only saved if every batch is read.
+
+        :param file_name: name of the sales file (str)
+        :param source_path: path of the sales file (str)
+        :param batches: iterator of lists of sales data (Sale)
+
+        :returns: iterator of lists of sales data (Sale)
+    """
+
+    # The status is taken before the first batch is read
+    source_stat: os.stat_result | None = get_source_stat(source_path)
+
+    try:
+        writer: CacheWriter | None = CacheWriter(file_name, source_path, source_stat) if source_stat else None
+
+    except OSError:
+        writer = None
+
+    try:
+        for batch in batches:
+            if writer is not None:
+                try:
+                    writer.write_chunk(sales_to_columns(batch))
+
+                except (OSError, OverflowError, ValueError):
+                    writer.discard()
+                    writer = None
+
+            yield batch
+
+        if writer is not None:
+            writer.close()
+            writer = None
+
+    finally:
+        if writer is not None:
+            writer.discard()
+
+
+def remove_cache(file_name: str) -> None:
+    """
+        Deletes the cache for an input file, if there is one
+
+        :param file_name: name of the input file (str)
+    """
+
+    try:
+        os.remove(get_cache_path(file_name))
+
+    except OSError:
+        pass
+
+
+def load_cache(file_name: str, source_path: str) -> Iterator[dict[str, array]] | None:
+    """
+        Loads the cache for an input file if it is valid
+
+        :param file_name: name of the input file (str)
+        :param source_path: path of the input file (str)
+
+        :returns: iterator of chunks of columns, each a dict with key = column name (str), value = column (array),
+            or None if there is no valid cache
+
+        :raises CorruptCacheError while iterating, if a chunk is cut short or does not match its CRC-32
+    """
+
+    cache_path: str = get_cache_path(file_name)
+
+    try:
+        stat: os.stat_result = os.stat(source_path)
+        cache_file = open(cache_path, 'rb')
+
+    except OSError:
+        return None
+
+    try:
+        if cache_file.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            raise ValueError("Not a cache file")
+
+        cache_file.seek(-FOOTER_LENGTH.size, os.SEEK_END)
+        footer_length: int = FOOTER_LENGTH.unpack(cache_file.read(FOOTER_LENGTH.size))[0]
+        cache_file.seek(-FOOTER_LENGTH.size - footer_length, os.SEEK_END)
+        footer: dict = json.loads(cache_file.read(footer_length))
+
+        source: dict = footer["source"]
+
+        if source["path"] != source_path:
+            raise ValueError("Cache is for a different file")
+
+        if source["size"] != stat.st_size or source["mtime_ns"] != stat.st_mtime_ns:
+            raise ValueError("Cache is out of date")
+
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        cache_file.close()
+        return None
+
+    def chunks() -> Iterator[dict[str, array]]:
+        with cache_file:
+            for chunk in footer["chunks"]:
+                columns: dict[str, array] = {}
+                crc: int = 0
+
+                try:
+                    for name, (offset, typecode, length) in chunk["columns"].items():
+                        column: array = array(typecode)
+                        cache_file.seek(offset)
+                        column.fromfile(cache_file, length)
+                        crc = zlib.crc32(column, crc)
+                        columns[name] = column
+
+                    valid: bool = crc == chunk["crc32"]
+
+                except (OSError, EOFError, ValueError, KeyError, TypeError):
+                    valid = False
+
+                if not valid:
+                    cache_file.close()
+                    remove_cache(file_name)
+
+                    raise CorruptCacheError(f"Cache file at {cache_path} is corrupt")
+
+                yield columns
+
+    return chunks()
+
+
+def load_cache_table(file_name: str, source_path: str) -> dict[str, array] | None:
+    """
+        Loads the cache for an input file if it is valid, joining all of its chunks
+
+        :param file_name: name of the input file (str)
+        :param source_path: path of the input file (str)
+
+        :returns: dict with key = column name (str), value = column (array), or None if there is no valid cache
+    """
+
+    chunks: Iterator[dict[str, array]] | None = load_cache(file_name, source_path)
+
+    if chunks is None:
+        return None
+
+    table: dict[str, array] = {}
+
+    try:
+        for chunk in chunks:
+            for name, column in chunk.items():
+                table.setdefault(name, array(column.typecode)).extend(column)
+
+    except CorruptCacheError:
+        return None
+
+    return table
@@ -0,0 +1,175 @@
+# Defines functions for opening compressed input and output files.
+# Files are compressed or decompressed as they are streamed, so a compressed file is never expanded on disk.
+# gzip, bz2, and xz are supported by the standard library. zstd requires zstandard, which is only imported
+# when a .zst file is used.
+
+import bz2
+import gzip
+import io
+import lzma
+from types import ModuleType
+from typing import IO
+
+# Suffixes of the supported compression formats
+COMPRESSED_SUFFIXES: tuple[str, ...] = (".gz", ".bz2", ".xz", ".zst")
+
+# Exceptions raised while decompressing a corrupt or truncated file. Errors of zstandard are raised as OSError.
+DECOMPRESSION_ERRORS: tuple[type[Exception], ...] = (OSError, EOFError, lzma.LZMAError)
+
+# Bytes of a .zst file read at a time
+ZSTD_READ_SIZE: int = 1 << 17
+
+
+def get_compression(file_name: str) -> str | None:
+    """
+        Gets the compression format of a file from its suffix
+
+        :param file_name: name of the file (str)
+
+        :returns: suffix of the compression format, e.g. ".gz", or None if the file is not compressed (str or None)
+    """
+
+    for suffix in COMPRESSED_SUFFIXES:
+        if file_name.lower().endswith(suffix):
+            return suffix
+
+    return None
+
+
+def strip_compression(file_name: str) -> str:
+    """
+        Removes the compression suffix from a file name, e.g. Sales.csv.gz becomes Sales.csv
+
+        :param file_name: name of the file (str)
+
+        :returns: name of the file without its compression suffix (str)
+    """
+
+    compression: str | None = get_compression(file_name)
+
+    return file_name[:-len(compression)] if compression is not None else file_name
+
+
+def import_zstandard() -> ModuleType:
+    """
+        Imports zstandard, or prints an error and exits if it is not installed
+
+        :returns: zstandard module
+    """
+
+    try:
+        import zstandard
+
+    except ImportError:
+        print("Error: zstandard is required to read and write .zst files.")
+        print("Install it with: pip install zstandard")
+        exit()
+
+    return zstandard
+
+
+class ZstdReader(io.RawIOBase):
+    """
+        Reads a .zst file one frame after another, like gzip reads a .gz file. zstandard's own readers return the data
+        of an unfinished frame without an error, so a truncated file would be read as if it ended early.
+    """
+
+    def __init__(self, file_path: str, zstandard: ModuleType):
+        self.infile: IO = open(file_path, 'rb')
+        self.zstandard: ModuleType = zstandard
+        self.decompressor = None  # decompressor of the current frame
+        self.data: memoryview = memoryview(b"")  # decompressed data, read from pos
+        self.pos: int = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self.pos == len(self.data):
+            compressed: bytes = self.infile.read(ZSTD_READ_SIZE)
+
+            if not compressed:
+                if self.decompressor is not None and not self.decompressor.eof:
+                    raise EOFError("Compressed file ended before the end of its last frame")
+
+                return 0
+
+            self.data, self.pos = memoryview(self.decompress(compressed)), 0
+
+        size: int = min(len(buffer), len(self.data) - self.pos)
+        buffer[:size] = self.data[self.pos:self.pos + size]
+        self.pos += size
+
+        return size
+
+    def decompress(self, compressed: bytes) -> bytes:
+        """
+            Decompresses the next bytes of the file, which may finish a frame and start the next
+
+            :param compressed: bytes read from the file (bytes)
+
+            :returns: decompressed data (bytes)
+
+            :raises OSError if the data is not valid zstd data
+        """
+
+        data: list[bytes] = []
+
+        try:
+            while compressed:
+                if self.decompressor is None or self.decompressor.eof:
+                    self.decompressor = self.zstandard.ZstdDecompressor().decompressobj()
+
+                data.append(self.decompressor.decompress(compressed))
+                compressed = self.decompressor.unused_data if self.decompressor.eof else b""
+
+        except self.zstandard.ZstdError as exc:
+            raise OSError(f"Invalid zstd data ({exc})") from exc
+
+        return b"".join(data)
+
+    def close(self) -> None:
+        self.infile.close()
+        super().close()
+
+
+def open_file(file_path: str, mode: str, encoding: str | None = None, newline: str | None = None) -> IO:
+    """
+        Opens a file like open, compressing or decompressing it as it is streamed if its suffix is a compression format
+
+        :param file_path: path of the file (str)
+        :param mode: 'r', 'w', 'rb', or 'wb' (str)
+        :param encoding: encoding of a file opened in text mode (str or None)
+        :param newline: newline mode of a file opened in text mode (str or None)
+
+        :returns: file object
+
+        :raises FileNotFoundError if a file opened for reading does not exist
+    """
+
+    compression: str | None = get_compression(file_path)
+
+    if compression is None:
+        return open(file_path, mode, encoding=encoding, newline=newline)
+
+    text_kwargs: dict = {} if 'b' in mode else {"encoding": encoding, "newline": newline}
+    mode = mode if 'b' in mode else mode + 't'
+
+    if compression == ".gz":
+        return gzip.open(file_path, mode, **text_kwargs)
+
+    if compression == ".bz2":
+        return bz2.open(file_path, mode, **text_kwargs)
+
+    if compression == ".xz":
+        return lzma.open(file_path, mode, **text_kwargs)
+
+    zstandard: ModuleType = import_zstandard()
+
+    if 'w' in mode:
+        return zstandard.open(file_path, mode, **text_kwargs)
+
+    # The reader does not split lines itself, so it is buffered to iterate over lines
+    zst_file: IO = io.BufferedReader(ZstdReader(file_path, zstandard), buffer_size=ZSTD_READ_SIZE)
+
+    return zst_file if mode == 'rb' else io.TextIOWrapper(zst_file, **text_kwargs)
@@ -6,7 +6,41 @@ DEFAULT_TEAM_MAP_FILE: str = "TeamMap.csv"
 # Default destination file names
 DEFAULT_PROD_RPT_FILE: str = "ProductReport.csv"
 DEFAULT_TEAM_RPT_FILE: str = "TeamReport.csv"
+DEFAULT_CUBE_RPT_FILE: str = "TeamProductReport.csv"
+DEFAULT_TOP_UNITS_RPT_FILE: str = "TopUnitsReport.csv"
+DEFAULT_QUARANTINE_FILE: str = "QuarantinedSales.csv"
+
+# Default name of the SQLite database in the cache folder that the team map and product master are imported into,
+# and that the reports can be saved to
+DEFAULT_DB_FILE: str = "SalesReports.db"
 
 # File folders
+CACHE_FOLDER = "Cache Files"
 DESTINATION_FOLDER = "Output Files"
 SOURCE_FOLDER = "Input Files"
+
+# Number of sales held in memory at a time when streaming the sales file
+SALES_BATCH_SIZE: int = 10_000
+
+# Index of the optional sale date column in the sales file. Dates are written as YYYY-MM-DD.
+SALES_DATE_COLUMN: int = 5
+
+# Number of rows of an output file formatted and written at a time
+WRITE_BATCH_ROWS: int = 10_000
+
+# Number of sales batches read ahead of the calculation when the pipeline is used
+PREFETCH_BATCHES: int = 4
+
+# Size in bytes of the line-aligned chunks the memory-mapped reader parses at a time
+MMAP_CHUNK_SIZE: int = 1 << 20
+
+# Number of parsed products the lazy product master keeps in memory
+LAZY_CACHE_PRODUCTS: int = 100_000
+
+# Number of ids looked up in the SQLite database with each query
+DB_LOOKUP_BATCH_SIZE: int = 500
+
+# Address the report service listens on, and the size in bytes of its cache of recent results
+SERVICE_HOST: str = "127.0.0.1"
+SERVICE_PORT: int = 8765
+SERVICE_CACHE_BYTES: int = 64 << 20
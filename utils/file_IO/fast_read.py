@@ -0,0 +1,199 @@
+# Defines a fast backend for reading the sales and product master csv files.
+# Lines are split on commas as bytes and parsed straight into integer columns, without building csv rows
+# or Decimal objects. Discounts are stored in basis points and prices in cents.
+# Lines containing quotes fall back to the csv module, so quoted fields are read the same as by read.py.
+
+import csv
+from collections.abc import Iterator
+from decimal import Decimal, InvalidOperation
+from .config import DEFAULT_PROD_MASTER_FILE, SALES_BATCH_SIZE, SOURCE_FOLDER
+from .compression import DECOMPRESSION_ERRORS, open_file
+from .read import corrupt_infile, get_infile_path, get_sales_file_name, invalid_prod_master_file, invalid_sales_file
+from ..models import BASIS_POINT_PLACES, CENT_PLACES, ProductTable, SalesTable, to_scaled_int
+from ..profiling import record_rows
+
+
+def parse_fixed(field: bytes, places: int) -> int | None:
+    """
+        Parses a decimal number as an integer scaled by 10 ** places
+
+        :param field: decimal number (bytes)
+        :param places: number of decimal places to keep (int)
+
+        :returns: scaled number (int), or None if the number has more decimal places than can be kept
+
+        :raises ValueError or InvalidOperation if the field is not a number
+    """
+
+    whole, _, frac = field.partition(b".")
+
+    if not frac:
+        return int(whole) * 10 ** places
+
+    if len(frac) <= places and frac.isdigit():
+        return int(whole + frac.ljust(places, b"0"))
+
+    # Less common forms, such as exponents or trailing zeros past the kept places, are parsed as a Decimal
+    try:
+        return to_scaled_int(Decimal(field.decode("utf-8")), places)
+
+    except ValueError:
+        return None
+
+
+def split_fields(line: bytes) -> list[bytes]:
+    """
+        Splits a line of a csv file into fields
+
+        :param line: line of the file, without the line ending (bytes)
+
+        :returns: list of fields (bytes)
+    """
+
+    if b'"' not in line:
+        return line.split(b",")
+
+    return [field.encode("utf-8") for field in next(csv.reader([line.decode("utf-8")]), [])]
+
+
+def precision_error(file_name: str, line_num: int, field: str, value: bytes, reader: str = "fast") -> None:
+    """
+        Prints an error for an amount that cannot be held by the fast or mmap backend and exits
+
+        :param file_name: name of the input file (str)
+        :param line_num: line number of the amount (int)
+        :param field: name of the amount (str)
+        :param value: amount (bytes)
+        :param reader: name of the backend the file was read with (str)
+    """
+
+    print(f"Error: {field} {value.decode('utf-8', 'replace')} on line {line_num} of "
+          f"{SOURCE_FOLDER}\\{file_name} has too many decimal places for the {reader} reader.")
+    print(f"Run again without --reader={reader} to read it.")
+    exit()
+
+
+def fast_stream_sales(file_name: str | None = None, batch_size: int = SALES_BATCH_SIZE) -> Iterator[SalesTable]:
+    """
+        Reads sales file incrementally with the fast backend and returns an iterator over tables of sales data.
+        Discounts are stored in basis points.
+
+        :param file_name: optional name of the file to be read (str or None)
+        :param batch_size: maximum number of sales in each table (int)
+
+        :returns: iterator of tables of sales data (SalesTable)
+    """
+
+    file_name = get_sales_file_name(file_name)
+    file_path = get_infile_path(file_name)
+
+    try:
+        infile = open_file(file_path, 'rb')
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+    def batches() -> Iterator[SalesTable]:
+        batch = SalesTable()
+        prod_ids, team_ids, lots_sold = batch.prod_ids, batch.team_ids, batch.lots_sold
+        disc_mants, disc_exps = batch.disc_mants, batch.disc_exps
+
+        with infile:
+            try:
+
+                for line_num, line in enumerate(infile, 1):
+                    fields: list[bytes] = split_fields(line.rstrip(b"\r\n"))
+                    disc: int | None = parse_fixed(fields[4], BASIS_POINT_PLACES)
+
+                    if disc is None:
+                        precision_error(file_name, line_num, "Discount", fields[4])
+
+                    prod_ids.append(int(fields[1]))
+                    team_ids.append(int(fields[2]))
+                    lots_sold.append(int(fields[3]))
+                    disc_mants.append(disc)
+                    disc_exps.append(-BASIS_POINT_PLACES)
+
+                    if len(prod_ids) >= batch_size:
+                        record_rows("rows_read", len(batch))
+                        yield batch
+
+                        batch = SalesTable()
+                        prod_ids, team_ids, lots_sold = batch.prod_ids, batch.team_ids, batch.lots_sold
+                        disc_mants, disc_exps = batch.disc_mants, batch.disc_exps
+
+            except (ValueError, IndexError, InvalidOperation, OverflowError):
+                invalid_sales_file(file_name)
+
+            except DECOMPRESSION_ERRORS:
+                corrupt_infile(file_path)
+
+        if len(batch):
+            record_rows("rows_read", len(batch))
+            yield batch
+
+    return batches()
+
+
+def fast_read_sales(file_name: str | None = None) -> SalesTable:
+    """
+        Reads sales file with the fast backend and returns a table of sales data from data in the file.
+        Discounts are stored in basis points.
+
+        :param file_name: optional name of the file to be read (str or None)
+
+        :returns: table of sales data (SalesTable)
+    """
+
+    sales_table = SalesTable()
+
+    for batch in fast_stream_sales(file_name):
+        sales_table.extend_columns(batch.columns())
+
+    return sales_table
+
+
+def fast_read_prod_master(file_name: str | None = None) -> ProductTable:
+    """
+        Reads product master file with the fast backend and returns a table of product information.
+        Prices are stored in cents.
+
+        :param file_name: optional name of the file to be read (str or None)
+
+        :returns: table mapping product id (int) to product info (Product)
+    """
+
+    if file_name is None:
+        # Use default file name from config.py
+        file_name = DEFAULT_PROD_MASTER_FILE
+
+        print(f"Product Master file not specified. Default used: {file_name}")
+        print("To change this, run again with --product-master={name of file} or -p {name of file}\n")
+
+    file_path = get_infile_path(file_name)
+    prod_master = ProductTable()
+
+    try:
+        with open_file(file_path, 'rb') as infile:
+
+            for line_num, line in enumerate(infile, 1):
+                fields: list[bytes] = split_fields(line.rstrip(b"\r\n"))
+                price: int | None = parse_fixed(fields[2], CENT_PLACES)
+
+                if price is None:
+                    precision_error(file_name, line_num, "Price", fields[2])
+
+                prod_master.append(int(fields[0]), fields[1].decode("utf-8"), price, int(fields[3]))
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+    except (ValueError, IndexError, InvalidOperation, OverflowError):
+        invalid_prod_master_file(file_name)
+
+    except DECOMPRESSION_ERRORS:
+        corrupt_infile(file_path)
+
+    return prod_master
@@ -0,0 +1,234 @@
+# Defines a lazy reader for the product master file.
+# Instead of parsing every product up front, the file is scanned once for the product id and byte offset of each
+# line, which are kept in two sorted integer columns. A product is only parsed from its line when it is first looked
+# up, and recently used products are kept in a bounded least recently used cache. When the sales refer to a small
+# part of a large product master, most lines are never parsed.
+
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO
+from .config import DEFAULT_PROD_MASTER_FILE, LAZY_CACHE_PRODUCTS
+from .compression import get_compression
+from .fast_read import split_fields
+from .read import get_infile_path, invalid_prod_master_file
+from ..models import Product
+
+
+def parse_prod_id(line: bytes) -> int:
+    """
+        Parses the product id at the start of a line of the product master file
+
+        :param line: line of the file (bytes)
+
+        :returns: product id (int)
+
+        :raises ValueError or IndexError if the line has no valid product id
+    """
+
+    if line.startswith(b'"'):
+        return int(split_fields(line.rstrip(b"\r\n"))[0])
+
+    comma: int = line.find(b",")
+
+    if comma == -1:
+        raise IndexError("Too few columns")
+
+    return int(line[:comma])
+
+
+class LazyProductMaster(Mapping):
+    """
+        Product master file indexed by the byte offset of each product, mapping product id (int) to Product.
+        Products are parsed when first looked up, and the most recently used are kept in memory.
+    """
+
+    def __init__(self, file_name: str, max_products: int = LAZY_CACHE_PRODUCTS):
+        if get_compression(file_name) is not None:
+            print(f"Error: {file_name} is compressed, so it cannot be indexed by byte offset. Decompress it to use "
+                  f"--lazy-product-master.")
+            exit()
+
+        self.file_name: str = file_name
+        self.file_path: str = get_infile_path(file_name)
+        self.max_products: int = max_products
+        self.prod_ids: array = array('q')  # sorted product ids
+        self.offsets: array = array('q')  # byte offset of the line of each product id
+        self.products: OrderedDict[int, Product] = OrderedDict()  # recently used products
+        self.infile: BinaryIO | None = None
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        # Looking up a product moves the position of the file, so lookups are made one at a time
+        self.lock = threading.Lock()
+
+        self.build_index()
+
+    def build_index(self) -> None:
+        """Scans the file for the product id and byte offset of each line, keeping the last line of each id"""
+
+        prod_ids: array = array('q')
+        offsets: array = array('q')
+        offset: int = 0
+
+        try:
+            with open(self.file_path, 'rb') as infile:
+                for line in infile:
+                    prod_ids.append(parse_prod_id(line))
+                    offsets.append(offset)
+                    offset += len(line)
+
+        except FileNotFoundError:
+            print(f"Error: Input file not found at {self.file_path}\n")
+            exit()
+
+        except (ValueError, IndexError, OverflowError):
+            invalid_prod_master_file(self.file_name)
+
+        if all(prod_id < next_id for prod_id, next_id in zip(prod_ids, prod_ids[1:])):
+            # Product master files are usually already ordered by product id
+            self.prod_ids, self.offsets = prod_ids, offsets
+            return
+
+        # The sort is stable, so the last line of a repeated id is last among its lines, and replaces the others
+        # as in read_prod_master
+        for row in sorted(range(len(prod_ids)), key=prod_ids.__getitem__):
+            if self.prod_ids and self.prod_ids[-1] == prod_ids[row]:
+                self.offsets[-1] = offsets[row]
+
+            else:
+                self.prod_ids.append(prod_ids[row])
+                self.offsets.append(offsets[row])
+
+    def find_offset(self, prod_id: int) -> int:
+        """
+            Finds the byte offset of the line of a product
+
+            :param prod_id: id of the product (int)
+
+            :returns: byte offset (int)
+
+            :raises KeyError if the product id is not in the file
+        """
+
+        index: int = bisect_left(self.prod_ids, prod_id)
+
+        if index == len(self.prod_ids) or self.prod_ids[index] != prod_id:
+            raise KeyError(prod_id)
+
+        return self.offsets[index]
+
+    def parse_product(self, offset: int) -> Product:
+        """
+            Parses the product on the line at a byte offset of the file
+
+            :param offset: byte offset of the line (int)
+
+            :returns: product information (Product)
+        """
+
+        if self.infile is None:
+            self.infile = open(self.file_path, 'rb')
+
+        self.infile.seek(offset)
+        fields: list[bytes] = split_fields(self.infile.readline().rstrip(b"\r\n"))
+
+        try:
+            return Product(name=fields[1].decode("utf-8"),
+                           unit_price=Decimal(fields[2].decode("utf-8")),
+                           lot_size=int(fields[3]))
+
+        except (ValueError, IndexError, InvalidOperation):
+            invalid_prod_master_file(self.file_name)
+
+    def __getitem__(self, prod_id: int) -> Product:
+        with self.lock:
+            product: Product | None = self.products.get(prod_id)
+
+            if product is not None:
+                self.products.move_to_end(prod_id)
+                self.hits += 1
+
+                return product
+
+            product = self.products[prod_id] = self.parse_product(self.find_offset(prod_id))
+            self.misses += 1
+
+            if len(self.products) > self.max_products:
+                self.products.popitem(last=False)
+                self.evictions += 1
+
+            return product
+
+    def __contains__(self, prod_id: object) -> bool:
+        # Only the index is needed, so the product is not parsed
+        try:
+            self.find_offset(prod_id)
+
+        except (KeyError, TypeError):
+            return False
+
+        return True
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.prod_ids)
+
+    def __len__(self) -> int:
+        return len(self.prod_ids)
+
+    def stats(self) -> dict[str, int]:
+        """
+            Gets the counters of the cache of parsed products
+
+            :returns: dict with key = name of counter (str), value = count (int)
+        """
+
+        with self.lock:
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "entries": len(self.products)}
+
+    def close(self) -> None:
+        """Closes the file the products are read from. It is opened again if another product is looked up."""
+
+        with self.lock:
+            if self.infile is not None:
+                self.infile.close()
+                self.infile = None
+
+    def __getstate__(self) -> dict:
+        # Open files and locks cannot be pickled, so worker processes open their own
+        state: dict = self.__dict__.copy()
+        state.update(infile=None, lock=None)
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+
+def lazy_read_prod_master(file_name: str | None = None, max_products: int = LAZY_CACHE_PRODUCTS) -> LazyProductMaster:
+    """
+        Indexes the product master file by the byte offset of each product, without parsing the products.
+        Each product is parsed when it is first looked up, e.g. by get_product.
+
+        :param file_name: optional name of the file to be read (str or None). The file cannot be compressed.
+        :param max_products: number of parsed products kept in memory (int)
+
+        :returns: mapping with key = product id (int), value = Product
+    """
+
+    if file_name is None:
+        # Use default file name from config.py
+        file_name = DEFAULT_PROD_MASTER_FILE
+
+        print(f"Product Master file not specified. Default used: {file_name}")
+        print("To change this, run again with --product-master={name of file} or -p {name of file}\n")
+
+    return LazyProductMaster(file_name, max_products)
@@ -0,0 +1,292 @@
+# Defines a memory-mapped backend for reading the sales csv file.
+# The file is mapped instead of read, and split into line-aligned chunks by scanning for newlines.
+# Each chunk is split into fields with one bytes.split, and each column is parsed from a slice of the fields,
+# so no str or list is created for each row. The same line boundaries let worker processes each map the file
+# and parse a separate region of it. Discounts are stored in basis points, as by the fast backend.
+
+import mmap
+import os
+from array import array
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from decimal import InvalidOperation
+from itertools import repeat
+from .config import MMAP_CHUNK_SIZE
+from .fast_read import parse_fixed, precision_error, split_fields
+from .read import get_sales_file_name, get_seekable_infile_path, invalid_sales_file
+from ..models import BASIS_POINT_PLACES, SalesTable
+from ..profiling import record_rows
+
+# Number of columns of the sales file that are parsed
+SALES_COLUMNS: int = 5
+
+
+def index_line_bounds(buffer: bytes | mmap.mmap, start: int, end: int, chunk_size: int) -> list[int]:
+    """
+        Splits a range of a buffer into chunks of about chunk_size bytes that start and end on line boundaries
+
+        :param buffer: buffer to split, e.g. a memory-mapped file (bytes or mmap)
+        :param start: offset of the start of a line to start from (int)
+        :param end: offset to end at (int)
+        :param chunk_size: approximate size of each chunk in bytes (int)
+
+        :returns: list of offsets, starting with start and ending with end. Each pair of consecutive offsets is a chunk.
+    """
+
+    bounds: list[int] = [start]
+
+    while bounds[-1] < end:
+        offset: int = bounds[-1] + max(chunk_size, 1)
+
+        if offset >= end:
+            bounds.append(end)
+            break
+
+        # Move to the start of the line after the offset, unless the offset is already at a line start
+        newline: int = buffer.find(b"\n", offset - 1, end)
+        bounds.append(end if newline == -1 else newline + 1)
+
+    return bounds
+
+
+def split_quoted_chunk(chunk: bytes) -> list[list[bytes]]:
+    """
+        Splits a chunk of the sales file that contains quotes line by line, so quoted fields are read as by read.py
+
+        :param chunk: whole lines of the sales file (bytes)
+
+        :returns: list of the product id, team id, lots sold, and discount columns (list[bytes])
+
+        :raises IndexError if a line has too few columns
+    """
+
+    columns: list[list[bytes]] = [[], [], [], []]
+
+    for line in chunk.splitlines():
+        fields: list[bytes] = split_fields(line)
+
+        for column, field in zip(columns, fields[1:SALES_COLUMNS]):
+            column.append(field)
+
+        if len(fields) < SALES_COLUMNS:
+            raise IndexError("Too few columns")
+
+    return columns
+
+
+def split_chunk(chunk: bytes) -> list[list[bytes]]:
+    """
+        Splits a chunk of the sales file into columns with one split of the whole chunk
+
+        :param chunk: whole lines of the sales file (bytes)
+
+        :returns: list of the product id, team id, lots sold, and discount columns (list[bytes])
+
+        :raises IndexError if a line has too few columns, or lines have different numbers of columns
+    """
+
+    if b'"' in chunk:
+        return split_quoted_chunk(chunk)
+
+    text: bytes = chunk.replace(b"\r\n", b"\n")
+
+    if not text.endswith(b"\n"):
+        text += b"\n"
+
+    rows: int = text.count(b"\n")
+    column_count: int = text.count(b",", 0, text.find(b"\n")) + 1
+
+    if column_count < SALES_COLUMNS:
+        raise IndexError("Too few columns")
+
+    # Each newline becomes a field of its own, so a row with the wrong number of columns moves the newline
+    # fields out of the positions they are checked at
+    fields: list[bytes] = text.replace(b"\n", b",\n,").split(b",")
+    stride: int = column_count + 1
+
+    if len(fields) != rows * stride + 1 or fields[column_count::stride].count(b"\n") != rows:
+        raise IndexError("Lines have different numbers of columns")
+
+    return [fields[column::stride] for column in range(1, SALES_COLUMNS)]
+
+
+def count_lines(buffer: bytes | mmap.mmap, end: int) -> int:
+    """
+        Counts the lines before an offset of a buffer, one chunk at a time so the buffer is never copied whole
+
+        :param buffer: buffer to count in, e.g. a memory-mapped file (bytes or mmap)
+        :param end: offset to count up to (int)
+
+        :returns: number of newlines before the offset (int)
+    """
+
+    return sum(buffer[offset:min(offset + MMAP_CHUNK_SIZE, end)].count(b"\n")
+               for offset in range(0, end, MMAP_CHUNK_SIZE))
+
+
+def parse_chunk(chunk: bytes) -> tuple[SalesTable, int | None]:
+    """
+        Parses a chunk of the sales file into a table of sales data
+
+        :param chunk: whole lines of the sales file (bytes)
+
+        :returns: tuple of table of sales data (SalesTable), and the index of the first row with a discount
+            that has too many decimal places (int), or None if there is no such row
+
+        :raises ValueError, IndexError, InvalidOperation, or OverflowError if a line is invalid
+    """
+
+    prod_ids, team_ids, lots_sold, discounts = split_chunk(chunk)
+    disc_mants: list[int | None] = list(map(parse_fixed, discounts, repeat(BASIS_POINT_PLACES)))
+
+    if None in disc_mants:
+        return SalesTable(), disc_mants.index(None)
+
+    table = SalesTable()
+    table.prod_ids = array('q', map(int, prod_ids))
+    table.team_ids = array('q', map(int, team_ids))
+    table.lots_sold = array('q', map(int, lots_sold))
+    table.disc_mants = array('q', disc_mants)
+    table.disc_exps = array('b', [-BASIS_POINT_PLACES]) * len(disc_mants)
+
+    return table, None
+
+
+def parse_region(buffer: bytes | mmap.mmap, file_name: str, start: int, end: int) -> Iterator[SalesTable]:
+    """
+        Parses a line-aligned region of the sales file one chunk at a time
+
+        :param buffer: contents of the sales file, e.g. a memory-mapped file (bytes or mmap)
+        :param file_name: name of the sales file, used for error messages (str)
+        :param start: offset of the start of the region (int)
+        :param end: offset of the end of the region (int)
+
+        :returns: iterator of tables of sales data (SalesTable)
+    """
+
+    bounds: list[int] = index_line_bounds(buffer, start, end, MMAP_CHUNK_SIZE)
+
+    for chunk_start, chunk_end in zip(bounds, bounds[1:]):
+        chunk: bytes = buffer[chunk_start:chunk_end]
+
+        try:
+            table, precision_row = parse_chunk(chunk)
+
+        except (ValueError, IndexError, InvalidOperation, OverflowError):
+            invalid_sales_file(file_name)
+
+        if precision_row is not None:
+            line_num: int = count_lines(buffer, chunk_start) + precision_row + 1
+            line: bytes = chunk.splitlines()[precision_row]
+
+            precision_error(file_name, line_num, "Discount", split_fields(line)[4], reader="mmap")
+
+        record_rows("rows_read", len(table))
+        yield table
+
+
+def map_sales_file(file_name: str) -> mmap.mmap | bytes:
+    """
+        Memory-maps the sales file
+
+        :param file_name: name of the sales file (str)
+
+        :returns: mapped file (mmap), or empty bytes for an empty file
+    """
+
+    file_path = get_seekable_infile_path(file_name)
+
+    try:
+        with open(file_path, 'rb') as infile:
+            if os.fstat(infile.fileno()).st_size == 0:
+                # An empty file cannot be mapped
+                return b""
+
+            # The mapping stays valid after the file is closed
+            return mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+
+def mmap_stream_sales(file_name: str | None = None) -> Iterator[SalesTable]:
+    """
+        Reads sales file with the memory-mapped backend and returns an iterator over tables of sales data.
+        Each table holds one chunk of the file. Discounts are stored in basis points.
+
+        :param file_name: optional name of the file to be read (str or None)
+
+        :returns: iterator of tables of sales data (SalesTable)
+    """
+
+    file_name = get_sales_file_name(file_name)
+    buffer: mmap.mmap | bytes = map_sales_file(file_name)
+
+    return parse_region(buffer, file_name, 0, len(buffer))
+
+
+def mmap_stream_sales_range(file_name: str, start: int, end: int) -> Iterator[SalesTable]:
+    """
+        Maps the sales file and returns an iterator over tables of sales data from one line-aligned region of it,
+        e.g. a shard of get_sales_shards read by one worker process. Discounts are stored in basis points.
+
+        :param file_name: name of the sales file (str)
+        :param start: offset of the start of the region (int)
+        :param end: offset of the end of the region (int)
+
+        :returns: iterator of tables of sales data (SalesTable)
+    """
+
+    buffer: mmap.mmap | bytes = map_sales_file(file_name)
+
+    return parse_region(buffer, file_name, start, min(end, len(buffer)))
+
+
+def parse_sales_region(file_name: str, start: int, end: int) -> dict[str, array]:
+    """
+        Maps the sales file and parses one line-aligned region of it. Called in a worker process.
+
+        :param file_name: name of the sales file (str)
+        :param start: offset of the start of the region (int)
+        :param end: offset of the end of the region (int)
+
+        :returns: columns of the sales in the region, see SalesTable.columns
+    """
+
+    table = SalesTable()
+
+    for chunk_table in mmap_stream_sales_range(file_name, start, end):
+        table.extend_columns(chunk_table.columns())
+
+    return table.columns()
+
+
+def mmap_read_sales(file_name: str | None = None, workers: int = 1) -> SalesTable:
+    """
+        Reads sales file with the memory-mapped backend and returns a table of sales data from data in the file.
+        Discounts are stored in basis points.
+
+        :param file_name: optional name of the file to be read (str or None)
+        :param workers: number of worker processes that parse separate regions of the file (int)
+
+        :returns: table of sales data (SalesTable)
+    """
+
+    file_name = get_sales_file_name(file_name)
+    sales_table = SalesTable()
+
+    if workers <= 1:
+        for chunk_table in mmap_stream_sales(file_name):
+            sales_table.extend_columns(chunk_table.columns())
+
+        return sales_table
+
+    buffer: mmap.mmap | bytes = map_sales_file(file_name)
+    bounds: list[int] = index_line_bounds(buffer, 0, len(buffer), -(-len(buffer) // workers))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for columns in executor.map(parse_sales_region, repeat(file_name), bounds, bounds[1:]):
+            sales_table.extend_columns(columns)
+
+    return sales_table
@@ -1,43 +1,133 @@
 # Defines functions for reading the team map, product master, and sales csv files.
 
 import csv
-from decimal import Decimal
-from ..models import Product, Sale
+import os
+from collections.abc import Callable, Iterator
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import chain, islice
+from .arrow_io import is_columnar_file, read_columnar_prod_master, read_columnar_team_map, stream_columnar_sales
+from .compression import DECOMPRESSION_ERRORS, get_compression, open_file, strip_compression
+from .cache import CorruptCacheError, cache_sales, columns_to_prod_master, columns_to_team_map, get_source_stat, \
+    load_cache, load_cache_table, prod_master_to_columns, sales_table_to_columns, save_cache, team_map_to_columns
+from ..models import BatchJob, Product, Sale, SalesTable
+from ..profiling import count_rows
 from .config import DEFAULT_PROD_MASTER_FILE, DEFAULT_SALES_FILE, \
-    DEFAULT_TEAM_MAP_FILE, SOURCE_FOLDER
+    DEFAULT_TEAM_MAP_FILE, SALES_BATCH_SIZE, SALES_DATE_COLUMN, SOURCE_FOLDER
 
 
-def read_infile(file_name: str) -> tuple[list[str]]:
+def get_infile_path(file_name: str) -> str:
     """
-        Reads a generic .csv input file
+        Gets the path of a generic .csv input file, which may be compressed, e.g. Sales.csv.gz
 
         :param file_name: name of source file (str)
 
-        :returns: tuple of file contents
+        :returns: path of source file (str)
+    """
+
+    if strip_compression(file_name)[-4:] != ".csv":
+        print("Error: Input files must be specified as .csv files, optionally compressed as .gz, .bz2, .xz, or .zst")
+        exit()
+
+    return f"{SOURCE_FOLDER}\\{file_name}"
+
+
+def get_seekable_infile_path(file_name: str) -> str:
     """
+        Gets the path of a generic .csv input file that is read by byte offset, so cannot be compressed
+
+        :param file_name: name of source file (str)
 
-    if file_name[-4:] != ".csv":
-        print("Error: Input files must be specified as .csv files")
+        :returns: path of source file (str)
+    """
+
+    if get_compression(file_name) is not None:
+        print(f"Error: {file_name} is compressed, so it cannot be read by byte offset. Decompress it to use "
+              f"--incremental, --workers, or date ranges.")
         exit()
 
-    file_path = f"{SOURCE_FOLDER}\\{file_name}"
+    return get_infile_path(file_name)
+
+
+def corrupt_infile(file_path: str) -> None:
+    """
+        Prints an error for a compressed input file that could not be decompressed and exits
+
+        :param file_path: path of the corrupt file (str)
+    """
+
+    print(f"Error: Input file at {file_path} is corrupt and could not be decompressed\n")
+    exit()
+
+
+def stream_infile(file_name: str) -> Iterator[list[str]]:
+    """
+        Opens a generic .csv input file and returns an iterator over its rows.
+        Rows are read from disk one at a time, so the file never has to fit in memory.
+
+        :param file_name: name of source file (str)
+
+        :returns: iterator of file rows (list[str])
+    """
+
+    file_path = get_infile_path(file_name)
 
+    # The file is opened here rather than in the generator so a missing file is reported immediately
     try:
-        with open(file_path, 'r', encoding="utf-8") as infile:
-            csv_rows: tuple[list[str]] = tuple(csv.reader(infile))
+        # Compressed files are decompressed as they are read
+        infile = open_file(file_path, 'r', encoding="utf-8")
 
     except FileNotFoundError:
         print(f"Error: Input file not found at {file_path}\n")
         exit()
 
+    def rows() -> Iterator[list[str]]:
+        with infile:
+            try:
+                yield from count_rows(csv.reader(infile), "rows_read")
+
+            except DECOMPRESSION_ERRORS:
+                corrupt_infile(file_path)
+
+    return rows()
+
+
+def read_infile(file_name: str) -> tuple[list[str]]:
+    """
+        Reads a generic .csv input file
+
+        :param file_name: name of source file (str)
+
+        :returns: tuple of file contents
+    """
+
+    csv_rows: tuple[list[str]] = tuple(stream_infile(file_name))
+
     return csv_rows
 
 
-def read_prod_master(file_name: str | None = None) -> dict[int, Product]:
+def invalid_prod_master_file(file_name: str) -> None:
+    """
+        Prints the product master file format and exits. Called when a row of the product master cannot be parsed.
+
+        :param file_name: name of the invalid file (str)
+    """
+
+    print(f"Error: Product Master input file ({SOURCE_FOLDER}\\{file_name}) is invalid.")
+    print("Ensure the the data in the file is as follows:")
+    print("     Column 1: int (Product ID)")
+    print("     Column 2: string (Name)")
+    print("     Column 3: float (Price)")
+    print("     Column 4: int (Lot Size)")
+    exit()
+
+
+def read_prod_master(file_name: str | None = None, use_cache: bool = False) -> dict[int, Product]:
     """
         Reads product master file and returns a dictionary of product information from data in the file
 
         :param file_name: optional name of the file to be read (str or None)
+        :param use_cache: bool to specify if the parsed file should be loaded from and saved to the cache
 
         :returns: dictionary with key = product id (int), value = product info (Product)
     """
@@ -49,6 +139,21 @@ def read_prod_master(file_name: str | None = None) -> dict[int, Product]:
         print(f"Product Master file not specified. Default used: {file_name}")
         print("To change this, run again with --product-master={name of file} or -p {name of file}\n")
 
+    if is_columnar_file(file_name):
+        # Parquet and Arrow files are already typed, so they are read directly instead of through the cache
+        try:
+            return read_columnar_prod_master(file_name)
+
+        except (ValueError, TypeError, IndexError, InvalidOperation):
+            invalid_prod_master_file(file_name)
+
+    if use_cache:
+        cached_table: dict | None = load_cache_table(file_name, get_infile_path(file_name))
+
+        if cached_table is not None:
+            return columns_to_prod_master(cached_table)
+
+    source_stat: os.stat_result | None = get_source_stat(get_infile_path(file_name)) if use_cache else None
     csv_rows = read_infile(file_name)
 
     # Create product master output dict
@@ -65,26 +170,73 @@ def read_prod_master(file_name: str | None = None) -> dict[int, Product]:
                             lot_size=int(row[3]))
             })
 
-        return prod_master
+    except (ValueError, IndexError, InvalidOperation):
+        invalid_prod_master_file(file_name)
 
-    except (ValueError, IndexError):
+    if use_cache:
+        save_cache(file_name, get_infile_path(file_name), source_stat, prod_master_to_columns, prod_master)
 
-        print(f"Error: Product Master input file ({SOURCE_FOLDER}\\{file_name}) is invalid.")
-        print("Ensure the the data in the file is as follows:")
-        print("     Column 1: int (Product ID)")
-        print("     Column 2: string (Name)")
-        print("     Column 3: float (Price)")
-        print("     Column 4: int (Lot Size)")
-        exit()
+    return prod_master
 
 
-def read_sales(file_name: str | None = None) -> tuple[Sale]:
+def parse_sale(row: list[str]) -> Sale:
     """
-        Reads sales file and returns a tuple of sales data from data in the file
+        Creates a sale from a row of the sales file
 
-        :param file_name: optional name of the file to be read (str or None)
+        :param row: row of the sales file (list[str])
 
-        :returns: tuple of sales data (Sale)
+        :returns: sale data (Sale)
+
+        :raises ValueError, IndexError, or InvalidOperation if the row is invalid
+    """
+
+    return Sale(
+        prod_id=int(row[1]),
+        team_id=int(row[2]),
+        lots_sold=int(row[3]),
+        discount=Decimal(row[4])
+    )
+
+
+def parse_dated_sale(row: list[str]) -> tuple[date, Sale]:
+    """
+        Creates a sale and its date from a row of the sales file
+
+        :param row: row of the sales file (list[str])
+
+        :returns: tuple of sale date (date) and sale data (Sale)
+
+        :raises ValueError, IndexError, or InvalidOperation if the row is invalid or has no date
+    """
+
+    return date.fromisoformat(row[SALES_DATE_COLUMN]), parse_sale(row)
+
+
+def invalid_sales_file(file_name: str) -> None:
+    """
+        Prints the sales file format and exits. Called when a row of the sales file cannot be parsed.
+
+        :param file_name: name of the invalid file (str)
+    """
+
+    print(f"Error: Sales Data input file ({SOURCE_FOLDER}\\{file_name}) is invalid.")
+    print("Ensure the the data in the file is as follows:")
+    print("     Column 1: int (Sale ID)")
+    print("     Column 2: int (Product ID)")
+    print("     Column 3: int (Team ID)")
+    print("     Column 4: int (Lots Sold)")
+    print("     Column 4: float (Discount)")
+    print(f"     Column {SALES_DATE_COLUMN + 1}: date as YYYY-MM-DD (Sale Date, only required for date ranges)")
+    exit()
+
+
+def get_sales_file_name(file_name: str | None) -> str:
+    """
+        Returns the sales file name, falling back to the default from config.py
+
+        :param file_name: optional name of the sales file (str or None)
+
+        :returns: name of the sales file (str)
     """
 
     if file_name is None:
@@ -94,39 +246,291 @@ def read_sales(file_name: str | None = None) -> tuple[Sale]:
         print(f"Sales file not specified. Default used: {file_name}")
         print("To change this, run again with --sales={name of file} or -s {name of file}\n")
 
-    csv_rows: tuple[list[str]] = read_infile(file_name)
+    return file_name
+
+
+def batch_sales(csv_rows: Iterator[list[str]],
+                file_name: str,
+                batch_size: int,
+                parse_row: Callable[[list[str]], Sale | tuple[date, Sale]] = parse_sale
+                ) -> Iterator[list[Sale]]:
+    """
+        Parses rows of the sales file into batches of sales data
+
+        :param csv_rows: iterator of rows of the sales file (list[str])
+        :param file_name: name of the sales file, used for error messages (str)
+        :param batch_size: maximum number of sales in each batch (int)
+        :param parse_row: function that parses a row of the sales file. Use parse_dated_sale to also parse
+            the sale date.
+
+        :returns: iterator of lists of sales data (Sale), or of (date, Sale) if parse_dated_sale is used
+    """
+
+    batch: list[Sale] = []
 
-    # Create sales data output tuple
     try:
 
-        sales_data: tuple[Sale] = tuple(
-            Sale(
-                prod_id=int(sale[1]),
-                team_id=int(sale[2]),
-                lots_sold=int(sale[3]),
-                discount=Decimal(sale[4])
-            )
-            for sale in csv_rows)
+        for row in csv_rows:
+            batch.append(parse_row(row))
 
-        return sales_data
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
 
-    except (ValueError, IndexError):
+    except (ValueError, IndexError, InvalidOperation):
+        invalid_sales_file(file_name)
 
-        print(f"Error: Sales Data input file ({SOURCE_FOLDER}\\{file_name}) is invalid.")
-        print("Ensure the the data in the file is as follows:")
-        print("     Column 1: int (Sale ID)")
-        print("     Column 2: int (Product ID)")
-        print("     Column 3: int (Team ID)")
-        print("     Column 4: int (Lots Sold)")
-        print("     Column 4: float (Discount)")
+    if batch:
+        yield batch
+
+
+def check_sales_batches(sales_batches: Iterator[list[Sale]], file_name: str) -> Iterator[list[Sale]]:
+    """
+        Passes through batches of sales data, printing the sales file format and exiting if a batch cannot be parsed
+
+        :param sales_batches: iterator of lists of sales data (Sale)
+        :param file_name: name of the sales file, used for error messages (str)
+
+        :returns: iterator of lists of sales data (Sale)
+    """
+
+    try:
+        yield from sales_batches
+
+    except (ValueError, TypeError, IndexError, InvalidOperation):
+        invalid_sales_file(file_name)
+
+
+def read_sales(file_name: str | None = None, use_cache: bool = False) -> tuple[Sale]:
+    """
+        Reads sales file and returns a tuple of sales data from data in the file
+
+        :param file_name: optional name of the file to be read (str or None)
+        :param use_cache: bool to specify if the parsed file should be loaded from and saved to the cache
+
+        :returns: tuple of sales data (Sale)
+    """
+
+    sales_data: tuple[Sale] = tuple(chain.from_iterable(stream_sales(file_name, use_cache=use_cache)))
+
+    return sales_data
+
+
+def read_sales_table(file_name: str | None = None, use_cache: bool = False) -> SalesTable:
+    """
+        Reads sales file and returns a struct-of-arrays table of sales data from data in the file.
+        The table uses a fraction of the memory of read_sales, and can be used anywhere read_sales is.
+
+        :param file_name: optional name of the file to be read (str or None)
+        :param use_cache: bool to specify if the parsed file should be loaded from and saved to the cache
+
+        :returns: table of sales data (SalesTable)
+    """
+
+    file_name = get_sales_file_name(file_name)
+    sales_table = SalesTable()
+
+    if is_columnar_file(file_name):
+        for batch in check_sales_batches(stream_columnar_sales(file_name), file_name):
+            sales_table.extend(batch)
+
+        return sales_table
+
+    if use_cache:
+        cached_chunks: Iterator[dict] | None = load_cache(file_name, get_infile_path(file_name))
+
+        if cached_chunks is not None:
+            try:
+                for chunk in cached_chunks:
+                    sales_table.extend_columns(chunk)
+
+                return sales_table
+
+            except CorruptCacheError:
+                # The corrupt cache has been deleted, so the file is parsed again and cached anew
+                sales_table = SalesTable()
+
+    source_stat: os.stat_result | None = get_source_stat(get_infile_path(file_name)) if use_cache else None
+
+    for batch in batch_sales(stream_infile(file_name), file_name, SALES_BATCH_SIZE):
+        sales_table.extend(batch)
+
+    if use_cache:
+        save_cache(file_name, get_infile_path(file_name), source_stat, sales_table_to_columns, sales_table)
+
+    return sales_table
+
+
+def stream_sales(file_name: str | None = None,
+                 batch_size: int = SALES_BATCH_SIZE,
+                 use_cache: bool = False
+                 ) -> Iterator[list[Sale] | SalesTable]:
+    """
+        Reads sales file incrementally and returns an iterator over batches of sales data.
+        Only one batch is held in memory at a time, so memory use does not grow with the size of the file.
+
+        :param file_name: optional name of the file to be read (str or None)
+        :param batch_size: maximum number of sales in each batch (int).
+            Batches loaded from the cache keep the size they were saved with.
+        :param use_cache: bool to specify if the parsed file should be loaded from and saved to the cache
+
+        :returns: iterator of lists of sales data (Sale), or of tables of sales data (SalesTable)
+            when the file is loaded from the cache
+    """
+
+    file_name = get_sales_file_name(file_name)
+
+    if is_columnar_file(file_name):
+        # Parquet and Arrow files are read one record batch at a time without the cache
+        return check_sales_batches(stream_columnar_sales(file_name, batch_size), file_name)
+
+    if use_cache:
+        cached_chunks: Iterator[dict] | None = load_cache(file_name, get_infile_path(file_name))
+
+        if cached_chunks is not None:
+            return stream_cached_sales(file_name, cached_chunks, batch_size)
+
+    csv_rows: Iterator[list[str]] = stream_infile(file_name)
+    batches: Iterator[list[Sale]] = batch_sales(csv_rows, file_name, batch_size)
+
+    if use_cache:
+        return cache_sales(file_name, get_infile_path(file_name), batches)
+
+    return batches
+
+
+def stream_cached_sales(file_name: str,
+                        cached_chunks: Iterator[dict],
+                        batch_size: int
+                        ) -> Iterator[list[Sale] | SalesTable]:
+    """
+        Streams batches of sales data from the cache of the sales file.
+        If a chunk of the cache is corrupt, the cache is deleted and the rest of the sales are parsed from the file.
+
+        :param file_name: name of the sales file (str)
+        :param cached_chunks: iterator of chunks of the cache, see load_cache
+        :param batch_size: maximum number of sales in each batch parsed from the file (int)
+
+        :returns: iterator of tables of sales data (SalesTable), followed by lists of sales data (Sale)
+            if the cache is corrupt
+    """
+
+    rows_loaded: int = 0
+
+    try:
+        for chunk in cached_chunks:
+            table: SalesTable = SalesTable.from_columns(chunk)
+            rows_loaded += len(table)
+
+            yield table
+
+    except CorruptCacheError:
+        # The sales already loaded are skipped, and the rest are cached again on the next run
+        yield from batch_sales(islice(stream_infile(file_name), rows_loaded, None), file_name, batch_size)
+
+
+def get_sales_shards(file_name: str, shard_count: int) -> list[tuple[int, int]]:
+    """
+        Splits the sales file into byte ranges that start and end on line boundaries
+
+        :param file_name: name of the sales file (str)
+        :param shard_count: number of byte ranges to split the file into (int)
+
+        :returns: list of (start, end) byte offsets. Fewer ranges are returned if the file has too few lines.
+    """
+
+    file_path = get_seekable_infile_path(file_name)
+
+    try:
+        file_size: int = os.path.getsize(file_path)
+
+        bounds: list[int] = [0]
+
+        with open(file_path, 'rb') as infile:
+
+            for shard in range(1, shard_count):
+                offset: int = max(file_size * shard // shard_count, bounds[-1])
+
+                # Move to the start of the line after the offset, unless the offset is already at a line start
+                if offset > 0:
+                    infile.seek(offset - 1)
+                    infile.readline()
+                    offset = infile.tell()
+
+                bounds.append(min(offset, file_size))
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
         exit()
 
+    bounds.append(file_size)
+
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def stream_sales_range(file_name: str,
+                       start: int,
+                       end: int | None = None,
+                       batch_size: int = SALES_BATCH_SIZE,
+                       parse_row: Callable[[list[str]], Sale | tuple[date, Sale]] = parse_sale
+                       ) -> Iterator[list[Sale]]:
+    """
+        Reads the lines of the sales file that start within a byte range and returns an iterator over
+        batches of sales data. The range should start on a line boundary, see get_sales_shards.
+
+        :param file_name: name of the sales file (str)
+        :param start: byte offset of the first line to read (int)
+        :param end: optional byte offset to stop reading at, or None to read to the end of the file (int or None)
+        :param batch_size: maximum number of sales in each batch (int)
+        :param parse_row: function that parses a row of the sales file, see batch_sales
 
-def read_team_map(file_name: str | None = None) -> dict[int, str]:
+        :returns: iterator of lists of sales data (Sale)
+    """
+
+    file_path = get_seekable_infile_path(file_name)
+
+    try:
+        infile = open(file_path, 'rb')
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+    def lines() -> Iterator[str]:
+        with infile:
+            infile.seek(start)
+            offset: int = start
+
+            for line in infile:
+                if end is not None and offset >= end:
+                    break
+
+                offset += len(line)
+                yield line.decode("utf-8")
+
+    return batch_sales(count_rows(csv.reader(lines()), "rows_read"), file_name, batch_size, parse_row)
+
+
+def invalid_team_map_file(file_name: str) -> None:
+    """
+        Prints the team map file format and exits. Called when a row of the team map cannot be parsed.
+
+        :param file_name: name of the invalid file (str)
+    """
+
+    print(f"Error: Team Map input file ({SOURCE_FOLDER}\\{file_name}) is invalid.")
+    print("Ensure the the data in the file is as follows:")
+    print("     Column 1: int (Team ID)")
+    print("     Column 2: string (Name)")
+    exit()
+
+
+def read_team_map(file_name: str | None = None, use_cache: bool = False) -> dict[int, str]:
     """
         Reads team map file and returns a dictionary of the team names from data in the file
 
         :param file_name: optional name of the file to be read (str or None)
+        :param use_cache: bool to specify if the parsed file should be loaded from and saved to the cache
 
         :returns: dictionary with key = team id (int), value = team name (str)
     """
@@ -138,18 +542,59 @@ def read_team_map(file_name: str | None = None) -> dict[int, str]:
         print(f"Team Map file not specified. Default used: {file_name}")
         print("To change this, run again with --team-map={name of file} or -t {name of file}\n")
 
+    if is_columnar_file(file_name):
+        # Parquet and Arrow files are already typed, so they are read directly instead of through the cache
+        try:
+            return read_columnar_team_map(file_name)
+
+        except (ValueError, TypeError, IndexError):
+            invalid_team_map_file(file_name)
+
+    if use_cache:
+        cached_table: dict | None = load_cache_table(file_name, get_infile_path(file_name))
+
+        if cached_table is not None:
+            return columns_to_team_map(cached_table)
+
+    source_stat: os.stat_result | None = get_source_stat(get_infile_path(file_name)) if use_cache else None
     csv_rows: tuple[list[str]] = read_infile(file_name)
 
     # Create team map output dict
     try:
         team_map: dict[int, str] = {int(row[0]): row[1] for row in csv_rows[1:]}
 
-        return team_map
-
     except (ValueError, IndexError):
+        invalid_team_map_file(file_name)
+
+    if use_cache:
+        save_cache(file_name, get_infile_path(file_name), source_stat, team_map_to_columns, team_map)
 
-        print(f"Error: Team Map input file ({SOURCE_FOLDER}\\{file_name}) is invalid.")
+    return team_map
+
+
+def read_manifest(file_name: str) -> list[BatchJob]:
+    """
+        Reads a batch manifest file and returns the jobs listed in it
+
+        :param file_name: name of the manifest file to be read (str)
+
+        :returns: list of jobs (BatchJob)
+    """
+
+    csv_rows: tuple[list[str]] = read_infile(file_name)
+
+    # Create list of jobs, skipping blank rows
+    try:
+        jobs: list[BatchJob] = [BatchJob(sales_fn=row[0], team_report_fn=row[1], prod_report_fn=row[2])
+                                for row in csv_rows[1:] if row]
+
+    except IndexError:
+
+        print(f"Error: Manifest input file ({SOURCE_FOLDER}\\{file_name}) is invalid.")
         print("Ensure the the data in the file is as follows:")
-        print("     Column 1: int (Team ID)")
-        print("     Column 2: string (Name)")
+        print("     Column 1: string (Sales File)")
+        print("     Column 2: string (Team Report File)")
+        print("     Column 3: string (Product Report File)")
         exit()
+
+    return jobs
@@ -0,0 +1,449 @@
+# Defines an optional SQLite backend for the team map and product master, and for saving the reports.
+# Each reference file is imported into an indexed table of a local database, and only imported again when the file
+# changes. A run then looks up only the team and product ids its sales refer to, a batch of ids at a time, instead of
+# loading every product into memory. The reports can also be saved to tables, to be queried without parsing .csv files.
+# Prices are stored as text so they are read back as the same Decimal.
+
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Callable, ItemsView, Iterable, Iterator, Mapping
+from decimal import Decimal, InvalidOperation
+from typing import Any
+from .arrow_io import is_columnar_file, read_columnar_prod_master, read_columnar_team_map
+from .config import CACHE_FOLDER, DB_LOOKUP_BATCH_SIZE, DEFAULT_DB_FILE, DEFAULT_PROD_MASTER_FILE, \
+    DEFAULT_SALES_FILE, DEFAULT_TEAM_MAP_FILE, SOURCE_FOLDER
+from .read import invalid_prod_master_file, invalid_team_map_file, stream_infile
+from ..models import CENT_PLACES, Product, ProductSaleData, to_scaled_int
+
+# Tables of the database. The imports table records the file each reference table was imported from.
+DB_SCHEMA: str = """
+    CREATE TABLE IF NOT EXISTS imports (
+        table_name TEXT PRIMARY KEY,
+        file_name TEXT NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS teams (
+        team_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS products (
+        prod_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        unit_price TEXT NOT NULL,
+        lot_size INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS team_report (
+        sales_file TEXT NOT NULL,
+        team TEXT NOT NULL,
+        gross_revenue_cents INTEGER NOT NULL,
+        PRIMARY KEY (sales_file, team)
+    );
+    CREATE TABLE IF NOT EXISTS product_report (
+        sales_file TEXT NOT NULL,
+        product TEXT NOT NULL,
+        gross_revenue_cents INTEGER NOT NULL,
+        units_sold INTEGER NOT NULL,
+        discount_cost_cents INTEGER NOT NULL,
+        PRIMARY KEY (sales_file, product)
+    );
+"""
+
+
+def get_db_path(file_name: str) -> str:
+    """
+        Gets the path of a database in the cache folder
+
+        :param file_name: name of the database file (str)
+
+        :returns: path of the database file (str)
+    """
+
+    return f"{CACHE_FOLDER}\\{file_name}"
+
+
+def connect_db(db_path: str) -> sqlite3.Connection:
+    """
+        Opens a database, creating its tables if they do not exist
+
+        :param db_path: path of the database file (str)
+
+        :returns: connection to the database (sqlite3.Connection)
+    """
+
+    try:
+        # Connections can be used by the thread that reads the sales as well as the one that opened them
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+
+        # With a write-ahead log, readers are not blocked by a write, and a commit only needs to sync the log
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(DB_SCHEMA)
+
+    except sqlite3.Error as exc:
+        print(f"Error: Database at {db_path} could not be opened ({exc}). Ensure the cache folder "
+              f"({CACHE_FOLDER}) exists.\n")
+        exit()
+
+    return conn
+
+
+class DbMapping(Mapping, ABC):
+    """
+        Read-only mapping over a reference table of the database. Rows are looked up when first used and then
+        kept in memory, so only the rows that are used are ever loaded.
+    """
+
+    table: str = ""
+    key_column: str = ""
+    value_columns: tuple[str, ...] = ()
+
+    def __init__(self, db_path: str):
+        self.db_path: str = db_path
+        self.conn: sqlite3.Connection | None = None
+        self.rows: dict[int, Any] = {}  # rows that have been looked up
+        self.missing: set[int] = set()  # ids that have been looked up and are not in the table
+        self.queries: int = 0
+
+    @abstractmethod
+    def to_value(self, row: tuple) -> Any:
+        """
+            Creates the value of a row of the table
+
+            :param row: value columns of the row (tuple)
+
+            :returns: value of the row
+        """
+
+    def get_conn(self) -> sqlite3.Connection:
+        """
+            Gets the connection to the database, opening it when first used
+
+            :returns: connection to the database (sqlite3.Connection)
+        """
+
+        if self.conn is None:
+            self.conn = connect_db(self.db_path)
+
+        return self.conn
+
+    def select_rows(self, clause: str, params: Iterable = ()) -> sqlite3.Cursor:
+        """
+            Selects the id and value columns of rows of the table
+
+            :param clause: WHERE or ORDER BY clause of the query (str)
+            :param params: parameters of the clause
+
+            :returns: cursor over the rows, each a tuple of id followed by the value columns
+        """
+
+        return self.get_conn().execute(f"SELECT {self.key_column}, {', '.join(self.value_columns)} "
+                                       f"FROM {self.table} {clause}", params)
+
+    def prefetch(self, ids: Iterable[int]) -> None:
+        """
+            Looks up the rows of ids that have not been looked up yet, DB_LOOKUP_BATCH_SIZE ids with each query
+
+            :param ids: ids to look up (int), which may repeat
+        """
+
+        new_ids: list[int] = [id_ for id_ in set(ids) if id_ not in self.rows and id_ not in self.missing]
+
+        for start in range(0, len(new_ids), DB_LOOKUP_BATCH_SIZE):
+            batch_ids: list[int] = new_ids[start:start + DB_LOOKUP_BATCH_SIZE]
+            placeholders: str = ",".join("?" * len(batch_ids))
+
+            self.queries += 1
+
+            for key, *row in self.select_rows(f"WHERE {self.key_column} IN ({placeholders})", batch_ids):
+                self.rows[key] = self.to_value(row)
+
+            self.missing.update(id_ for id_ in batch_ids if id_ not in self.rows)
+
+    def __getitem__(self, id_: int) -> Any:
+        value: Any = self.rows.get(id_)
+
+        if value is None:
+            if id_ not in self.missing:
+                self.prefetch((id_,))
+
+            value = self.rows.get(id_)
+
+            if value is None:
+                raise KeyError(id_)
+
+        return value
+
+    def __iter__(self) -> Iterator[int]:
+        return (key for key, in self.get_conn().execute(f"SELECT {self.key_column} FROM {self.table} "
+                                                        f"ORDER BY {self.key_column}"))
+
+    def __len__(self) -> int:
+        return self.get_conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def iter_rows(self) -> Iterator[tuple[int, Any]]:
+        """
+            Reads every row of the table in one query, without keeping the rows in memory
+
+            :returns: iterator of (id, value) tuples, ordered by id
+        """
+
+        return ((key, self.to_value(row))
+                for key, *row in self.select_rows(f"ORDER BY {self.key_column}"))
+
+    def items(self) -> ItemsView:
+        return DbItemsView(self)
+
+    def __getstate__(self) -> dict:
+        # Connections cannot be pickled, so worker processes open their own
+        return {"db_path": self.db_path, "rows": self.rows, "missing": self.missing, "queries": self.queries}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.conn = None
+
+
+class DbItemsView(ItemsView):
+    """Items of a DbMapping, iterated with one query instead of a lookup per id"""
+
+    _mapping: DbMapping
+
+    def __iter__(self) -> Iterator[tuple[int, Any]]:
+        return self._mapping.iter_rows()
+
+
+class DbTeamMap(DbMapping):
+    """Team map in the database, mapping team id (int) to team name (str)"""
+
+    table = "teams"
+    key_column = "team_id"
+    value_columns = ("name",)
+
+    def to_value(self, row: tuple) -> str:
+        return row[0]
+
+
+class DbProductMaster(DbMapping):
+    """Product master in the database, mapping product id (int) to Product"""
+
+    table = "products"
+    key_column = "prod_id"
+    value_columns = ("name", "unit_price", "lot_size")
+
+    def to_value(self, row: tuple) -> Product:
+        return Product(name=row[0], unit_price=Decimal(row[1]), lot_size=row[2])
+
+
+def import_table(db_path: str,
+                 mapping: type[DbMapping],
+                 file_name: str,
+                 read_rows: Callable[[], Iterable[tuple]]
+                 ) -> bool:
+    """
+        Imports the rows of a reference file into a table of the database, unless the table was already imported
+        from the file and the file has not changed since. The table is replaced in one transaction.
+
+        :param db_path: path of the database file (str)
+        :param mapping: class of the mapping over the table (DbTeamMap or DbProductMaster)
+        :param file_name: name of the reference file (str)
+        :param read_rows: function that reads the file, returning an iterable of rows of the table (tuple).
+            Only called if the file is imported. A row with the same id as an earlier row replaces it.
+
+        :returns: bool indicating if the file was imported
+
+        :raises ValueError, TypeError, IndexError, InvalidOperation, or OverflowError if a row of the file is invalid
+    """
+
+    file_path: str = f"{SOURCE_FOLDER}\\{file_name}"
+
+    try:
+        stat: os.stat_result = os.stat(file_path)
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+    stamp: tuple[str, int, int] = (file_name, stat.st_mtime_ns, stat.st_size)
+    placeholders: str = ",".join("?" * (len(mapping.value_columns) + 1))
+
+    conn: sqlite3.Connection = connect_db(db_path)
+
+    try:
+        imported: tuple | None = conn.execute("SELECT file_name, mtime_ns, size FROM imports WHERE table_name = ?",
+                                              (mapping.table,)).fetchone()
+
+        if imported == stamp:
+            return False
+
+        # The rows are replaced and the import recorded together, so a failed import is tried again next time
+        with conn:
+            conn.execute(f"DELETE FROM {mapping.table}")
+            conn.executemany(f"INSERT OR REPLACE INTO {mapping.table} VALUES ({placeholders})", read_rows())
+            conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?)", (mapping.table, *stamp))
+
+    except sqlite3.Error as exc:
+        print(f"Error: {file_name} could not be imported into the database at {db_path} ({exc})\n")
+        exit()
+
+    finally:
+        conn.close()
+
+    return True
+
+
+def get_db_file_name(db_fn: str | None) -> str:
+    """
+        Returns the database file name, falling back to the default from config.py
+
+        :param db_fn: optional name of the database file (str or None)
+
+        :returns: name of the database file (str)
+    """
+
+    return db_fn if db_fn is not None else DEFAULT_DB_FILE
+
+
+def read_team_map_rows(file_name: str) -> Iterable[tuple[int, str]]:
+    """
+        Reads the rows of the team map file to import into the teams table
+
+        :param file_name: name of the team map file (str)
+
+        :returns: iterable of (team id, name), parsed as they are iterated
+    """
+
+    if is_columnar_file(file_name):
+        # Parquet and Arrow files are already typed, so they are read directly
+        return read_columnar_team_map(file_name).items()
+
+    # The first row of the team map is its header
+    csv_rows: Iterator[list[str]] = stream_infile(file_name)
+    next(csv_rows, None)
+
+    return ((int(row[0]), row[1]) for row in csv_rows)
+
+
+def read_prod_master_rows(file_name: str) -> Iterable[tuple[int, str, str, int]]:
+    """
+        Reads the rows of the product master file to import into the products table
+
+        :param file_name: name of the product master file (str)
+
+        :returns: iterable of (product id, name, unit price, lot size), parsed as they are iterated.
+            Unit prices are written as text.
+    """
+
+    if is_columnar_file(file_name):
+        # Parquet and Arrow files are already typed, so they are read directly
+        return ((prod_id, product.name, str(product.unit_price), product.lot_size)
+                for prod_id, product in read_columnar_prod_master(file_name).items())
+
+    return ((int(row[0]), row[1], str(Decimal(row[2])), int(row[3])) for row in stream_infile(file_name))
+
+
+def db_read_team_map(db_fn: str | None = None, file_name: str | None = None) -> DbTeamMap:
+    """
+        Imports the team map file into the database if it has changed, and returns the team map in the database.
+        Team names are only looked up when they are used.
+
+        :param db_fn: optional name of the database file in the cache folder (str or None)
+        :param file_name: optional name of the team map file (str or None)
+
+        :returns: mapping with key = team id (int), value = team name (str)
+    """
+
+    if file_name is None:
+        # Use default file name from config.py
+        file_name = DEFAULT_TEAM_MAP_FILE
+
+        print(f"Team Map file not specified. Default used: {file_name}")
+        print("To change this, run again with --team-map={name of file} or -t {name of file}\n")
+
+    db_path: str = get_db_path(get_db_file_name(db_fn))
+
+    try:
+        import_table(db_path, DbTeamMap, file_name, lambda: read_team_map_rows(file_name))
+
+    except (ValueError, TypeError, IndexError, OverflowError):
+        invalid_team_map_file(file_name)
+
+    return DbTeamMap(db_path)
+
+
+def db_read_prod_master(db_fn: str | None = None, file_name: str | None = None) -> DbProductMaster:
+    """
+        Imports the product master file into the database if it has changed, and returns the product master in
+        the database. Products are only looked up when they are used.
+
+        :param db_fn: optional name of the database file in the cache folder (str or None)
+        :param file_name: optional name of the product master file (str or None)
+
+        :returns: mapping with key = product id (int), value = Product
+    """
+
+    if file_name is None:
+        # Use default file name from config.py
+        file_name = DEFAULT_PROD_MASTER_FILE
+
+        print(f"Product Master file not specified. Default used: {file_name}")
+        print("To change this, run again with --product-master={name of file} or -p {name of file}\n")
+
+    db_path: str = get_db_path(get_db_file_name(db_fn))
+
+    try:
+        import_table(db_path, DbProductMaster, file_name, lambda: read_prod_master_rows(file_name))
+
+    except (ValueError, TypeError, IndexError, InvalidOperation, OverflowError):
+        invalid_prod_master_file(file_name)
+
+    return DbProductMaster(db_path)
+
+
+def save_rpts_to_db(db_fn: str | None,
+                    sales_fn: str | None,
+                    team_rpt: dict[str, Decimal],
+                    prod_rpt: dict[str, ProductSaleData]
+                    ) -> bool:
+    """
+        Saves the team report and product report of a sales file to the team_report and product_report tables
+        of the database, replacing the rows saved for the sales file before. Amounts are rounded to the cent
+        as in the report files, and saved as integer cents.
+
+        :param db_fn: optional name of the database file in the cache folder (str or None)
+        :param sales_fn: optional name of the sales file the reports were calculated from (str or None)
+        :param team_rpt: dict with key = team name (str) value = gross revenue (Decimal)
+        :param prod_rpt: dict with key = product name (str) value = ProductSaleData
+
+        :returns: bool indicating if the reports were saved
+    """
+
+    db_path: str = get_db_path(get_db_file_name(db_fn))
+    sales_fn = sales_fn if sales_fn is not None else DEFAULT_SALES_FILE
+
+    conn: sqlite3.Connection = connect_db(db_path)
+
+    try:
+        with conn:
+            conn.execute("DELETE FROM team_report WHERE sales_file = ?", (sales_fn,))
+            conn.execute("DELETE FROM product_report WHERE sales_file = ?", (sales_fn,))
+
+            conn.executemany("INSERT INTO team_report VALUES (?, ?, ?)",
+                             ((sales_fn, team, to_scaled_int(round(revenue, 2), CENT_PLACES))
+                              for team, revenue in team_rpt.items()))
+
+            conn.executemany("INSERT INTO product_report VALUES (?, ?, ?, ?, ?)",
+                             ((sales_fn, name, to_scaled_int(round(data.gross_rev, 2), CENT_PLACES), data.units_sold,
+                               to_scaled_int(round(data.disc_cost, 2), CENT_PLACES))
+                              for name, data in prod_rpt.items()))
+
+    except sqlite3.Error as exc:
+        print(f"Error: Reports could not be saved to the database at {db_path} ({exc})\n")
+        return False
+
+    finally:
+        conn.close()
+
+    print(f"Success: Reports of {sales_fn} saved to the database at {db_path}\n")
+
+    return True
@@ -0,0 +1,380 @@
+# Defines functions for saving and loading the state of incrementally updated reports and of the period index,
+# and for checking which part of the sales file the state covers.
+# A saved state records the size and modification time of the sales file, and a CRC-32 of the whole part of the file it
+# covers. The part is only read again to check it if the size or modification time has changed, and the CRC-32 is
+# carried on from the saved value over the sales added, so saving a state only reads the part it adds.
+# State files are written to a temporary file that then replaces the saved state, so a failed save leaves the last one.
+# The reports of each day of the period index are saved in a file of their own, so a date range query only loads the
+# days in the range.
+
+import json
+import os
+import zlib
+from contextlib import suppress
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from .config import CACHE_FOLDER
+from .read import get_seekable_infile_path
+from .write import get_temp_path
+from ..models import PeriodIndex, ProductSaleData, ReportState
+
+# Size of the blocks the sales file is read in
+CHECKSUM_BLOCK_SIZE: int = 1 << 20
+
+
+def save_json(file_path: str, file_json: dict) -> bool:
+    """
+        Saves a JSON file in the cache folder through a temporary file, which replaces the file once it is complete
+
+        :param file_path: path of the file (str)
+        :param file_json: contents of the file (dict)
+
+        :returns: bool indicating if the file was saved
+    """
+
+    temp_path: str = get_temp_path(file_path)
+
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+
+        with open(temp_path, 'w', encoding="utf-8") as temp_file:
+            json.dump(file_json, temp_file)
+
+        os.replace(temp_path, file_path)
+
+    except OSError:
+        with suppress(OSError):
+            os.remove(temp_path)
+
+        return False
+
+    return True
+
+
+def get_state_path(sales_fn: str) -> str:
+    """
+        Gets the path of the saved report state for a sales file
+
+        :param sales_fn: name of the sales file (str)
+
+        :returns: path of the state file (str)
+    """
+
+    return f"{CACHE_FOLDER}\\{sales_fn}.state.json"
+
+
+def load_rpt_state(sales_fn: str) -> ReportState | None:
+    """
+        Loads the saved report state for a sales file
+
+        :param sales_fn: name of the sales file (str)
+
+        :returns: saved report state (ReportState), or None if there is no valid saved state
+    """
+
+    try:
+        with open(get_state_path(sales_fn), 'r', encoding="utf-8") as state_file:
+            state_json: dict = json.load(state_file)
+
+        return ReportState(
+            offset=state_json["offset"],
+            checksum=state_json["checksum"],
+            file_size=state_json["file_size"],
+            mtime_ns=state_json["mtime_ns"],
+            ref_checksum=state_json["ref_checksum"],
+            team_rpt={team: Decimal(rev) for team, rev in state_json["team_rpt"].items()},
+            prod_rpt={
+                name: ProductSaleData(gross_rev=Decimal(data[0]), units_sold=data[1], disc_cost=Decimal(data[2]))
+                for name, data in state_json["prod_rpt"].items()
+            }
+        )
+
+    except (OSError, ValueError, KeyError, IndexError, TypeError, InvalidOperation):
+        # A missing or corrupt state file means the report is rebuilt
+        return None
+
+
+def save_rpt_state(sales_fn: str, state: ReportState) -> None:
+    """
+        Saves the report state for a sales file
+
+        :param sales_fn: name of the sales file (str)
+        :param state: report state to save (ReportState)
+    """
+
+    state_json: dict = {
+        "offset": state.offset,
+        "checksum": state.checksum,
+        "file_size": state.file_size,
+        "mtime_ns": state.mtime_ns,
+        "ref_checksum": state.ref_checksum,
+        "team_rpt": {team: str(rev) for team, rev in state.team_rpt.items()},
+        "prod_rpt": {
+            name: [str(data.gross_rev), data.units_sold, str(data.disc_cost)]
+            for name, data in state.prod_rpt.items()
+        }
+    }
+
+    if not save_json(get_state_path(sales_fn), state_json):
+        print(f"Warning: Report state could not be saved at {get_state_path(sales_fn)}. "
+              f"The next run will rebuild the reports.\n")
+
+
+def get_period_index_path(sales_fn: str) -> str:
+    """
+        Gets the path of the saved period index for a sales file
+
+        :param sales_fn: name of the sales file (str)
+
+        :returns: path of the period index file (str)
+    """
+
+    return f"{CACHE_FOLDER}\\{sales_fn}.periods.json"
+
+
+def get_period_day_path(sales_fn: str, day: date) -> str:
+    """
+        Gets the path of the saved reports of one day of the period index for a sales file
+
+        :param sales_fn: name of the sales file (str)
+        :param day: sale date (date)
+
+        :returns: path of the file of the day (str)
+    """
+
+    return f"{CACHE_FOLDER}\\{sales_fn}.{day.isoformat()}.period.json"
+
+
+def load_period_index(sales_fn: str) -> PeriodIndex | None:
+    """
+        Loads the saved period index for a sales file, without the reports of its days
+
+        :param sales_fn: name of the sales file (str)
+
+        :returns: saved period index (PeriodIndex), or None if there is no valid saved index
+    """
+
+    try:
+        with open(get_period_index_path(sales_fn), 'r', encoding="utf-8") as index_file:
+            index_json: dict = json.load(index_file)
+
+        return PeriodIndex(
+            offset=index_json["offset"],
+            checksum=index_json["checksum"],
+            file_size=index_json["file_size"],
+            mtime_ns=index_json["mtime_ns"],
+            ref_checksum=index_json["ref_checksum"],
+            team_rpts={},
+            prod_rpts={},
+            days={date.fromisoformat(day): offset for day, offset in index_json["days"].items()}
+        )
+
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        # A missing or corrupt index file means the index is rebuilt
+        return None
+
+
+def save_period_index(sales_fn: str, index: PeriodIndex) -> None:
+    """
+        Saves the period index for a sales file, without the reports of its days
+
+        :param sales_fn: name of the sales file (str)
+        :param index: period index to save (PeriodIndex)
+    """
+
+    index_json: dict = {
+        "offset": index.offset,
+        "checksum": index.checksum,
+        "file_size": index.file_size,
+        "mtime_ns": index.mtime_ns,
+        "ref_checksum": index.ref_checksum,
+        "days": {day.isoformat(): offset for day, offset in index.days.items()}
+    }
+
+    if not save_json(get_period_index_path(sales_fn), index_json):
+        print(f"Warning: Period index could not be saved at {get_period_index_path(sales_fn)}. "
+              f"The next run will rebuild the index.\n")
+
+
+def load_period_day(sales_fn: str, index: PeriodIndex, day: date) -> bool:
+    """
+        Loads the saved reports of one day of a period index into the index
+
+        :param sales_fn: name of the sales file (str)
+        :param index: period index with the day (PeriodIndex)
+        :param day: sale date (date)
+
+        :returns: bool indicating if the reports were loaded. They are not loaded if the file of the day is missing,
+            corrupt, or was saved at another offset than the index records, e.g. by a run that failed part way.
+    """
+
+    try:
+        with open(get_period_day_path(sales_fn, day), 'r', encoding="utf-8") as day_file:
+            day_json: dict = json.load(day_file)
+
+        if day_json["offset"] != index.days[day]:
+            return False
+
+        index.team_rpts[day] = {team: Decimal(rev) for team, rev in day_json["team_rpt"].items()}
+        index.prod_rpts[day] = {
+            name: ProductSaleData(gross_rev=Decimal(data[0]), units_sold=data[1], disc_cost=Decimal(data[2]))
+            for name, data in day_json["prod_rpt"].items()
+        }
+
+    except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError, InvalidOperation):
+        return False
+
+    return True
+
+
+def save_period_day(sales_fn: str, index: PeriodIndex, day: date) -> bool:
+    """
+        Saves the reports of one day of a period index, with the offset the index records for the day
+
+        :param sales_fn: name of the sales file (str)
+        :param index: period index with the reports of the day (PeriodIndex)
+        :param day: sale date (date)
+
+        :returns: bool indicating if the reports were saved
+    """
+
+    day_json: dict = {
+        "offset": index.days[day],
+        "team_rpt": {team: str(rev) for team, rev in index.team_rpts[day].items()},
+        "prod_rpt": {
+            name: [str(data.gross_rev), data.units_sold, str(data.disc_cost)]
+            for name, data in index.prod_rpts[day].items()
+        }
+    }
+
+    return save_json(get_period_day_path(sales_fn, day), day_json)
+
+
+def get_sales_line_end(sales_fn: str) -> tuple[int, int]:
+    """
+        Gets the offset just after the last complete line of the sales file, and the size of the file
+
+        :param sales_fn: name of the sales file (str)
+
+        :returns: tuple of (offset after the last newline, file size)
+    """
+
+    file_path = get_seekable_infile_path(sales_fn)
+
+    try:
+        with open(file_path, 'rb') as infile:
+            file_size: int = infile.seek(0, os.SEEK_END)
+            block_end: int = file_size
+
+            # Read backwards until a newline is found
+            while block_end > 0:
+                block_start: int = max(block_end - CHECKSUM_BLOCK_SIZE, 0)
+                infile.seek(block_start)
+                newline: int = infile.read(block_end - block_start).rfind(b"\n")
+
+                if newline != -1:
+                    return block_start + newline + 1, file_size
+
+                block_end = block_start
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+    return 0, file_size
+
+
+def get_sales_stat(sales_fn: str) -> os.stat_result:
+    """
+        Gets the size and modification time of the sales file
+
+        :param sales_fn: name of the sales file (str)
+
+        :returns: status of the file (os.stat_result)
+    """
+
+    file_path = get_seekable_infile_path(sales_fn)
+
+    try:
+        return os.stat(file_path)
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+
+def get_prefix_checksum(sales_fn: str, end: int, start: int = 0, checksum: str = "") -> str:
+    """
+        Calculates the CRC-32 of the sales file up to an offset, one block at a time
+
+        :param sales_fn: name of the sales file (str)
+        :param end: offset the checksum ends at (int)
+        :param start: offset to start reading at (int). The part before it is covered by checksum.
+        :param checksum: checksum of the file up to start, to carry on from, or "" if start is 0 (str)
+
+        :returns: checksum as 8 hex digits (str)
+    """
+
+    file_path = get_seekable_infile_path(sales_fn)
+    crc: int = int(checksum, 16) if checksum else 0
+
+    try:
+        with open(file_path, 'rb') as infile:
+            infile.seek(start)
+            remaining: int = end - start
+
+            while remaining > 0:
+                block: bytes = infile.read(min(remaining, CHECKSUM_BLOCK_SIZE))
+
+                if not block:
+                    break
+
+                crc = zlib.crc32(block, crc)
+                remaining -= len(block)
+
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {file_path}\n")
+        exit()
+
+    return f"{crc:08x}"
+
+
+def is_state_current(sales_fn: str, state: ReportState | PeriodIndex, stat: os.stat_result, line_end: int) -> bool:
+    """
+        Checks if the part of the sales file covered by a saved state is unchanged. The file is not read if its size
+        and modification time are the same as when the state was saved, and otherwise the covered part is read once
+        to compare its CRC-32.
+
+        :param sales_fn: name of the sales file (str)
+        :param state: saved report state or period index (ReportState or PeriodIndex)
+        :param stat: status of the sales file, taken before it is read (os.stat_result)
+        :param line_end: offset just after the last complete line of the sales file (int)
+
+        :returns: bool
+    """
+
+    if state.offset > line_end:
+        return False
+
+    if stat.st_size == state.file_size and stat.st_mtime_ns == state.mtime_ns:
+        return True
+
+    return get_prefix_checksum(sales_fn, state.offset) == state.checksum
+
+
+def stamp_state(sales_fn: str, state: ReportState | PeriodIndex, stat: os.stat_result, offset: int) -> None:
+    """
+        Records the offset a state covers, with the CRC-32 of the file up to it and the size and modification time
+        of the sales file. The CRC-32 is carried on from the checksum of the offset the state covered before, so only
+        the part added is read.
+
+        :param sales_fn: name of the sales file (str)
+        :param state: report state or period index (ReportState or PeriodIndex)
+        :param stat: status of the sales file, taken before it was read (os.stat_result)
+        :param offset: offset just after the last sale added to the state (int)
+    """
+
+    state.checksum = get_prefix_checksum(sales_fn, offset, state.offset, state.checksum if state.offset else "")
+    state.offset = offset
+    state.file_size = stat.st_size
+    state.mtime_ns = stat.st_mtime_ns
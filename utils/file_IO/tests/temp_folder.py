@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from ..config import CACHE_FOLDER, DESTINATION_FOLDER, SOURCE_FOLDER
+
+
+class TempFolderTestCase(unittest.TestCase):
+    """Base test case that runs each test in a temporary working folder with the input, output, and cache folders"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder"""
+
+        self.cwd: str = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.writes: int = 0
+
+        # Input and output files are found at "{folder}\{file name}"
+        for folder in (SOURCE_FOLDER, DESTINATION_FOLDER, CACHE_FOLDER):
+            os.makedirs(folder, exist_ok=True)
+
+    def tearDown(self) -> None:
+        """Remove the temporary working folder"""
+
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def write_infile(self, file_name: str, rows: str) -> None:
+        """Writes an input file without translating line endings, changing its modification time"""
+
+        file_path: str = f"{SOURCE_FOLDER}\\{file_name}"
+
+        with open(file_path, 'w', newline='') as infile:
+            infile.write(rows)
+
+        # Move the modification time forward, as a rewrite can land in the same tick of a coarse clock
+        self.writes += 1
+        stat: os.stat_result = os.stat(file_path)
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9 * self.writes))
+
+    def read_outfile(self, file_name: str) -> str:
+        """Reads a written output file without translating line endings"""
+
+        with open(f"{DESTINATION_FOLDER}\\{file_name}", newline='') as outfile:
+            return outfile.read()
@@ -0,0 +1,82 @@
+import importlib.util
+import unittest
+from decimal import Decimal
+from ..arrow_io import is_columnar_file, read_columnar_prod_master, read_columnar_team_map, \
+    stream_columnar_sales, to_decimals, to_ints, write_columnar_outfile
+from ..config import SOURCE_FOLDER
+from .temp_folder import TempFolderTestCase
+from ...models import Product, Sale
+
+HAS_PYARROW: bool = importlib.util.find_spec("pyarrow") is not None
+
+
+class TestColumnValues(unittest.TestCase):
+    """Test case for converting the values of Parquet and Arrow columns"""
+
+    def test_is_columnar_file(self) -> None:
+        """Test that files are recognised from their suffix"""
+
+        self.assertTrue(is_columnar_file("Sales.parquet"))
+        self.assertTrue(is_columnar_file("Sales.ARROW"))
+        self.assertTrue(is_columnar_file("Sales.feather"))
+        self.assertFalse(is_columnar_file("Sales.csv"))
+
+    def test_to_decimals(self) -> None:
+        """Test that floats are converted from their shortest repr, and other values exactly"""
+
+        self.assertEqual([str(value) for value in to_decimals([2.5, 0.1, 3, "1.25", Decimal("0.50")])],
+                         ["2.5", "0.1", "3", "1.25", "0.50"])
+
+    def test_to_decimals_missing(self) -> None:
+        """Test that a missing value raises an exception"""
+
+        with self.assertRaises(TypeError):
+            to_decimals([None])
+
+    def test_to_ints(self) -> None:
+        """Test that integer columns are converted to int"""
+
+        self.assertEqual(to_ints([1, "2"]), [1, 2])
+
+        with self.assertRaises(TypeError):
+            to_ints([None])
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestColumnarFiles(TempFolderTestCase):
+    """Test case for reading and writing Parquet and Arrow IPC files"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder"""
+
+        super().setUp()
+
+    def test_round_trip(self) -> None:
+        """Test that input files written as Parquet and Arrow are read back by column position"""
+
+        write_columnar_outfile(f"{SOURCE_FOLDER}\\TeamMap.parquet",
+                               [("Id", "Team"), (1, "Fluffy Bunnies"), (2, "White Knights")])
+        write_columnar_outfile(f"{SOURCE_FOLDER}\\ProductMaster.arrow",
+                               [("Id", "Name", "Price", "Lot"), (1, "Minor Widget", Decimal("0.25"), 250)])
+        write_columnar_outfile(f"{SOURCE_FOLDER}\\Sales.parquet",
+                               [("SaleId", "ProductId", "TeamId", "Lots", "Discount"),
+                                (1, 1, 2, 10, 0.0), (2, 1, 1, 1, 2.5)])
+
+        self.assertEqual(read_columnar_team_map("TeamMap.parquet"), {1: "Fluffy Bunnies", 2: "White Knights"})
+        self.assertEqual(read_columnar_prod_master("ProductMaster.arrow"),
+                         {1: Product(name="Minor Widget", unit_price=Decimal("0.25"), lot_size=250)})
+        self.assertEqual([sale for batch in stream_columnar_sales("Sales.parquet", batch_size=1) for sale in batch],
+                         [Sale(prod_id=1, team_id=2, lots_sold=10, discount=Decimal("0")),
+                          Sale(prod_id=1, team_id=1, lots_sold=1, discount=Decimal("2.5"))])
+
+    def test_too_few_columns(self) -> None:
+        """Test that a file with too few columns raises an IndexError"""
+
+        write_columnar_outfile(f"{SOURCE_FOLDER}\\Sales.parquet", [("SaleId", "ProductId"), (1, 1)])
+
+        with self.assertRaises(IndexError):
+            list(stream_columnar_sales("Sales.parquet"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import json
+import os
+import unittest
+from decimal import Decimal
+from .temp_folder import TempFolderTestCase
+from ..cache import FOOTER_LENGTH, columns_to_prod_master, columns_to_sales, columns_to_team_map, compact_ints, \
+    get_cache_path, prod_master_to_columns, sales_to_columns, split_decimals, team_map_to_columns
+from ..read import stream_sales
+from ...models import Product, Sale, SalesTable
+
+
+class TestCacheColumns(unittest.TestCase):
+    """Test case for converting parsed tables to and from cache columns"""
+
+    def test_sales_round_trip(self) -> None:
+        """Test that sales data is unchanged by converting to columns and back"""
+
+        sales_data: list[Sale] = [
+            Sale(prod_id=1, team_id=2, lots_sold=10, discount=Decimal("0")),
+            Sale(prod_id=3, team_id=1, lots_sold=5, discount=Decimal("2.50")),
+            Sale(prod_id=70_000, team_id=1, lots_sold=1, discount=Decimal("-0.125"))
+        ]
+
+        actual_sales: list[Sale] = columns_to_sales(sales_to_columns(sales_data))
+
+        self.assertEqual(actual_sales, sales_data)
+        self.assertEqual([str(sale.discount) for sale in actual_sales], ["0", "2.50", "-0.125"])
+
+    def test_prod_master_round_trip(self) -> None:
+        """Test that a product master is unchanged by converting to columns and back"""
+
+        prod_master: dict[int, Product] = {
+            1: Product(name="Minor Widget", unit_price=Decimal("0.25"), lot_size=250),
+            2: Product(name="Système", unit_price=Decimal("500"), lot_size=1)
+        }
+
+        self.assertEqual(columns_to_prod_master(prod_master_to_columns(prod_master)), prod_master)
+
+    def test_team_map_round_trip(self) -> None:
+        """Test that a team map is unchanged by converting to columns and back"""
+
+        team_map: dict[int, str] = {1: "Fluffy Bunnies", 2: "", 3: "White Knights"}
+
+        self.assertEqual(columns_to_team_map(team_map_to_columns(team_map)), team_map)
+
+    def test_compact_ints(self) -> None:
+        """Test that integers are packed into the narrowest column"""
+
+        self.assertEqual(compact_ints([1, -128, 127]).typecode, 'b')
+        self.assertEqual(compact_ints([1, 128]).typecode, 'h')
+        self.assertEqual(compact_ints([1 << 40]).typecode, 'q')
+
+    def test_non_finite_decimals(self) -> None:
+        """Test that decimals without a mantissa and exponent are rejected"""
+
+        for value in ("NaN", "sNaN", "Infinity", "-Infinity"):
+            self.assertRaises(ValueError, split_decimals, [Decimal("1.5"), Decimal(value)])
+
+
+class TestCacheSales(TempFolderTestCase):
+    """Test case for saving the sales file to the cache and loading it"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with a sales file"""
+
+        super().setUp()
+        self.write_infile("Sales.csv", "1,1,1,2,0\n2,2,2,1,2.50\n3,1,2,4,-0.125\n")
+
+    def read(self) -> list:
+        """Reads the batches of the sales file through the cache"""
+
+        return list(stream_sales("Sales.csv", use_cache=True))
+
+    def test_load_tables(self) -> None:
+        """Test that the cached sales are loaded as tables with the same sales"""
+
+        sales_data: list[Sale] = [sale for batch in self.read() for sale in batch]
+        batches: list = self.read()
+
+        self.assertTrue(all(isinstance(batch, SalesTable) for batch in batches))
+        self.assertEqual([(view.prod_id, view.team_id, view.lots_sold, view.discount)
+                          for batch in batches for view in batch],
+                         [(sale.prod_id, sale.team_id, sale.lots_sold, sale.discount) for sale in sales_data])
+
+    def test_changed_file(self) -> None:
+        """Test that a file with a new modification time is parsed again, even if its size is the same"""
+
+        self.read()
+        self.write_infile("Sales.csv", "1,1,1,2,0\n2,2,2,1,2.50\n3,1,2,4,-0.375\n")
+
+        self.assertEqual([sale.discount for batch in self.read() for sale in batch],
+                         [Decimal("0"), Decimal("2.50"), Decimal("-0.375")])
+
+    def test_non_finite_discount(self) -> None:
+        """Test that a sales file with a NaN discount is read, but not cached"""
+
+        self.write_infile("Sales.csv", "1,1,1,2,NaN\n2,2,2,1,2.50\n")
+
+        self.assertEqual(len([sale for batch in self.read() for sale in batch]), 2)
+        self.assertFalse(os.path.exists(get_cache_path("Sales.csv")))
+
+    def damage_cache(self, offset: int, data: bytes) -> None:
+        """Overwrites bytes of the cache file of the sales file"""
+
+        with open(get_cache_path("Sales.csv"), 'r+b') as cache_file:
+            cache_file.seek(offset)
+            cache_file.write(data)
+
+    def test_corrupt_chunk(self) -> None:
+        """Test that a cache with damaged column data is deleted and the sales file is parsed again"""
+
+        expected: list[Sale] = [sale for batch in self.read() for sale in batch]
+
+        # The first column of the only chunk starts after the magic bytes
+        self.damage_cache(8, b"\xff\xff")
+
+        self.assertEqual([sale for batch in self.read() for sale in batch], expected)
+        self.assertFalse(os.path.exists(get_cache_path("Sales.csv")))
+
+        self.read()
+        self.assertTrue(all(isinstance(batch, SalesTable) for batch in self.read()))
+
+    def test_corrupt_later_chunk(self) -> None:
+        """Test that the sales after the last valid chunk are parsed from the file, without repeating any sales"""
+
+        self.write_infile("Sales.csv", "".join(f"{row},1,2,{row},0.5\n" for row in range(1, 2501)))
+        expected: list[int] = [sale.lots_sold for batch in stream_sales("Sales.csv", batch_size=1000, use_cache=True)
+                                for sale in batch]
+
+        with open(get_cache_path("Sales.csv"), 'rb') as cache_file:
+            size: int = len(cache_file.read())
+
+        # The footer is at the end of the file, so the last chunk's columns end a little before it
+        self.damage_cache(size // 2, b"\x00\x7f\x00\x7f")
+
+        self.assertEqual([sale.lots_sold for batch in stream_sales("Sales.csv", batch_size=1000, use_cache=True)
+                          for sale in batch], expected)
+        self.assertFalse(os.path.exists(get_cache_path("Sales.csv")))
+
+    def test_truncated_column(self) -> None:
+        """Test that a chunk whose column runs past the end of the file is treated as corrupt"""
+
+        self.read()
+
+        with open(get_cache_path("Sales.csv"), 'rb') as cache_file:
+            data: bytes = cache_file.read()
+
+        footer_length: int = FOOTER_LENGTH.unpack(data[-FOOTER_LENGTH.size:])[0]
+        footer: dict = json.loads(data[-FOOTER_LENGTH.size - footer_length:-FOOTER_LENGTH.size])
+        footer["chunks"][0]["columns"]["disc_exps"][2] = 10 ** 6
+        new_footer: bytes = json.dumps(footer).encode("utf-8")
+
+        with open(get_cache_path("Sales.csv"), 'wb') as cache_file:
+            cache_file.write(data[:-FOOTER_LENGTH.size - footer_length])
+            cache_file.write(new_footer + FOOTER_LENGTH.pack(len(new_footer)))
+
+        self.assertEqual([sale.lots_sold for batch in self.read() for sale in batch], [2, 1, 4])
+        self.assertFalse(os.path.exists(get_cache_path("Sales.csv")))
+
+if __name__ == "__main__":
+    unittest.main()
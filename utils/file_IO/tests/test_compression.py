@@ -0,0 +1,154 @@
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from ..compression import DECOMPRESSION_ERRORS, get_compression, open_file, strip_compression
+from ..config import SOURCE_FOLDER
+from ..fast_read import fast_stream_sales
+from ..read import stream_infile
+from .temp_folder import TempFolderTestCase
+
+HAS_ZSTANDARD: bool = importlib.util.find_spec("zstandard") is not None
+
+
+class TestCompression(unittest.TestCase):
+    """Test case for opening compressed files"""
+
+    def setUp(self) -> None:
+        """Set up a temporary folder"""
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """Remove the temporary folder"""
+
+        self.temp_dir.cleanup()
+
+    def assert_round_trip(self, file_name: str) -> None:
+        """Asserts that text written to a file is read back unchanged, in text and binary mode"""
+
+        file_path: str = os.path.join(self.temp_dir.name, file_name)
+        text: str = "1,1,2,10,0\r\n2,Système,1,1,2.5\r\n"
+
+        with open_file(file_path, 'w', encoding="utf-8", newline='') as outfile:
+            outfile.write(text)
+
+        with open_file(file_path, 'r', encoding="utf-8", newline='') as infile:
+            self.assertEqual(infile.read(), text)
+
+        with open_file(file_path, 'rb') as infile:
+            self.assertEqual(list(infile), text.encode("utf-8").splitlines(keepends=True))
+
+    def test_get_compression(self) -> None:
+        """Test that compression formats are recognised from their suffix"""
+
+        self.assertEqual(get_compression("Sales.csv.gz"), ".gz")
+        self.assertEqual(get_compression("Sales.csv.ZST"), ".zst")
+        self.assertIsNone(get_compression("Sales.csv"))
+
+    def test_strip_compression(self) -> None:
+        """Test that only the compression suffix is removed"""
+
+        self.assertEqual(strip_compression("Sales.csv.bz2"), "Sales.csv")
+        self.assertEqual(strip_compression("Sales.csv"), "Sales.csv")
+
+    def test_uncompressed(self) -> None:
+        """Test that uncompressed files are opened as usual"""
+
+        self.assert_round_trip("Sales.csv")
+
+    def test_gzip(self) -> None:
+        """Test gzip files"""
+
+        self.assert_round_trip("Sales.csv.gz")
+
+        with open(os.path.join(self.temp_dir.name, "Sales.csv.gz"), 'rb') as infile:
+            self.assertEqual(infile.read(2), b"\x1f\x8b")
+
+    def test_bz2(self) -> None:
+        """Test bz2 files"""
+
+        self.assert_round_trip("Sales.csv.bz2")
+
+    def test_xz(self) -> None:
+        """Test xz files"""
+
+        self.assert_round_trip("Sales.csv.xz")
+
+    @unittest.skipUnless(HAS_ZSTANDARD, "zstandard is not installed")
+    def test_zstd(self) -> None:
+        """Test zstd files"""
+
+        self.assert_round_trip("Sales.csv.zst")
+
+    @unittest.skipUnless(HAS_ZSTANDARD, "zstandard is not installed")
+    def test_zstd_frames(self) -> None:
+        """Test that a zstd file of several frames is read whole, and a truncated one raises an error"""
+
+        file_path: str = os.path.join(self.temp_dir.name, "Sales.csv.zst")
+        text: str = "".join(f"{row},1,2,10,0\n" for row in range(20000))
+
+        with open_file(file_path, 'w', encoding="utf-8", newline='') as outfile:
+            outfile.write(text)
+
+        with open(file_path, 'rb') as infile:
+            frame: bytes = infile.read()
+
+        with open(file_path, 'wb') as outfile:
+            outfile.write(frame + frame)
+
+        with open_file(file_path, 'r', encoding="utf-8", newline='') as infile:
+            self.assertEqual(infile.read(), text + text)
+
+        with open(file_path, 'wb') as outfile:
+            outfile.write(frame[:len(frame) // 2])
+
+        with open_file(file_path, 'rb') as infile:
+            self.assertRaises(DECOMPRESSION_ERRORS, infile.read)
+
+
+@unittest.skipUnless(HAS_ZSTANDARD, "zstandard is not installed")
+class TestTruncatedZstd(TempFolderTestCase):
+    """Test case for reading a truncated zstd input file"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with a zstd sales file that ends part way through its frame"""
+
+        super().setUp()
+
+        file_path: str = f"{SOURCE_FOLDER}\\Sales.csv.zst"
+
+        with open_file(file_path, 'w', encoding="utf-8", newline='') as outfile:
+            outfile.write("".join(f"{row},1,2,10,0\n" for row in range(20000)))
+
+        with open(file_path, 'rb') as infile:
+            frame: bytes = infile.read()
+
+        with open(file_path, 'wb') as outfile:
+            outfile.write(frame[:len(frame) // 2])
+
+    def assert_corrupt(self, read_func) -> None:
+        """Asserts that reading the file prints an error and exits"""
+
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            self.assertRaises(SystemExit, read_func)
+
+        self.assertIn("is corrupt and could not be decompressed", output.getvalue())
+
+    def test_csv_reader(self) -> None:
+        """Test streaming the file with the csv reader"""
+
+        self.assert_corrupt(lambda: list(stream_infile("Sales.csv.zst")))
+
+    def test_fast_reader(self) -> None:
+        """Test streaming the file with the fast reader"""
+
+        self.assert_corrupt(lambda: list(fast_stream_sales("Sales.csv.zst")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import contextlib
+import io
+import unittest
+from collections.abc import Callable
+from decimal import InvalidOperation
+from ..config import SOURCE_FOLDER
+from .temp_folder import TempFolderTestCase
+from ..fast_read import fast_read_prod_master, fast_stream_sales, parse_fixed, split_fields
+
+
+class TestParseFixed(unittest.TestCase):
+    """Test case for parse_fixed"""
+
+    def test_parse_fixed(self) -> None:
+        """Test parsing numbers with up to the kept number of decimal places"""
+
+        self.assertEqual(parse_fixed(b"5", 2), 500)
+        self.assertEqual(parse_fixed(b"2.5", 2), 250)
+        self.assertEqual(parse_fixed(b"0.25", 2), 25)
+        self.assertEqual(parse_fixed(b"-0.5", 2), -50)
+        self.assertEqual(parse_fixed(b".75", 2), 75)
+
+    def test_parse_fixed_uncommon_forms(self) -> None:
+        """Test parsing numbers in forms that fall back to Decimal"""
+
+        self.assertEqual(parse_fixed(b"1.2e1", 2), 1200)
+        self.assertEqual(parse_fixed(b"2.500", 2), 250)
+
+    def test_too_many_places(self) -> None:
+        """Test parsing a number with more than the kept number of decimal places"""
+        self.assertIsNone(parse_fixed(b"1.234", 2))
+
+    def test_raises_error(self) -> None:
+        """Test parsing a field that is not a number"""
+
+        self.assertRaises(ValueError, parse_fixed, b"abc", 2)
+        self.assertRaises(InvalidOperation, parse_fixed, b"1.x", 2)
+
+
+class TestSplitFields(unittest.TestCase):
+    """Test case for split_fields"""
+
+    def test_split_fields(self) -> None:
+        """Test splitting lines with and without quoted fields"""
+
+        self.assertEqual(split_fields(b"1,2,3"), [b"1", b"2", b"3"])
+        self.assertEqual(split_fields(b'1,"Widget, Large",0.25,10'), [b"1", b"Widget, Large", b"0.25", b"10"])
+
+
+
+class TestFastReadCorrupt(TempFolderTestCase):
+    """Test case for the fast backend reading a corrupt compressed file"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with a file that is not a gzip archive"""
+
+        super().setUp()
+
+        with open(f"{SOURCE_FOLDER}\\Bad.csv.gz", 'wb') as infile:
+            infile.write(b"1,1,2,10,0\n")
+
+    def assert_corrupt(self, read_func: Callable, *args) -> None:
+        """Asserts that reading the file prints an error and exits"""
+
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            self.assertRaises(SystemExit, read_func, *args)
+
+        self.assertIn("is corrupt and could not be decompressed", output.getvalue())
+
+    def test_sales(self) -> None:
+        """Test streaming a corrupt sales file"""
+
+        self.assert_corrupt(lambda: list(fast_stream_sales("Bad.csv.gz")))
+
+    def test_prod_master(self) -> None:
+        """Test reading a corrupt product master file"""
+
+        self.assert_corrupt(fast_read_prod_master, "Bad.csv.gz")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import contextlib
+import io
+import pickle
+import unittest
+from decimal import Decimal
+from ..lazy_read import LazyProductMaster, lazy_read_prod_master
+from .temp_folder import TempFolderTestCase
+from ..read import read_prod_master
+from ...models import Product
+
+
+class TestLazyProductMaster(TempFolderTestCase):
+    """Test case for LazyProductMaster"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder"""
+
+        super().setUp()
+        self.prod_masters: list[LazyProductMaster] = []  # closed before the folder is removed
+
+    def tearDown(self) -> None:
+        """Close the product masters, then remove the temporary working folder"""
+
+        for prod_master in self.prod_masters:
+            prod_master.close()
+
+        super().tearDown()
+
+    def test_matches_read_prod_master(self) -> None:
+        """Test with an unordered file, a repeated product id, a quoted name, and Windows line endings"""
+
+        self.write_infile("ProductMaster.csv", '3,"Widget, Large",12.50,5\r\n'
+                                               "1,Old Widget,1,1\r\n"
+                                               "2,Gadget,0.125,100\r\n"
+                                               "1,Widget,2.25,10\r\n")
+
+        prod_master: LazyProductMaster = lazy_read_prod_master("ProductMaster.csv")
+        self.prod_masters.append(prod_master)
+
+        self.assertEqual(list(prod_master), [1, 2, 3])
+        self.assertEqual(dict(prod_master), read_prod_master("ProductMaster.csv"))
+        self.assertEqual(prod_master[1], Product(name="Widget", unit_price=Decimal("2.25"), lot_size=10))
+        self.assertIsNone(prod_master.get(4))
+
+    def test_cache(self) -> None:
+        """Test that only the most recently used products are kept, and that lookups are counted"""
+
+        self.write_infile("ProductMaster.csv", "".join(f"{prod_id},Product {prod_id},1,1\n" for prod_id in range(1, 6)))
+
+        prod_master = LazyProductMaster("ProductMaster.csv", max_products=2)
+        self.prod_masters.append(prod_master)
+
+        self.assertIn(5, prod_master)
+        self.assertNotIn(6, prod_master)
+        self.assertEqual(prod_master.stats()["misses"], 0)
+
+        for prod_id in (1, 2, 1, 3, 1, 2):
+            self.assertEqual(prod_master[prod_id].name, f"Product {prod_id}")
+
+        self.assertEqual(prod_master.stats(), {"hits": 2, "misses": 4, "evictions": 2, "entries": 2})
+        self.assertEqual(list(prod_master.products), [1, 2])
+
+    def test_invalid_file(self) -> None:
+        """Test that an invalid product id exits when indexed, and an invalid product when it is looked up"""
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.write_infile("ProductMaster.csv", "1,Widget,1,1\nA,Gadget,1,1\n")
+            self.assertRaises(SystemExit, lazy_read_prod_master, "ProductMaster.csv")
+
+            self.write_infile("ProductMaster.csv", "1,Widget,1,1\n2,Gadget,free,1\n")
+            prod_master = lazy_read_prod_master("ProductMaster.csv")
+            self.prod_masters.append(prod_master)
+
+            self.assertEqual(prod_master[1].name, "Widget")
+            self.assertRaises(SystemExit, prod_master.__getitem__, 2)
+
+    def test_pickle(self) -> None:
+        """Test that a pickled product master opens its own file, as in a worker process"""
+
+        self.write_infile("ProductMaster.csv", "1,Widget,1,1\n2,Gadget,3.5,2\n")
+
+        prod_master = lazy_read_prod_master("ProductMaster.csv")
+        self.prod_masters.append(prod_master)
+        self.assertEqual(prod_master[1].name, "Widget")
+
+        unpickled: LazyProductMaster = pickle.loads(pickle.dumps(prod_master))
+        self.prod_masters.append(unpickled)
+
+        self.assertEqual(unpickled[2], Product(name="Gadget", unit_price=Decimal("3.5"), lot_size=2))
+        self.assertEqual(unpickled[1].name, "Widget")
+        self.assertEqual(unpickled.stats(), {"hits": 1, "misses": 2, "evictions": 0, "entries": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import contextlib
+import io
+import random
+import unittest
+from ..config import SOURCE_FOLDER
+from ..fast_read import fast_read_sales
+from .temp_folder import TempFolderTestCase
+from ..mmap_read import count_lines, index_line_bounds, mmap_read_sales, mmap_stream_sales, parse_chunk
+
+
+class TestIndexLineBounds(unittest.TestCase):
+    """Test case for index_line_bounds"""
+
+    def test_bounds_on_line_starts(self) -> None:
+        """Test that every bound is the start of a line, and the bounds cover the whole buffer"""
+
+        buffer: bytes = b"".join(f"{i},{i * 7},1,1,0\n".encode() for i in range(500))
+
+        for chunk_size in (1, 10, 64, 1_000, len(buffer) * 2):
+            bounds: list[int] = index_line_bounds(buffer, 0, len(buffer), chunk_size)
+
+            self.assertEqual(bounds[0], 0)
+            self.assertEqual(bounds[-1], len(buffer))
+            self.assertEqual(bounds, sorted(set(bounds)))
+            self.assertTrue(all(buffer[bound - 1:bound] == b"\n" for bound in bounds[1:]))
+
+    def test_empty(self) -> None:
+        """Test an empty buffer"""
+
+        self.assertEqual(index_line_bounds(b"", 0, 0, 10), [0])
+
+
+class TestParseChunk(unittest.TestCase):
+    """Test case for parse_chunk"""
+
+    def test_parse_chunk(self) -> None:
+        """Test parsing a chunk into columns, with a missing final newline and Windows line endings"""
+
+        table, precision_row = parse_chunk(b"1,1,2,10,0\r\n2,3,1,1,2.5\r\n3,2,2,5,.75")
+
+        self.assertIsNone(precision_row)
+        self.assertEqual(list(table.prod_ids), [1, 3, 2])
+        self.assertEqual(list(table.team_ids), [2, 1, 2])
+        self.assertEqual(list(table.lots_sold), [10, 1, 5])
+        self.assertEqual(list(table.disc_mants), [0, 250, 75])
+        self.assertEqual(list(table.disc_exps), [-2, -2, -2])
+
+    def test_extra_columns(self) -> None:
+        """Test that columns after the discount, such as a sale date, are ignored"""
+
+        table, _ = parse_chunk(b"1,1,2,10,0,2024-01-01\n2,3,1,1,2.5,2024-01-02\n")
+
+        self.assertEqual(list(table.prod_ids), [1, 3])
+
+    def test_quoted_fields(self) -> None:
+        """Test that a chunk with quoted fields is read as by the csv module"""
+
+        table, _ = parse_chunk(b'1,"1",2,10,0\n2,3,1,1,"2.5"\n')
+
+        self.assertEqual(list(table.prod_ids), [1, 3])
+        self.assertEqual(list(table.disc_mants), [0, 250])
+
+    def test_different_column_counts(self) -> None:
+        """Test that lines with different numbers of columns are rejected, even if the total number of fields fits"""
+
+        self.assertRaises(IndexError, parse_chunk, b"1,1,2,10\n2,3,1,1,2.5,9\n")
+        self.assertRaises(IndexError, parse_chunk, b"1,1,2,10\n")
+
+    def test_invalid_field(self) -> None:
+        """Test that a field that is not a number is rejected"""
+
+        self.assertRaises(ValueError, parse_chunk, b"1,x,2,10,0\n")
+
+    def test_precision_row(self) -> None:
+        """Test that the first row with a discount with too many decimal places is returned"""
+
+        _, precision_row = parse_chunk(b"1,1,2,10,0\n2,3,1,1,2.125\n")
+
+        self.assertEqual(precision_row, 1)
+
+
+class TestMmapReadSales(TempFolderTestCase):
+    """Test case for mmap_read_sales"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with a random sales file"""
+
+        super().setUp()
+
+        rng = random.Random(0)
+
+        self.write_infile("Sales.csv", "".join(f"{sale_id},{rng.randint(1, 50)},{rng.randint(1, 5)},"
+                                               f"{rng.randint(1, 100)},{rng.randint(0, 10_000) / 100}\n"
+                                               for sale_id in range(5_000)))
+
+    def test_matches_fast_reader(self) -> None:
+        """Test that the memory-mapped reader gives the same table as the fast reader, in one or more processes"""
+
+        expected: dict = fast_read_sales("Sales.csv").columns()
+
+        self.assertEqual(mmap_read_sales("Sales.csv").columns(), expected)
+        self.assertEqual(mmap_read_sales("Sales.csv", workers=3).columns(), expected)
+
+    def test_precision_error(self) -> None:
+        """Test that a discount with too many decimal places in a mapped file exits with the line number"""
+
+        with open(f"{SOURCE_FOLDER}\\Sales.csv", 'ab') as sales_file:
+            sales_file.write(b"5000,1,1,1,0.12345\n")
+
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            self.assertRaises(SystemExit, list, mmap_stream_sales("Sales.csv"))
+
+        self.assertIn("on line 5001 of", output.getvalue())
+        self.assertIn("--reader=mmap", output.getvalue())
+
+    def test_count_lines(self) -> None:
+        """Test counting the lines before an offset of a mapped file"""
+
+        with open(f"{SOURCE_FOLDER}\\Sales.csv", 'rb') as sales_file:
+            contents: bytes = sales_file.read()
+
+        self.assertEqual(count_lines(contents, len(contents)), 5_000)
+        self.assertEqual(count_lines(contents, contents.index(b"\n") + 1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from decimal import Decimal
+from ..write import rank_rpt_items
+
+
+class TestRankRptItems(unittest.TestCase):
+    """Test case for rank_rpt_items"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a set of data"""
+
+        cls.team_rpt: dict[str, Decimal] = {
+            "Team A": Decimal("10.5"),
+            "Team B": Decimal("300"),
+            "Team C": Decimal("9.999"),
+            "Team D": Decimal("45")
+        }
+
+    def test_rank_all(self) -> None:
+        """Test ordering every item from highest to lowest value"""
+
+        ranked_items = rank_rpt_items(self.team_rpt.items(), lambda item: item[1], None)
+        self.assertEqual([team for team, _ in ranked_items], ["Team B", "Team D", "Team A", "Team C"])
+
+    def test_rank_top(self) -> None:
+        """Test selecting the highest items"""
+
+        ranked_items = rank_rpt_items(self.team_rpt.items(), lambda item: item[1], 2)
+        self.assertEqual([team for team, _ in ranked_items], ["Team B", "Team D"])
+
+    def test_rank_top_more_than_items(self) -> None:
+        """Test selecting more items than the report has"""
+
+        ranked_items = rank_rpt_items(self.team_rpt.items(), lambda item: item[1], 10)
+        self.assertEqual(len(ranked_items), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
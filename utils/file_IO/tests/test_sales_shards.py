@@ -0,0 +1,79 @@
+import unittest
+from itertools import chain
+from ..config import SOURCE_FOLDER
+from .temp_folder import TempFolderTestCase
+from ..read import get_sales_shards, stream_sales_range
+
+
+class TestSalesShards(TempFolderTestCase):
+    """Test case for splitting the sales file into line-aligned byte ranges and reading each range"""
+
+    def read_shards(self, shard_count: int) -> list[list[int]]:
+        """Reads the lots sold of each sale of each shard of the sales file, which the tests set to the sale id"""
+
+        return [[sale.lots_sold for sale in chain.from_iterable(stream_sales_range("Sales.csv", start, end))]
+                for start, end in get_sales_shards("Sales.csv", shard_count)]
+
+    def assert_line_aligned(self, shard_count: int) -> None:
+        """Asserts that the shards cover the file without gaps, and each starts at the start of a line"""
+
+        with open(f"{SOURCE_FOLDER}\\Sales.csv", 'rb') as infile:
+            data: bytes = infile.read()
+
+        shards: list[tuple[int, int]] = get_sales_shards("Sales.csv", shard_count)
+
+        self.assertLessEqual(len(shards), shard_count)
+        self.assertEqual(shards[0][0], 0)
+        self.assertEqual(shards[-1][1], len(data))
+
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1:start], b"\n")
+
+    def test_boundaries_on_line_starts(self) -> None:
+        """Test that offsets that fall on the start of a line are kept"""
+
+        # Every line is 10 bytes, so each quarter of the file starts a line
+        self.write_infile("Sales.csv", "".join(f"{sale_id},1,1,{sale_id},0\n" for sale_id in range(1, 5)))
+
+        self.assertEqual(get_sales_shards("Sales.csv", 4), [(0, 10), (10, 20), (20, 30), (30, 40)])
+        self.assertEqual(self.read_shards(4), [[1], [2], [3], [4]])
+
+    def test_boundary_on_newline(self) -> None:
+        """Test that an offset that falls on a newline moves to the start of the next line"""
+
+        # Half of the 19 byte file is offset 9, the newline ending the first line
+        self.write_infile("Sales.csv", "1,1,1,1,0\n2,1,1,2,0")
+
+        self.assertEqual(get_sales_shards("Sales.csv", 2), [(0, 10), (10, 19)])
+        self.assertEqual(self.read_shards(2), [[1], [2]])
+
+    def test_no_trailing_newline(self) -> None:
+        """Test that the last line is read once when the file does not end with a newline"""
+
+        self.write_infile("Sales.csv", "".join(f"{sale_id},1,1,{sale_id},0\n" for sale_id in range(1, 100))
+                          + "100,1,1,100,0")
+
+        for shard_count in (1, 3, 7):
+            self.assert_line_aligned(shard_count)
+            self.assertEqual(sum(self.read_shards(shard_count), []), list(range(1, 101)))
+
+    def test_more_shards_than_lines(self) -> None:
+        """Test that a file with fewer lines than shards is split into one shard per line at most"""
+
+        self.write_infile("Sales.csv", "1,1,1,1,0\r\n2,1,1,2,0\r\n3,1,1,3,0\r\n")
+
+        self.assert_line_aligned(16)
+        self.assertEqual(sum(self.read_shards(16), []), [1, 2, 3])
+        self.assertTrue(all(self.read_shards(16)))
+
+    def test_empty_file(self) -> None:
+        """Test that an empty file has no shards"""
+
+        self.write_infile("Sales.csv", "")
+
+        self.assertEqual(get_sales_shards("Sales.csv", 4), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import contextlib
+import io
+import pickle
+import sqlite3
+import unittest
+from decimal import Decimal
+from ..config import CACHE_FOLDER, DB_LOOKUP_BATCH_SIZE, DEFAULT_DB_FILE
+from ..read import read_prod_master
+from .temp_folder import TempFolderTestCase
+from ..sqlite_db import DbMapping, DbProductMaster, db_read_prod_master, db_read_team_map, import_table, \
+    read_prod_master_rows, save_rpts_to_db
+from ...models import Product, ProductSaleData
+
+
+class TestSqliteDb(TempFolderTestCase):
+    """Test case for the SQLite reference tables and report tables"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with the input files"""
+
+        super().setUp()
+
+        self.write_infile("TeamMap.csv", "TeamId,Name\n1,Team A\n2,\n")
+        self.write_infile("ProductMaster.csv", "".join(f"{prod_id},Product {prod_id},{prod_id}.25,{prod_id % 7 + 1}\n"
+                                                       for prod_id in range(1, 1201)))
+
+    def test_lookups(self) -> None:
+        """Test that only the products looked up are loaded, a batch of ids with each query"""
+
+        prod_master: DbProductMaster = db_read_prod_master(file_name="ProductMaster.csv")
+
+        self.assertEqual(prod_master[3], Product(name="Product 3", unit_price=Decimal("3.25"), lot_size=4))
+        self.assertIsNone(prod_master.get(5000))
+        self.assertNotIn(5000, prod_master)
+        self.assertEqual(prod_master.queries, 2)
+
+        prod_master.prefetch([*range(1, 1201), 5000, 5000])
+
+        expected_queries: int = 2 + -(-1199 // DB_LOOKUP_BATCH_SIZE)
+
+        self.assertEqual(prod_master.queries, expected_queries)
+        self.assertEqual(prod_master[1200].unit_price, Decimal("1200.25"))
+        self.assertEqual(prod_master.queries, expected_queries)
+
+    def test_matches_csv_reader(self) -> None:
+        """Test that the tables hold the same data as the .csv readers return"""
+
+        team_map = db_read_team_map(file_name="TeamMap.csv")
+        prod_master = db_read_prod_master(file_name="ProductMaster.csv")
+
+        self.assertEqual(dict(team_map.items()), {1: "Team A", 2: ""})
+        self.assertEqual(team_map[2], "")
+        self.assertEqual(dict(prod_master.items()), read_prod_master("ProductMaster.csv"))
+        self.assertEqual(len(prod_master), 1200)
+
+    def test_mapping_contract(self) -> None:
+        """Test that the items of a table can be counted and iterated more than once, and the base class is abstract"""
+
+        team_map = db_read_team_map(file_name="TeamMap.csv")
+
+        self.assertEqual(len(team_map.items()), 2)
+        self.assertIn((1, "Team A"), team_map.items())
+        self.assertEqual(list(team_map.items()), list(team_map.items()))
+        self.assertEqual(list(team_map.iter_rows()), [(1, "Team A"), (2, "")])
+        self.assertEqual(team_map.queries, 1)
+
+        self.assertRaises(TypeError, DbMapping, f"{CACHE_FOLDER}\\{DEFAULT_DB_FILE}")
+
+    def test_imports_changed_file(self) -> None:
+        """Test that a file is only imported again after it changes"""
+
+        db_path: str = f"{CACHE_FOLDER}\\{DEFAULT_DB_FILE}"
+
+        self.assertTrue(import_table(db_path, DbProductMaster, "ProductMaster.csv",
+                                     lambda: read_prod_master_rows("ProductMaster.csv")))
+        self.assertFalse(import_table(db_path, DbProductMaster, "ProductMaster.csv",
+                                      lambda: read_prod_master_rows("ProductMaster.csv")))
+
+        self.write_infile("ProductMaster.csv", "1,Product A,0.50,10\n")
+
+        prod_master = db_read_prod_master(file_name="ProductMaster.csv")
+
+        self.assertEqual(dict(prod_master.items()), {1: Product(name="Product A", unit_price=Decimal("0.50"),
+                                                                lot_size=10)})
+
+    def test_invalid_file(self) -> None:
+        """Test that an invalid file exits and leaves the table as it was, to be imported again next time"""
+
+        db_read_prod_master(file_name="ProductMaster.csv")
+        self.write_infile("ProductMaster.csv", "1,Product A,0.50,10\n2,Product B,free,1\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertRaises(SystemExit, db_read_prod_master, file_name="ProductMaster.csv")
+
+        self.assertEqual(len(DbProductMaster(f"{CACHE_FOLDER}\\{DEFAULT_DB_FILE}")), 1200)
+
+        self.write_infile("ProductMaster.csv", "1,Product A,0.50,10\n")
+
+        self.assertEqual(len(db_read_prod_master(file_name="ProductMaster.csv")), 1)
+
+    def test_pickle(self) -> None:
+        """Test that a pickled product master opens its own connection, as in a worker process"""
+
+        prod_master = db_read_prod_master(file_name="ProductMaster.csv")
+        prod_master.prefetch([1, 2])
+
+        unpickled: DbProductMaster = pickle.loads(pickle.dumps(prod_master))
+
+        self.assertEqual(unpickled[2], prod_master[2])
+        self.assertEqual(unpickled[3], prod_master[3])
+
+    def test_save_rpts(self) -> None:
+        """Test that the reports are saved in cents, replacing the reports saved before for the sales file"""
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_rpts_to_db(None, "Sales.csv", {"Team A": Decimal("1.005")}, {})
+
+            self.assertTrue(save_rpts_to_db(None, "Sales.csv",
+                                            {"Team B": Decimal("10.125")},
+                                            {"Product A": ProductSaleData(gross_rev=Decimal("10.125"), units_sold=3,
+                                                                          disc_cost=Decimal("0.5"))}))
+
+        with contextlib.closing(sqlite3.connect(f"{CACHE_FOLDER}\\{DEFAULT_DB_FILE}")) as conn:
+            self.assertEqual(conn.execute("SELECT * FROM team_report").fetchall(), [("Sales.csv", "Team B", 1012)])
+            self.assertEqual(conn.execute("SELECT * FROM product_report").fetchall(),
+                             [("Sales.csv", "Product A", 1012, 3, 50)])
+
+
+if __name__ == "__main__":
+    unittest.main()
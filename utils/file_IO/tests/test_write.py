@@ -0,0 +1,143 @@
+import csv
+import io
+import os
+import unittest
+from collections.abc import Iterator
+from decimal import Decimal
+from ..config import DESTINATION_FOLDER
+from .temp_folder import TempFolderTestCase
+from ..write import TEMP_FILE_PREFIX, QuarantineWriter, format_csv_line, get_temp_path, quote_csv_field, write_approx_prod_rpt, \
+    write_outfile, write_prod_rpt, write_top_units_rpt
+from ...models import ApproxProductSaleData, Estimate, ProductSaleData
+
+
+class TestWrite(TempFolderTestCase):
+    """Test case for the bulk .csv writer"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder"""
+
+        super().setUp()
+
+    def test_lines_match_csv_writer(self) -> None:
+        """Test that the formatted lines are the same as csv.writer writes, including quoted names"""
+
+        prod_rpt: dict[str, ProductSaleData] = {
+            "Widget, Large": ProductSaleData(gross_rev=Decimal("1234.565"), units_sold=3, disc_cost=Decimal("0.125")),
+            'The "Best" Widget': ProductSaleData(gross_rev=Decimal("10"), units_sold=1, disc_cost=Decimal("0.135")),
+            "Two\nLines": ProductSaleData(gross_rev=Decimal("5.5"), units_sold=2, disc_cost=Decimal(0)),
+            "Plain": ProductSaleData(gross_rev=Decimal("1E+3"), units_sold=4, disc_cost=Decimal("0.001"))
+        }
+
+        expected = io.StringIO()
+        csv.writer(expected).writerows(
+            [("Name", "GrossRevenue", "TotalUnits", "DiscountCost")]
+            + [(name, round(data.gross_rev, 2), data.units_sold, round(data.disc_cost, 2))
+               for name, data in sorted(prod_rpt.items(), key=lambda item: item[1].gross_rev, reverse=True)]
+        )
+
+        self.assertTrue(write_prod_rpt("Products.csv", prod_rpt))
+        self.assertEqual(self.read_outfile("Products.csv"), expected.getvalue())
+
+    def test_approx_rpts(self) -> None:
+        """Test that estimated reports are written with their intervals, ordered by estimate"""
+
+        prod_rpt: dict[str, ApproxProductSaleData] = {
+            "Gadget": ApproxProductSaleData(gross_rev=Estimate(value=10.5, low=8.254, high=12.746),
+                                            disc_cost=Estimate(value=0.0, low=0.0, high=0.0)),
+            "Widget, Large": ApproxProductSaleData(gross_rev=Estimate(value=100.0, low=90.0, high=110.0),
+                                                   disc_cost=Estimate(value=5.0, low=4.5, high=5.5))
+        }
+
+        self.assertTrue(write_approx_prod_rpt("Products.csv", prod_rpt))
+        self.assertEqual(self.read_outfile("Products.csv"),
+                         "Name,GrossRevenue,GrossRevenueLow,GrossRevenueHigh,"
+                         "DiscountCost,DiscountCostLow,DiscountCostHigh\r\n"
+                         '"Widget, Large",100.00,90.00,110.00,5.00,4.50,5.50\r\n'
+                         "Gadget,10.50,8.25,12.75,0.00,0.00,0.00\r\n")
+
+        top_units: dict[str, Estimate] = {"Gadget": Estimate(value=40, low=35, high=40),
+                                          "Widget": Estimate(value=70, low=70, high=70)}
+
+        self.assertTrue(write_top_units_rpt("TopUnits.csv", top_units, top=1))
+        self.assertEqual(self.read_outfile("TopUnits.csv"), "Name,UnitsSold,UnitsSoldLow,UnitsSoldHigh\r\n"
+                                                            "Widget,70,70,70\r\n")
+
+    def test_quote_csv_field(self) -> None:
+        """Test that only fields with a comma, quote, or line break are quoted"""
+
+        self.assertEqual(quote_csv_field("Team A"), "Team A")
+        self.assertEqual(quote_csv_field("A, B"), '"A, B"')
+        self.assertEqual(quote_csv_field('A "B"'), '"A ""B"""')
+
+    def test_replaces_file(self) -> None:
+        """Test that an existing file is replaced and no temporary file is left"""
+
+        self.assertTrue(write_outfile("Out.csv", [("A",), ("1",)]))
+        self.assertTrue(write_outfile("Out.csv", [("B",), ("2",)]))
+
+        self.assertEqual(self.read_outfile("Out.csv"), "B\r\n2\r\n")
+        self.assertFalse(os.path.exists(f"{DESTINATION_FOLDER}\\{TEMP_FILE_PREFIX}Out.csv"))
+
+    def test_format_csv_line(self) -> None:
+        """Test that rows of text and other fields are formatted as csv.writer writes them"""
+
+        rows: list[tuple] = [("Widget, Large", Decimal("1.50"), 3), ('A "B"', 2.5, -1), ("", Decimal("0.00"), 0)]
+
+        expected = io.StringIO()
+        csv.writer(expected).writerows(rows)
+
+        self.assertEqual("".join(map(format_csv_line, rows)), expected.getvalue())
+
+    def test_subfolder(self) -> None:
+        """Test that the temporary file of a file in a subfolder is written in that subfolder"""
+
+        self.assertEqual(get_temp_path("Output Files\\Out.csv"), f"Output Files\\{TEMP_FILE_PREFIX}Out.csv")
+        self.assertEqual(get_temp_path("Output Files\\Sub/Out.csv"), f"Output Files\\Sub/{TEMP_FILE_PREFIX}Out.csv")
+
+        os.makedirs(f"{DESTINATION_FOLDER}\\Sub")
+
+        self.assertTrue(write_outfile("Sub/Out.csv", [("A",), ("1",)]))
+        self.assertEqual(self.read_outfile("Sub/Out.csv"), "A\r\n1\r\n")
+
+    def test_failed_write_keeps_file(self) -> None:
+        """Test that a write that fails part way leaves the existing file as it was"""
+
+        self.assertTrue(write_outfile("Out.csv", [("A",), ("1",)]))
+
+        def failing_rows() -> Iterator[tuple[str]]:
+            yield "B",
+            raise ValueError("Invalid row")
+
+        self.assertRaises(ValueError, write_outfile, "Out.csv", failing_rows())
+
+        self.assertEqual(self.read_outfile("Out.csv"), "A\r\n1\r\n")
+        self.assertFalse(os.path.exists(f"{DESTINATION_FOLDER}\\{TEMP_FILE_PREFIX}Out.csv"))
+
+    def test_quarantine_writer(self) -> None:
+        """Test that quarantined sales are written in batches, with discounts normalised"""
+
+        writer = QuarantineWriter("Quarantine.csv")
+        writer.write_rows([(2, 7, 1, 3, Decimal("2.50"))])
+        writer.write_rows([])
+        writer.write_rows([(5, 1, 9, 1, Decimal("0.00")), (6, 1, 9, 2, Decimal("10"))])
+
+        self.assertTrue(writer.close())
+        self.assertEqual(self.read_outfile("Quarantine.csv"), "Row,ProductID,TeamID,LotsSold,Discount\r\n"
+                                                              "2,7,1,3,2.5\r\n"
+                                                              "5,1,9,1,0\r\n"
+                                                              "6,1,9,2,10\r\n")
+
+        writer = QuarantineWriter("Quarantine.csv")
+        writer.write_rows([(1, 2, 3, 4, Decimal(1))])
+        writer.discard()
+
+        self.assertEqual(self.read_outfile("Quarantine.csv"), "Row,ProductID,TeamID,LotsSold,Discount\r\n"
+                                                              "2,7,1,3,2.5\r\n"
+                                                              "5,1,9,1,0\r\n"
+                                                              "6,1,9,2,10\r\n")
+        self.assertFalse(os.path.exists(f"{DESTINATION_FOLDER}\\{TEMP_FILE_PREFIX}Quarantine.csv"))
+
+
+if __name__ == "__main__":
+    unittest.main()
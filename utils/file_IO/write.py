@@ -1,35 +1,136 @@
-# Defines functions for writing the team report, and product report csv files.
-
-import csv
+# Defines functions for writing the team report, and product report csv files, and the file of quarantined sales,
+# and the estimated reports of the approximate mode.
+# Each file is written to a temporary file next to it, which then replaces the file in one step, so a reader never
+# sees a partly written report. The file of quarantined sales is written while the sales are read.
+# Rows of .csv files are formatted into whole lines and written in large blocks.
+
+import heapq
+import os
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
+from contextlib import suppress
 from decimal import Decimal
-from .config import DEFAULT_TEAM_RPT_FILE, DEFAULT_PROD_RPT_FILE, DESTINATION_FOLDER
-from ..models import ProductSaleData
+from itertools import chain, islice
+from typing import Any
+from .arrow_io import is_columnar_file, write_columnar_outfile
+from .compression import open_file, strip_compression
+from .config import DEFAULT_CUBE_RPT_FILE, DEFAULT_QUARANTINE_FILE, DEFAULT_TEAM_RPT_FILE, DEFAULT_PROD_RPT_FILE, \
+    DEFAULT_TOP_UNITS_RPT_FILE, DESTINATION_FOLDER, WRITE_BATCH_ROWS
+from ..models import ApproxProductSaleData, Estimate, ProductSaleData, SalesCube
+from ..profiling import count_rows, record_rows
+
+# Prefix of the temporary file an output file is written to before it replaces the output file.
+# The suffixes are kept, so the temporary file is written in the same format.
+TEMP_FILE_PREFIX: str = "~"
+
+# Line terminator of .csv files, the default of csv.writer
+CSV_LINE_END: str = "\r\n"
+
+
+def quote_csv_field(field: str) -> str:
+    """
+        Quotes a text field of a .csv line as csv.writer does, only if it contains a comma, quote, or line break
+
+        :param field: field to quote (str)
+
+        :return: field, quoted if needed (str)
+    """
+
+    if ',' in field or '"' in field or '\n' in field or '\r' in field:
+        return '"' + field.replace('"', '""') + '"'
+
+    return field
+
+
+def format_csv_line(row: Iterable) -> str:
+    """
+        Formats a row as a .csv line as csv.writer does. Text fields are quoted only if needed,
+        and other fields are written as str.
+
+        :param row: fields of the row
+
+        :return: line, ending in CSV_LINE_END (str)
+    """
+
+    return ",".join(quote_csv_field(field) if isinstance(field, str) else str(field) for field in row) + CSV_LINE_END
+
+
+def get_temp_path(file_path: str) -> str:
+    """
+        Gets the path of the temporary file a file is written to before it replaces the file.
+        Only the name of the file is prefixed, so a file in a subfolder keeps its temporary file in that subfolder.
+
+        :param file_path: path of the file (str)
+
+        :return: path of the temporary file (str)
+    """
 
+    name_start: int = max(file_path.rfind("\\"), file_path.rfind("/")) + 1
 
-def write_outfile(file_name: str, file_rows: list) -> bool:
+    return f"{file_path[:name_start]}{TEMP_FILE_PREFIX}{file_path[name_start:]}"
+
+
+def write_csv_lines(outfile: Any, file_lines: Iterable[str]) -> None:
+    """
+        Writes formatted lines to a .csv file in blocks of WRITE_BATCH_ROWS lines, so each block is one write
+
+        :param outfile: file opened for writing text
+        :param file_lines: iterable of lines, each ending in CSV_LINE_END
+    """
+
+    lines_iter: Iterator[str] = iter(file_lines)
+
+    while block := list(islice(lines_iter, WRITE_BATCH_ROWS)):
+        outfile.write("".join(block))
+        record_rows("rows_written", len(block))
+
+
+def check_outfile_name(file_name: str) -> bool:
+    """
+        Checks that an output file can be written in one of the supported formats, printing an error if not
+
+        :param file_name: name of the file to write (str)
+
+        :return: bool indicating if the file name is valid
+    """
+
+    if strip_compression(file_name)[-4:] != ".csv" and not is_columnar_file(file_name):
+        print("Error: Output files must be specified as .csv, .parquet, or .arrow files\n")
+        return False
+
+    return True
+
+
+def write_outfile(file_name: str, file_rows: Iterable) -> bool:
     """
         Generic function to write an output file
 
-        :param file_name: name of the file to write (str or None)
-        :param file_rows: tuple of rows to write to the file
+        :param file_name: name of the file to write (str or None). Files ending in .parquet, .arrow, .feather,
+            or .ipc are written as Parquet or Arrow IPC files instead of .csv files, and .csv files followed by
+            .gz, .bz2, .xz, or .zst are compressed.
+        :param file_rows: iterable of rows to write to the file. Rows are consumed one at a time,
+            so a generator can be used to format rows as they are written
 
         :return: bool indicating if file was successfully written
     """
 
-    if file_name[-4:] != ".csv":
-        print("Error: Output files must be specified as .csv files\n")
+    if not check_outfile_name(file_name):
         return False
 
     success = False
     file_path = f"{DESTINATION_FOLDER}\\{file_name}"
+    temp_path = get_temp_path(file_path)
 
     try:
-        with open(file_path, 'w', newline='') as outfile:
-            file_writer = csv.writer(outfile)
+        if is_columnar_file(file_name):
+            write_columnar_outfile(temp_path, count_rows(file_rows, "rows_written"))
 
-            # Write rows
-            for row in file_rows:
-                file_writer.writerow(row)
+        else:
+            # Files ending in .gz, .bz2, .xz, or .zst are compressed as they are written
+            with open_file(temp_path, 'w', newline='') as outfile:
+                write_csv_lines(outfile, map(format_csv_line, file_rows))
+
+        # Replacing the file is atomic, and avoids truncating a large existing file
+        os.replace(temp_path, file_path)
 
         success = True
 
@@ -39,10 +140,55 @@ def write_outfile(file_name: str, file_rows: list) -> bool:
     except FileNotFoundError:
         print(f"Error: Output folder ({DESTINATION_FOLDER}) not found.\n")
 
+    finally:
+        if not success:
+            with suppress(OSError):
+                os.remove(temp_path)
+
     return success
 
 
-def write_team_rpt(file_name: str | None, team_rpt: dict[str, Decimal]) -> None:
+def rank_rpt_items(rpt_items: Iterable[tuple[Any, Any]],
+                   key: Callable[[tuple[Any, Any]], Decimal],
+                   top: int | None
+                   ) -> list[tuple[Any, Any]]:
+    """
+        Orders the items of a report from highest to lowest value
+
+        :param rpt_items: iterable of report items (key, data)
+        :param key: function that gets the value to order an item by
+        :param top: optional number of items to keep (int or None). The highest items are selected with a heap
+            instead of sorting every item.
+
+        :return: list of report items (key, data)
+    """
+
+    if top is not None:
+        return heapq.nlargest(top, rpt_items, key=key)
+
+    return sorted(rpt_items, key=key, reverse=True)
+
+
+def rank_rpt_keys(rpt: Mapping[Hashable, Any], value: Callable[[Hashable], Any], top: int | None) -> list[Hashable]:
+    """
+        Orders the keys of a report from highest to lowest value. Only the keys are ordered,
+        so no (key, data) pair is created for each item.
+
+        :param rpt: report dict
+        :param value: function that gets the value to order a key by
+        :param top: optional number of keys to keep (int or None). The highest keys are selected with a heap
+            instead of sorting every key.
+
+        :return: list of report keys
+    """
+
+    if top is not None:
+        return heapq.nlargest(top, rpt, key=value)
+
+    return sorted(rpt, key=value, reverse=True)
+
+
+def write_team_rpt(file_name: str | None, team_rpt: dict[str, Decimal], top: int | None = None) -> bool:
     """
         Writes a csv file from data in the team report dictionary
 
@@ -50,24 +196,26 @@ def write_team_rpt(file_name: str | None, team_rpt: dict[str, Decimal]) -> None:
         :param team_rpt: team report dict with
             key = team name (str),
             value = revenue (Decimal)
+        :param top: optional number of teams with the highest revenue to write (int or None).
+            All teams are written if None.
 
-        :return: None
+        :return: bool indicating if file was successfully written
     """
 
     if file_name is None:
         # Use default file name from config.py
         file_name = DEFAULT_TEAM_RPT_FILE
 
-        print(f"Sales file not specified. Default used: {file_name}")
+        print(f"Team report file not specified. Default used: {file_name}")
         print("To change this, run again with --team-report={name of file}\n")
 
-    # Create list of rows to write to file from the team report
-    file_rows: list[tuple[str, str]] = [(team, f"{round(revenue, 2):.2f}")
-                                        for team, revenue in team_rpt.items()]
+    # Order teams by revenue, then format only the rows that are written
+    ranked_teams: list[str] = rank_rpt_keys(team_rpt, team_rpt.__getitem__, top)
 
-    # Sort and add header
-    file_rows.sort(key=lambda r: float(r[1]), reverse=True)
-    file_rows.insert(0, ("Team", "GrossRevenue"))
+    file_rows: Iterable[tuple[str, str | Decimal]] = chain(
+        [("Team", "GrossRevenue")],
+        ((team, round(team_rpt[team], 2)) for team in ranked_teams)
+    )
 
     # Write file
     success = write_outfile(file_name, file_rows)
@@ -75,10 +223,13 @@ def write_team_rpt(file_name: str | None, team_rpt: dict[str, Decimal]) -> None:
     if success:
         print(f"Success: Team report file written at {DESTINATION_FOLDER}\\{file_name}\n")
 
+    return success
+
 
 def write_prod_rpt(file_name: str | None,
-                   prod_rpt: dict[str, ProductSaleData]
-                   ) -> None:
+                   prod_rpt: dict[str, ProductSaleData],
+                   top: int | None = None
+                   ) -> bool:
     """
         Writes a csv file from data in the team report dictionary
 
@@ -86,31 +237,286 @@ def write_prod_rpt(file_name: str | None,
         :param prod_rpt: product report dict with
             key = product name (str),
             value = ProductSaleData
+        :param top: optional number of products with the highest gross revenue to write (int or None).
+            All products are written if None.
+
+        :return: bool indicating if file was successfully written
+    """
+
+    if file_name is None:
+        # Use default file name from config.py
+        file_name: str = DEFAULT_PROD_RPT_FILE
+
+        print(f"Product report file not specified. Default used: {file_name}")
+        print("To change this, run again with --product-report={name of file}\n")
+
+    # Order products by gross revenue, then format only the rows that are written
+    ranked_names: list[str] = rank_rpt_keys(prod_rpt, lambda name: prod_rpt[name].gross_rev, top)
+
+    file_rows: Iterable[tuple[str, str | Decimal, int | str, str | Decimal]] = chain(
+        [("Name", "GrossRevenue", "TotalUnits", "DiscountCost")],
+        ((name,
+          round(prod_rpt[name].gross_rev, 2),
+          prod_rpt[name].units_sold,
+          round(prod_rpt[name].disc_cost, 2))
+         for name in ranked_names)
+    )
+
+    # Write file
+    success = write_outfile(file_name, file_rows)
+
+    if success:
+        print(f"Success: Product report file written at {DESTINATION_FOLDER}\\{file_name}\n")
+
+    return success
+
+
+def write_cube_rpt(file_name: str | None, cube: SalesCube, top: int | None = None) -> bool:
+    """
+        Writes a csv file from the cells of a team by product cube, or of a slice of one
+
+        :param file_name: optional name of the file to write (str or None)
+        :param cube: cube of sales data (SalesCube)
+        :param top: optional number of cells with the highest gross revenue to write (int or None).
+            All cells are written if None.
+
+        :return: bool indicating if file was successfully written
+    """
+
+    if file_name is None:
+        # Use default file name from config.py
+        file_name: str = DEFAULT_CUBE_RPT_FILE
+
+        print(f"Team product report file not specified. Default used: {file_name}")
+        print("To change this, run again with --cube-report={name of file}\n")
+
+    # Order cells by gross revenue, then format only the rows that are written
+    ranked_cells: list[tuple[int, int]] = rank_rpt_keys(cube.cells, lambda cell: cube.cells[cell].gross_rev, top)
 
-        :return: None
+    file_rows: Iterable[tuple[str, str, str | Decimal, int | str, str | Decimal]] = chain(
+        [("Team", "Product", "GrossRevenue", "TotalUnits", "DiscountCost")],
+        ((cube.team_names[team_id],
+          cube.prod_names[prod_id],
+          round(cube.cells[team_id, prod_id].gross_rev, 2),
+          cube.cells[team_id, prod_id].units_sold,
+          round(cube.cells[team_id, prod_id].disc_cost, 2))
+         for team_id, prod_id in ranked_cells)
+    )
+
+    # Write file
+    success = write_outfile(file_name, file_rows)
+
+    if success:
+        print(f"Success: Team product report file written at {DESTINATION_FOLDER}\\{file_name}\n")
+
+    return success
+
+
+def write_approx_team_rpt(file_name: str | None, team_rpt: dict[str, Estimate], top: int | None = None) -> bool:
+    """
+        Writes a csv file from an estimated team report, with the interval of each gross revenue
+
+        :param file_name: optional name of the file to write (str or None)
+        :param team_rpt: estimated team report dict with
+            key = team name (str),
+            value = estimated gross revenue (Estimate)
+        :param top: optional number of teams with the highest estimated gross revenue to write (int or None).
+            All teams are written if None.
+
+        :return: bool indicating if file was successfully written
+    """
+
+    if file_name is None:
+        # Use default file name from config.py
+        file_name: str = DEFAULT_TEAM_RPT_FILE
+
+        print(f"Team report file not specified. Default used: {file_name}")
+        print("To change this, run again with --team-report={name of file}\n")
+
+    ranked_teams: list[str] = rank_rpt_keys(team_rpt, lambda team: team_rpt[team].value, top)
+
+    file_rows: Iterable[tuple[str, str, str, str]] = chain(
+        [("Team", "GrossRevenue", "GrossRevenueLow", "GrossRevenueHigh")],
+        ((team, f"{team_rpt[team].value:.2f}", f"{team_rpt[team].low:.2f}", f"{team_rpt[team].high:.2f}")
+         for team in ranked_teams)
+    )
+
+    # Write file
+    success = write_outfile(file_name, file_rows)
+
+    if success:
+        print(f"Success: Team report file written at {DESTINATION_FOLDER}\\{file_name}\n")
+
+    return success
+
+
+def write_approx_prod_rpt(file_name: str | None,
+                          prod_rpt: dict[str, ApproxProductSaleData],
+                          top: int | None = None
+                          ) -> bool:
+    """
+        Writes a csv file from an estimated product report, with the interval of each amount
+
+        :param file_name: optional name of the file to write (str or None)
+        :param prod_rpt: estimated product report dict with
+            key = product name (str),
+            value = ApproxProductSaleData
+        :param top: optional number of products with the highest estimated gross revenue to write (int or None).
+            All products are written if None.
+
+        :return: bool indicating if file was successfully written
     """
 
     if file_name is None:
         # Use default file name from config.py
         file_name: str = DEFAULT_PROD_RPT_FILE
 
-        print(f"Sales file not specified. Default used: {file_name}")
+        print(f"Product report file not specified. Default used: {file_name}")
         print("To change this, run again with --product-report={name of file}\n")
 
-    # Create list of rows to write to file from the product report
-    file_rows: list[tuple[str, str, int | str, str]] = [(
-        name,
-        f"{round(data.gross_rev, 2):.2f}",
-        data.units_sold,
-        f"{round(data.disc_cost, 2):.2f}")
-        for name, data in prod_rpt.items()]
+    ranked_names: list[str] = rank_rpt_keys(prod_rpt, lambda name: prod_rpt[name].gross_rev.value, top)
 
-    # Sort and add header
-    file_rows.sort(key=lambda r: float(r[1]), reverse=True)
-    file_rows.insert(0, ("Name", "GrossRevenue", "TotalUnits", "DiscountCost"))
+    file_rows: Iterable[tuple[str, ...]] = chain(
+        [("Name", "GrossRevenue", "GrossRevenueLow", "GrossRevenueHigh",
+          "DiscountCost", "DiscountCostLow", "DiscountCostHigh")],
+        ((name,
+          f"{data.gross_rev.value:.2f}", f"{data.gross_rev.low:.2f}", f"{data.gross_rev.high:.2f}",
+          f"{data.disc_cost.value:.2f}", f"{data.disc_cost.low:.2f}", f"{data.disc_cost.high:.2f}")
+         for name, data in zip(ranked_names, map(prod_rpt.__getitem__, ranked_names)))
+    )
 
     # Write file
     success = write_outfile(file_name, file_rows)
 
     if success:
         print(f"Success: Product report file written at {DESTINATION_FOLDER}\\{file_name}\n")
+
+    return success
+
+
+def write_top_units_rpt(file_name: str | None, top_units: dict[str, Estimate], top: int | None = None) -> bool:
+    """
+        Writes a csv file of the products that sold the most units, with bounds on the units sold of each
+
+        :param file_name: optional name of the file to write (str or None)
+        :param top_units: dict with key = product name (str), value = units sold (Estimate)
+        :param top: optional number of products with the most units sold to write (int or None).
+            All products are written if None.
+
+        :return: bool indicating if file was successfully written
+    """
+
+    if file_name is None:
+        # Use default file name from config.py
+        file_name: str = DEFAULT_TOP_UNITS_RPT_FILE
+
+        print(f"Top units report file not specified. Default used: {file_name}")
+        print("To change this, run again with --top-units-report={name of file}\n")
+
+    ranked_names: list[str] = rank_rpt_keys(top_units, lambda name: top_units[name].value, top)
+
+    file_rows: Iterable[tuple[str, int, int, int]] = chain(
+        [("Name", "UnitsSold", "UnitsSoldLow", "UnitsSoldHigh")],
+        ((name, int(units.value), int(units.low), int(units.high))
+         for name, units in zip(ranked_names, map(top_units.__getitem__, ranked_names)))
+    )
+
+    # Write file
+    success = write_outfile(file_name, file_rows)
+
+    if success:
+        print(f"Success: Top units report file written at {DESTINATION_FOLDER}\\{file_name}\n")
+
+    return success
+
+
+def format_discount(discount: Decimal) -> str:
+    """
+        Formats a discount without trailing zeros, so a discount is written the same whichever reader parsed it
+
+        :param discount: discount given in percent (Decimal)
+
+        :return: formatted discount, e.g. 2.5 for 2.50 (str)
+    """
+
+    return format(discount.normalize(), "f")
+
+
+class QuarantineWriter:
+    """
+        Writes the sales removed because they refer to an unknown team or product to a .csv file as they are found,
+        so they are not held in memory
+    """
+
+    def __init__(self, file_name: str | None):
+        """
+            Starts writing a quarantine file. The file replaces any existing file when it is closed.
+
+            :param file_name: optional name of the file to write (str or None)
+        """
+
+        if file_name is None:
+            # Use default file name from config.py
+            file_name: str = DEFAULT_QUARANTINE_FILE
+
+            print(f"Quarantine file not specified. Default used: {file_name}")
+            print("To change this, run again with --quarantine-file={name of file}\n")
+
+        if strip_compression(file_name)[-4:] != ".csv":
+            print("Error: The quarantine file must be a .csv file, as it is written while the sales are read\n")
+            exit()
+
+        self.file_path: str = f"{DESTINATION_FOLDER}\\{file_name}"
+        self.temp_path: str = get_temp_path(self.file_path)
+
+        try:
+            # Files ending in .gz, .bz2, .xz, or .zst are compressed as they are written
+            self.outfile = open_file(self.temp_path, 'w', newline='')
+
+        except FileNotFoundError:
+            print(f"Error: Output folder ({DESTINATION_FOLDER}) not found.\n")
+            exit()
+
+        except PermissionError:
+            print(f"Error: Cannot write file at {self.temp_path}. Ensure the file is closed.\n")
+            exit()
+
+        self.outfile.write(format_csv_line(("Row", "ProductID", "TeamID", "LotsSold", "Discount")))
+
+    def write_rows(self, quarantine: Iterable[tuple[int, int, int, int, Decimal]]) -> None:
+        """
+            Writes removed sales to the quarantine file
+
+            :param quarantine: iterable of removed sales, as (row number, product id, team id, lots sold, discount)
+        """
+
+        write_csv_lines(self.outfile, (format_csv_line((row, prod_id, team_id, lots_sold, format_discount(discount)))
+                                       for row, prod_id, team_id, lots_sold, discount in quarantine))
+
+    def close(self) -> bool:
+        """
+            Finishes the quarantine file and replaces any existing file with it
+
+            :return: bool indicating if file was successfully written
+        """
+
+        try:
+            self.outfile.close()
+            os.replace(self.temp_path, self.file_path)
+
+        except PermissionError:
+            print(f"Error: Cannot write file at {self.file_path}. Ensure the file is closed.")
+            self.discard()
+            return False
+
+        print(f"Success: Quarantine file written at {self.file_path}\n")
+
+        return True
+
+    def discard(self) -> None:
+        """Deletes the quarantine file being written without replacing any existing file"""
+
+        self.outfile.close()
+
+        with suppress(OSError):
+            os.remove(self.temp_path)
@@ -1 +1,6 @@
-from .models import Product, ProductSaleData, Sale
+from .merge import merge_prod_rpts, merge_team_rpts
+from .models import ApproxProductSaleData, ApproxReport, BatchJob, Estimate, InvalidId, JobResult, PeriodIndex, \
+    Product, ProductSaleData, ReportState, Sale, SalesCube, ValidationReport
+from .product_table import ProductTable
+from .sales_table import SalesTable, SaleView
+from .scaled import BASIS_POINT_PLACES, CENT_PLACES, MICRO_CENT_PLACES, from_scaled_int, rescale_int, to_scaled_int
@@ -0,0 +1,46 @@
+# Defines functions for merging partial team and product reports.
+# Merging is associative, so partial reports can be combined in any grouping.
+
+from decimal import Decimal
+from .models import ProductSaleData
+
+
+def merge_team_rpts(*team_rpts: dict[str, Decimal]) -> dict[str, Decimal]:
+    """
+        Merges team reports into a new team report
+
+        :param team_rpts: team report dicts with key = team name (str), value = gross revenue (Decimal)
+
+        :returns: merged team report dict with key = team name (str), value = gross revenue (Decimal)
+    """
+
+    merged_rpt: dict[str, Decimal] = {}
+
+    for team_rpt in team_rpts:
+        for team_name, gross_rev in team_rpt.items():
+            merged_rpt[team_name] = merged_rpt[team_name] + gross_rev if team_name in merged_rpt else gross_rev
+
+    return merged_rpt
+
+
+def merge_prod_rpts(*prod_rpts: dict[str, ProductSaleData]) -> dict[str, ProductSaleData]:
+    """
+        Merges product reports into a new product report. The input reports are not modified.
+
+        :param prod_rpts: product report dicts with key = product name (str), value = ProductSaleData
+
+        :returns: merged product report dict with key = product name (str), value = ProductSaleData
+    """
+
+    merged_rpt: dict[str, ProductSaleData] = {}
+
+    for prod_rpt in prod_rpts:
+        for prod_name, prod_sale_data in prod_rpt.items():
+            if prod_name in merged_rpt:
+                merged_rpt[prod_name] = merged_rpt[prod_name] + prod_sale_data
+            else:
+                merged_rpt[prod_name] = ProductSaleData(gross_rev=prod_sale_data.gross_rev,
+                                                        units_sold=prod_sale_data.units_sold,
+                                                        disc_cost=prod_sale_data.disc_cost)
+
+    return merged_rpt
@@ -1,12 +1,14 @@
 # Defines custom dataclass models.
+# The models use slots instead of a per-instance __dict__ to keep their memory use small.
 # Decimal is used instead of float to represent money in order to avoid
 # rounding errors that floats are prone to.
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import date
 from decimal import Decimal
 
 
-@dataclass
+@dataclass(slots=True)
 class Product:
     """Model for product data"""
 
@@ -15,7 +17,7 @@ class Product:
     lot_size: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductSaleData:
     """Model for sales data of a product"""
 
@@ -23,8 +25,15 @@ class ProductSaleData:
     units_sold: int
     disc_cost: Decimal
 
+    def __add__(self, other: "ProductSaleData") -> "ProductSaleData":
+        """Combines the sales data of a product from two reports"""
 
-@dataclass
+        return ProductSaleData(gross_rev=self.gross_rev + other.gross_rev,
+                               units_sold=self.units_sold + other.units_sold,
+                               disc_cost=self.disc_cost + other.disc_cost)
+
+
+@dataclass(slots=True)
 class Sale:
     """Model for a sale"""
 
@@ -32,3 +41,107 @@ class Sale:
     team_id: int
     lots_sold: int
     discount: Decimal
+
+
+@dataclass(slots=True)
+class ReportState:
+    """Model for the saved state of an incrementally updated report"""
+
+    offset: int  # byte offset in the sales file up to which sales have been added
+    checksum: str  # CRC-32 of the sales file up to the offset
+    file_size: int  # size of the sales file when the state was saved
+    mtime_ns: int  # modification time of the sales file when the state was saved
+    ref_checksum: str  # checksum of the team map and product master used
+    team_rpt: dict[str, Decimal]
+    prod_rpt: dict[str, ProductSaleData]
+
+
+@dataclass(slots=True)
+class SalesCube:
+    """Model for sales data of each pair of team and product"""
+
+    cells: dict[tuple[int, int], ProductSaleData]  # key = (team id, product id)
+    team_names: dict[int, str]  # key = team id
+    prod_names: dict[int, str]  # key = product id
+
+
+@dataclass(slots=True)
+class PeriodIndex:
+    """Model for team and product reports of each day in the sales file"""
+
+    offset: int  # byte offset in the sales file up to which sales have been indexed
+    checksum: str  # CRC-32 of the sales file up to the offset
+    file_size: int  # size of the sales file when the index was saved
+    mtime_ns: int  # modification time of the sales file when the index was saved
+    ref_checksum: str  # checksum of the team map and product master used
+    team_rpts: dict[date, dict[str, Decimal]]  # key = sale date, only the days loaded or added
+    prod_rpts: dict[date, dict[str, ProductSaleData]]  # key = sale date, only the days loaded or added
+    days: dict[date, int] = field(default_factory=dict)  # key = sale date, value = offset its reports were saved at
+
+
+@dataclass(slots=True)
+class BatchJob:
+    """Model for one job of a batch run"""
+
+    sales_fn: str
+    team_report_fn: str
+    prod_report_fn: str
+
+
+@dataclass(slots=True)
+class JobResult:
+    """Model for the outcome of one job of a batch run"""
+
+    job: BatchJob
+    success: bool
+    seconds: float  # wall time of the job
+    sales: int  # number of sales read
+    message: str  # output of the job, kept to explain failures
+
+
+@dataclass(slots=True)
+class InvalidId:
+    """Model for the sales that refer to one id missing from the team map or product master"""
+
+    count: int  # number of sales with the id
+    sample_rows: list[int]  # row numbers in the sales file of the first sales with the id
+
+
+@dataclass(slots=True)
+class ValidationReport:
+    """Model for the sales that refer to a team or product missing from the team map or product master"""
+
+    rows: int = 0  # number of sales checked
+    invalid_rows: int = 0  # number of sales with an unknown team id or product id
+    unknown_prods: dict[int, InvalidId] = field(default_factory=dict)  # key = product id
+    unknown_teams: dict[int, InvalidId] = field(default_factory=dict)  # key = team id
+
+
+@dataclass(slots=True)
+class Estimate:
+    """Model for an estimated amount and the interval the true amount is expected to be in"""
+
+    # Floats are used, as estimates are not exact to the cent
+
+    value: float
+    low: float
+    high: float
+
+
+@dataclass(slots=True)
+class ApproxProductSaleData:
+    """Model for estimated sales data of a product"""
+
+    gross_rev: Estimate
+    disc_cost: Estimate
+
+
+@dataclass(slots=True)
+class ApproxReport:
+    """Model for team and product reports estimated from a sample of the sales"""
+
+    sales: int  # number of sales read
+    sampled: int  # number of sales in the sample
+    team_rpt: dict[str, Estimate]  # key = team name, estimated gross revenue
+    prod_rpt: dict[str, ApproxProductSaleData]  # key = product name
+    top_units: dict[str, Estimate]  # key = product name, units sold of the products that sold the most units
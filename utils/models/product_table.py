@@ -0,0 +1,59 @@
+# Defines a struct-of-arrays container for product master data.
+# Prices are held as integer cents. The table can be used anywhere a product master dict is,
+# with Product entries created the first time each product is looked up.
+
+from array import array
+from collections.abc import Iterator, Mapping
+from .models import Product
+from .scaled import CENT_PLACES, from_scaled_int
+
+
+class ProductTable(Mapping):
+    """Struct-of-arrays container for product master data, mapping product id (int) to Product"""
+
+    def __init__(self):
+        self.prod_ids: array = array('q')
+        self.names: list[str] = []
+        self.price_cents: array = array('q')
+        self.lot_sizes: array = array('q')
+        self.rows: dict[int, int] = {}  # product id -> row in the table
+        self.products: dict[int, Product] = {}  # products that have been looked up
+
+    def append(self, prod_id: int, name: str, price_cents: int, lot_size: int) -> None:
+        """
+            Adds a product to the table. A product with the same id as an earlier product replaces it.
+
+            :param prod_id: id of the product (int)
+            :param name: name of the product (str)
+            :param price_cents: unit price in cents (int)
+            :param lot_size: lot size (int)
+        """
+
+        self.rows[prod_id] = len(self.names)
+        self.products.pop(prod_id, None)
+
+        self.prod_ids.append(prod_id)
+        self.names.append(name)
+        self.price_cents.append(price_cents)
+        self.lot_sizes.append(lot_size)
+
+    def __getitem__(self, prod_id: int) -> Product:
+        product: Product | None = self.products.get(prod_id)
+
+        if product is None:
+            row: int = self.rows[prod_id]
+
+            product = self.products[prod_id] = Product(name=self.names[row],
+                                                       unit_price=from_scaled_int(self.price_cents[row], CENT_PLACES),
+                                                       lot_size=self.lot_sizes[row])
+
+        return product
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, prod_id: object) -> bool:
+        return prod_id in self.rows
@@ -0,0 +1,72 @@
+# Defines helpers for representing Decimal amounts as scaled integers.
+# Scaled integers let sums be computed with exact integer arithmetic instead of Decimal arithmetic.
+
+from decimal import Decimal
+
+# Number of decimal places kept for prices (cents)
+CENT_PLACES: int = 2
+
+# Number of decimal places kept for prices in the fixed-point engine (micro-cents, a millionth of a cent)
+MICRO_CENT_PLACES: int = 8
+
+# Number of decimal places kept for discount percentages (basis points)
+BASIS_POINT_PLACES: int = 2
+
+
+def to_scaled_int(value: Decimal | int | str, places: int) -> int:
+    """
+        Converts an amount to an integer scaled by 10 ** places
+
+        :param value: amount to convert (Decimal, int, or str)
+        :param places: number of decimal places to keep (int)
+
+        :returns: scaled amount (int)
+
+        :raises ValueError if the amount has more decimal places than can be kept
+    """
+
+    scaled: Decimal = Decimal(value).scaleb(places)
+
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"{value} has more than {places} decimal places")
+
+    return int(scaled)
+
+
+def from_scaled_int(value: int, places: int) -> Decimal:
+    """
+        Converts an integer scaled by 10 ** places back to a Decimal
+
+        :param value: scaled amount (int)
+        :param places: number of decimal places in the scaled amount (int)
+
+        :returns: amount (Decimal)
+    """
+
+    return Decimal(value).scaleb(-places)
+
+
+def rescale_int(mantissa: int, exponent: int, places: int) -> int:
+    """
+        Converts an amount stored as mantissa * 10 ** exponent to an integer scaled by 10 ** places
+
+        :param mantissa: mantissa of the amount (int)
+        :param exponent: decimal exponent of the amount (int)
+        :param places: number of decimal places to keep (int)
+
+        :returns: scaled amount (int)
+
+        :raises ValueError if the amount has more decimal places than can be kept
+    """
+
+    shift: int = exponent + places
+
+    if shift >= 0:
+        return mantissa * 10 ** shift
+
+    scaled, remainder = divmod(mantissa, 10 ** -shift)
+
+    if remainder:
+        raise ValueError(f"{mantissa}E{exponent} has more than {places} decimal places")
+
+    return scaled
@@ -0,0 +1,44 @@
+import unittest
+from decimal import Decimal
+from ..merge import merge_prod_rpts, merge_team_rpts
+from ..models import ProductSaleData
+
+
+class TestMergeRpts(unittest.TestCase):
+    """Test case for merge_team_rpts and merge_prod_rpts"""
+
+    def test_merge_team_rpts(self) -> None:
+        """Test merging team reports with shared and distinct teams"""
+
+        merged_rpt = merge_team_rpts({"Team A": Decimal(100)},
+                                     {"Team A": Decimal(50), "Team B": Decimal(25)},
+                                     {})
+
+        self.assertEqual(merged_rpt, {"Team A": Decimal(150), "Team B": Decimal(25)})
+
+    def test_merge_prod_rpts(self) -> None:
+        """Test merging product reports does not modify the inputs"""
+
+        prod_rpt_a = {"Product A": ProductSaleData(gross_rev=Decimal(100), units_sold=10, disc_cost=Decimal(10))}
+        prod_rpt_b = {"Product A": ProductSaleData(gross_rev=Decimal(50), units_sold=5, disc_cost=Decimal(5)),
+                      "Product B": ProductSaleData(gross_rev=Decimal(75), units_sold=10, disc_cost=Decimal(2))}
+
+        merged_rpt = merge_prod_rpts(prod_rpt_a, prod_rpt_b)
+
+        self.assertEqual(merged_rpt["Product A"],
+                         ProductSaleData(gross_rev=Decimal(150), units_sold=15, disc_cost=Decimal(15)))
+        self.assertEqual(merged_rpt["Product B"],
+                         ProductSaleData(gross_rev=Decimal(75), units_sold=10, disc_cost=Decimal(2)))
+        self.assertEqual(prod_rpt_a["Product A"].gross_rev, Decimal(100))
+
+    def test_merge_is_associative(self) -> None:
+        """Test that the grouping of merges does not change the result"""
+
+        rpts = [{"Team A": Decimal(1)}, {"Team A": Decimal(2), "Team B": Decimal(3)}, {"Team B": Decimal(4)}]
+
+        self.assertEqual(merge_team_rpts(merge_team_rpts(rpts[0], rpts[1]), rpts[2]),
+                         merge_team_rpts(rpts[0], merge_team_rpts(rpts[1], rpts[2])))
+
+
+if __name__ == "__main__":
+    unittest.main()
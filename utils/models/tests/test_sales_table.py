@@ -0,0 +1,45 @@
+import unittest
+from decimal import Decimal
+from ..models import Sale
+from ..sales_table import SalesTable
+
+
+class TestSalesTable(unittest.TestCase):
+    """Test case for SalesTable"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a set of data"""
+
+        cls.sales_data: tuple[Sale] = (
+            Sale(prod_id=1, team_id=2, lots_sold=10, discount=Decimal("0")),
+            Sale(prod_id=3, team_id=1, lots_sold=5, discount=Decimal("2.50")),
+            Sale(prod_id=2, team_id=3, lots_sold=1, discount=Decimal("12.125"))
+        )
+
+        cls.sales_table: SalesTable = SalesTable.from_sales(cls.sales_data)
+
+    def test_views_match_sales(self) -> None:
+        """Test that the views of the table have the same fields as the sales added"""
+
+        self.assertEqual(len(self.sales_table), 3)
+
+        for sale, view in zip(self.sales_data, self.sales_table):
+            self.assertEqual((view.prod_id, view.team_id, view.lots_sold, view.discount),
+                             (sale.prod_id, sale.team_id, sale.lots_sold, sale.discount))
+
+        self.assertEqual(str(self.sales_table[-1].discount), "12.125")
+
+    def test_index_out_of_range(self) -> None:
+        """Test indexing past the end of the table"""
+        self.assertRaises(IndexError, self.sales_table.__getitem__, 3)
+
+    def test_scaled_discounts(self) -> None:
+        """Test getting the discounts as scaled integers"""
+
+        self.assertEqual(list(self.sales_table.scaled_discounts(3)), [0, 2500, 12125])
+        self.assertRaises(ValueError, list, self.sales_table.scaled_discounts(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1 +1,3 @@
 from .parse_input import parse_input
+from .parse_batch_input import parse_batch_input
+from .parse_serve_input import parse_serve_input
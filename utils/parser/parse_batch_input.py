@@ -0,0 +1,54 @@
+# Defines function for parsing user command line arguments for batch runs
+
+import argparse
+import os
+
+
+def parse_batch_input() -> argparse.Namespace:
+    """
+        Parses user arguments in command line to get the manifest and shared input file names
+
+        :returns: Namespace of command line args
+    """
+
+    parser = argparse.ArgumentParser(description=
+                                     "Generates team and product reports for every job listed in a manifest file. "
+                                     "The team map and product master are read once and shared by every job. "
+                                     "See README for more information.")
+
+    parser.add_argument("-m", "--manifest",
+                        type=str,
+                        dest="manifest_fn",
+                        required=True,
+                        help="Name of the manifest .csv input file listing the sales file, team report file, "
+                             "and product report file of each job")
+
+    parser.add_argument("-t", "--team-map",
+                        type=str,
+                        dest="team_map_fn",
+                        help="Name of the team map .csv input file")
+
+    parser.add_argument("-p", "--product-master",
+                        type=str,
+                        dest="prod_master_fn",
+                        help="Name of the product master .csv input file")
+
+    parser.add_argument("--workers",
+                        type=int,
+                        dest="workers",
+                        default=os.cpu_count() or 1,
+                        help="Number of worker processes used to run the jobs. Defaults to the number of CPUs")
+
+    parser.add_argument("--top",
+                        type=int,
+                        dest="top",
+                        help="Number of teams and products with the highest revenue to write to the reports. "
+                             "All teams and products are written if not specified. At least 1")
+
+    parser.add_argument("--no-cache",
+                        action="store_false",
+                        dest="use_cache",
+                        help="Parse the team map and product master without loading them from or saving them "
+                             "to the cache")
+
+    return parser.parse_args()
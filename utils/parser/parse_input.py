@@ -1,6 +1,9 @@
 # Defines function for parsing user command line arguments for file locations
 
 import argparse
+from datetime import date
+from ..file_IO.config import DEFAULT_DB_FILE
+from ..sales_calc.approx import APPROX_SAMPLE_SIZE
 
 
 def parse_input() -> argparse.Namespace:
@@ -43,4 +46,160 @@ def parse_input() -> argparse.Namespace:
                         dest="prod_report_fn",
                         help="Name of the product report .csv output file")
 
+    parser.add_argument("--cube-report",
+                        type=str,
+                        dest="cube_report_fn",
+                        help="Name of a team by product report .csv output file. If specified, the team and "
+                             "product reports are derived from the team by product cube")
+
+    parser.add_argument("--top-units-report",
+                        type=str,
+                        dest="top_units_report_fn",
+                        help="Name of the .csv output file of the products that sold the most units, "
+                             "written with --approx")
+
+    parser.add_argument("--cube-team",
+                        type=str,
+                        dest="cube_team",
+                        help="Name of a team to slice the team by product report to. Requires --cube-report")
+
+    parser.add_argument("--cube-product",
+                        type=str,
+                        dest="cube_product",
+                        help="Name of a product to slice the team by product report to. Requires --cube-report")
+
+    parser.add_argument("--top",
+                        type=int,
+                        dest="top",
+                        help="Number of teams and products with the highest revenue to write to the reports. "
+                             "All teams and products are written if not specified. At least 1")
+
+    parser.add_argument("--engine",
+                        type=str,
+                        dest="engine",
+                        choices=("decimal", "columnar", "fixed"),
+                        default="decimal",
+                        help="Engine used to calculate the reports. The columnar engine uses exact integer "
+                             "arithmetic and requires prices and discounts with at most 2 decimal places. The fixed "
+                             "engine adds each sale with integers in micro-cents and requires prices with at most 8 "
+                             "and discounts with at most 2 decimal places")
+
+    parser.add_argument("--workers",
+                        type=int,
+                        dest="workers",
+                        default=1,
+                        help="Number of worker processes used to calculate the reports. Each worker parses its "
+                             "range of the sales file with the csv reader, or with the mmap reader if "
+                             "--reader=mmap. Cannot be used with --reader=fast")
+
+    parser.add_argument("--incremental",
+                        action="store_true",
+                        dest="incremental",
+                        help="Save the reports after each run and only add the sales appended to the sales file "
+                             "since the last run. Cannot be used with --engine, --workers, or --reader")
+
+    parser.add_argument("--pipeline",
+                        action="store_true",
+                        dest="pipeline",
+                        help="Overlap reading, calculating, and writing with threads. The sales file is read ahead "
+                             "of the calculation, and the input files and output files are each read and written "
+                             "at the same time")
+
+    parser.add_argument("--start-date",
+                        type=date.fromisoformat,
+                        dest="start_date",
+                        help="First sale date (YYYY-MM-DD) to include in the reports. The sales file must have a "
+                             "sale date column. Cannot be used with --workers, --engine, --reader, or --incremental")
+
+    parser.add_argument("--end-date",
+                        type=date.fromisoformat,
+                        dest="end_date",
+                        help="Last sale date (YYYY-MM-DD) to include in the reports. The sales file must have a "
+                             "sale date column. Cannot be used with --workers, --engine, --reader, or --incremental")
+
+    parser.add_argument("--on-invalid",
+                        type=str,
+                        dest="on_invalid",
+                        choices=("fail", "skip", "quarantine"),
+                        help="Check every sale for a team id or product id missing from the team map or product "
+                             "master, and report all of them at once. fail checks the whole sales file before the "
+                             "reports are calculated and stops if any are found. skip leaves them out of the reports, "
+                             "and quarantine also writes them to a file. If not specified, the run stops at the "
+                             "first one found")
+
+    parser.add_argument("--quarantine-file",
+                        type=str,
+                        dest="quarantine_fn",
+                        help="Name of the .csv output file that sales are written to with --on-invalid=quarantine")
+
+    parser.add_argument("--no-cache",
+                        action="store_false",
+                        dest="use_cache",
+                        help="Parse the input files without loading them from or saving them to the cache")
+
+    parser.add_argument("--lazy-product-master",
+                        action="store_true",
+                        dest="lazy_prod_master",
+                        help="Index the product master by the byte offset of each product instead of reading it, "
+                             "and read each product when a sale first refers to it. Recently used products are "
+                             "kept in memory. The product master cannot be compressed")
+
+    parser.add_argument("--db",
+                        type=str,
+                        nargs="?",
+                        const=DEFAULT_DB_FILE,
+                        dest="db_fn",
+                        help="Import the team map and product master into a SQLite database in the cache folder, "
+                             "and look up only the teams and products the sales refer to. Each file is imported "
+                             "again only when it changes. Optionally the name of the database file, "
+                             f"{DEFAULT_DB_FILE} if not specified")
+
+    parser.add_argument("--db-reports",
+                        action="store_true",
+                        dest="db_reports",
+                        help="Also save the full team and product reports to the team_report and product_report "
+                             "tables of the database, replacing those saved before for the same sales file. "
+                             "Requires --db")
+
+    parser.add_argument("--approx",
+                        action="store_true",
+                        dest="approx",
+                        help="Estimate the reports in one pass from a random sample of the sales, with a 95%% "
+                             "confidence interval for each amount, instead of adding up every sale. Memory does not "
+                             "grow with the sales file. Also writes the products that sold the most units, with "
+                             "guaranteed bounds on their units")
+
+    parser.add_argument("--sample-size",
+                        type=int,
+                        dest="sample_size",
+                        default=APPROX_SAMPLE_SIZE,
+                        help=f"Number of sales in the random sample of --approx, {APPROX_SAMPLE_SIZE} if not "
+                             f"specified. At least 2")
+
+    parser.add_argument("--reader",
+                        type=str,
+                        dest="reader",
+                        choices=("csv", "fast", "mmap"),
+                        default="csv",
+                        help="Backend used to read the sales and product master files. The fast backend parses "
+                             "them straight into integer columns and requires prices and discounts with at most "
+                             "2 decimal places. The mmap backend reads the sales file like the fast backend from a "
+                             "memory-mapped file, one chunk of lines at a time")
+
+    parser.add_argument("--profile",
+                        action="store_true",
+                        dest="profile",
+                        help="Print the wall time, CPU time, and row counts of each stage")
+
+    parser.add_argument("--profile-memory",
+                        action="store_true",
+                        dest="profile_memory",
+                        help="Also trace the peak memory of each stage with tracemalloc. Tracing slows the stages "
+                             "down, so their times are not comparable with a profile without it. Implies --profile")
+
+    parser.add_argument("--profile-json",
+                        type=str,
+                        dest="profile_json_fn",
+                        help="Path of a JSON file to write the profile of each stage to. Implies --profile")
+
     return parser.parse_args()
@@ -0,0 +1,58 @@
+# Defines function for parsing user command line arguments for the report service
+
+import argparse
+from ..file_IO.config import SERVICE_CACHE_BYTES, SERVICE_HOST, SERVICE_PORT
+
+
+def parse_serve_input() -> argparse.Namespace:
+    """
+        Parses user arguments in command line to get the reference file names and the address to listen on
+
+        :returns: Namespace of command line args
+    """
+
+    parser = argparse.ArgumentParser(description=
+                                     "Runs a report service that keeps the team map and product master in memory "
+                                     "and answers report requests for sales files over local HTTP or a Unix socket. "
+                                     "See README for more information.")
+
+    parser.add_argument("-t", "--team-map",
+                        type=str,
+                        dest="team_map_fn",
+                        help="Name of the team map .csv input file")
+
+    parser.add_argument("-p", "--product-master",
+                        type=str,
+                        dest="prod_master_fn",
+                        help="Name of the product master .csv input file")
+
+    parser.add_argument("--host",
+                        type=str,
+                        dest="host",
+                        default=SERVICE_HOST,
+                        help=f"Host to listen on. Defaults to {SERVICE_HOST}")
+
+    parser.add_argument("--port",
+                        type=int,
+                        dest="port",
+                        default=SERVICE_PORT,
+                        help=f"Port to listen on. Defaults to {SERVICE_PORT}")
+
+    parser.add_argument("--socket",
+                        type=str,
+                        dest="socket_path",
+                        help="Path of a Unix socket to listen on instead of a host and port")
+
+    parser.add_argument("--cache-bytes",
+                        type=int,
+                        dest="cache_bytes",
+                        default=SERVICE_CACHE_BYTES,
+                        help="Estimated size in bytes of the recent results kept in memory. The least recently "
+                             "used results are evicted beyond it")
+
+    parser.add_argument("--no-cache",
+                        action="store_false",
+                        dest="use_cache",
+                        help="Parse the input files without loading them from or saving them to the cache")
+
+    return parser.parse_args()
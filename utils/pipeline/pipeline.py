@@ -0,0 +1,76 @@
+# Defines functions for overlapping the stages of the report pipeline with threads.
+# Reading files spends most of its time waiting on storage, which releases the GIL, so a background thread can read
+# the next batch of sales while the main thread aggregates the previous one, and independent reads and writes can
+# run at the same time.
+
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+from ..file_IO.config import PREFETCH_BATCHES
+
+T = TypeVar("T")
+
+# Marks the end of the prefetched items
+END = object()
+
+
+def prefetch(items: Iterable[T], depth: int = PREFETCH_BATCHES) -> Iterator[T]:
+    """
+        Consumes an iterable in a background thread, holding up to depth items ahead of the consumer.
+        The thread starts immediately, so items are read while the caller does other work.
+        An exception raised while reading, including the SystemExit of an invalid input file,
+        is raised again in the consumer.
+
+        :param items: iterable to read ahead of the consumer, e.g. batches of sales
+        :param depth: maximum number of items held ahead of the consumer (int)
+
+        :returns: iterator of the items in order
+    """
+
+    buffer: queue.Queue = queue.Queue(maxsize=max(depth, 1))
+
+    def produce() -> None:
+        try:
+            for item in items:
+                buffer.put((item, None))
+
+        except BaseException as exc:
+            buffer.put((END, exc))
+            return
+
+        buffer.put((END, None))
+
+    # A daemon thread does not keep the program running if the consumer stops early
+    threading.Thread(target=produce, name="prefetch", daemon=True).start()
+
+    def consume() -> Iterator[T]:
+        while True:
+            item, exc = buffer.get()
+
+            if exc is not None:
+                raise exc
+
+            if item is END:
+                return
+
+            yield item
+
+    return consume()
+
+
+def run_concurrently(*funcs: Callable[[], Any]) -> list[Any]:
+    """
+        Runs functions at the same time in threads and waits for all of them
+
+        :param funcs: functions that take no arguments
+
+        :returns: list of the results of the functions, in the order given.
+            If a function raised an exception, the first such exception is raised after all functions finish.
+    """
+
+    with ThreadPoolExecutor(max_workers=max(len(funcs), 1)) as executor:
+        futures: list[Future] = [executor.submit(func) for func in funcs]
+
+    return [future.result() for future in futures]
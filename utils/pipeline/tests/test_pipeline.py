@@ -0,0 +1,76 @@
+import threading
+import unittest
+from collections.abc import Iterator
+from ..pipeline import prefetch, run_concurrently
+
+
+class TestPrefetch(unittest.TestCase):
+    """Test case for prefetch"""
+
+    def test_order(self) -> None:
+        """Test that every item is returned in order"""
+
+        self.assertEqual(list(prefetch(range(1_000), depth=3)), list(range(1_000)))
+
+    def test_empty(self) -> None:
+        """Test that an empty iterable gives an empty iterator"""
+
+        self.assertEqual(list(prefetch([])), [])
+
+    def test_reads_ahead(self) -> None:
+        """Test that items are read in the background before they are consumed"""
+
+        read_ahead = threading.Event()
+
+        def items() -> Iterator[int]:
+            yield 1
+            yield 2
+            read_ahead.set()
+
+        prefetched: Iterator[int] = prefetch(items(), depth=2)
+
+        self.assertTrue(read_ahead.wait(timeout=5))
+        self.assertEqual(list(prefetched), [1, 2])
+
+    def test_exception(self) -> None:
+        """Test that an exception raised while reading is raised in the consumer after the items read before it"""
+
+        def items() -> Iterator[int]:
+            yield 1
+            raise SystemExit
+
+        prefetched: Iterator[int] = prefetch(items())
+
+        self.assertEqual(next(prefetched), 1)
+
+        with self.assertRaises(SystemExit):
+            next(prefetched)
+
+
+class TestRunConcurrently(unittest.TestCase):
+    """Test case for run_concurrently"""
+
+    def test_results(self) -> None:
+        """Test that results are returned in the order of the functions"""
+
+        self.assertEqual(run_concurrently(lambda: 1, lambda: "two", lambda: None), [1, "two", None])
+
+    def test_concurrent(self) -> None:
+        """Test that the functions run at the same time, so each can wait for the other"""
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        self.assertEqual(run_concurrently(barrier.wait, barrier.wait).count(0), 1)
+
+    def test_exception(self) -> None:
+        """Test that an exception raised by a function is raised"""
+
+        def fail() -> None:
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            run_concurrently(lambda: 1, fail)
+
+
+if __name__ == "__main__":
+    unittest.main()
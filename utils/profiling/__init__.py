@@ -0,0 +1 @@
+from .profiler import Profiler, count_rows, profile_stage, record_rows, start_profiling, stop_profiling
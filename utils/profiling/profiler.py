@@ -0,0 +1,236 @@
+# Defines a lightweight profiler for the stages of the report pipeline.
+# Stages record wall time, CPU time, and row counts. If memory tracing is turned on, they also record peak memory, the
+# peak of the Python allocations traced by tracemalloc while the stage runs, so each stage reports its own peak rather
+# than the peak of the process. Tracing slows down allocation heavy code several times, so it is off by default and
+# the times of a profile with memory tracing should not be compared with the times of one without.
+# The hook functions do nothing unless profiling has been started, so they can be left in production code paths.
+
+import json
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class StageRecord:
+    """Model for the measurements of a profiled stage"""
+
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_memory_bytes: int | None = None  # None if memory is not traced
+    rows: dict[str, int] = field(default_factory=dict)  # key = counter name, value = rows counted
+
+
+class Profiler:
+    """Records the measurements of the stages of the report pipeline"""
+
+    def __init__(self, trace_memory: bool = False):
+        """
+            Creates a profiler with no stages
+
+            :param trace_memory: bool to specify if the peak memory of each stage is traced with tracemalloc
+        """
+
+        self.trace_memory: bool = trace_memory
+        self.stages: list[StageRecord] = []
+        self.current: StageRecord | None = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """
+            Measures a stage while the context is open
+
+            :param name: name of the stage (str)
+
+            :returns: record of the stage (StageRecord)
+        """
+
+        record = StageRecord(name=name)
+        outer: StageRecord | None = self.current
+        self.current = record
+
+        # Nested stages share the trace of the outermost stage
+        start_trace: bool = self.trace_memory and not tracemalloc.is_tracing()
+
+        if self.trace_memory:
+            record.peak_memory_bytes = 0
+
+            if start_trace:
+                tracemalloc.start()
+
+            elif outer is not None:
+                # The peak of the outer stage so far is kept before the peak is reset for this stage
+                outer.peak_memory_bytes = max(outer.peak_memory_bytes, tracemalloc.get_traced_memory()[1])
+
+            tracemalloc.reset_peak()
+
+        wall_start: float = time.perf_counter()
+        cpu_start: float = time.process_time()
+
+        try:
+            yield record
+
+        finally:
+            record.wall_s = time.perf_counter() - wall_start
+            record.cpu_s = time.process_time() - cpu_start
+
+            if self.trace_memory:
+                record.peak_memory_bytes = max(record.peak_memory_bytes, tracemalloc.get_traced_memory()[1])
+
+                if start_trace:
+                    tracemalloc.stop()
+
+                elif outer is not None:
+                    outer.peak_memory_bytes = max(outer.peak_memory_bytes, record.peak_memory_bytes)
+
+            self.stages.append(record)
+            self.current = outer
+
+    def add_rows(self, counter: str, rows: int) -> None:
+        """
+            Adds to a row counter of the current stage
+
+            :param counter: name of the counter (str)
+            :param rows: number of rows to add (int)
+        """
+
+        if self.current is not None:
+            self.current.rows[counter] = self.current.rows.get(counter, 0) + rows
+
+    def count(self, rows: Iterable[T], counter: str) -> Iterator[T]:
+        """
+            Passes through rows, adding each to a row counter of the stage that consumes it
+
+            :param rows: iterable of rows
+            :param counter: name of the counter (str)
+
+            :returns: iterator of rows
+        """
+
+        # Rows are added up locally and added to a stage when another stage starts consuming them, or at the end,
+        # so counting adds little to the time of the stage
+        stage: StageRecord | None = None
+        counted: int = 0
+
+        try:
+            for row in rows:
+                if self.current is not stage:
+                    if stage is not None:
+                        stage.rows[counter] = stage.rows.get(counter, 0) + counted
+
+                    stage, counted = self.current, 0
+
+                counted += 1
+                yield row
+
+        finally:
+            if stage is not None and counted:
+                stage.rows[counter] = stage.rows.get(counter, 0) + counted
+
+    def summary(self) -> str:
+        """
+            Formats the measurements of the stages as a table
+
+            :returns: table (str)
+        """
+
+        # The memory column is only shown if memory is traced
+        memory_header: str = f" {'Peak traced (MiB)':>18}" if self.trace_memory else ""
+        lines: list[str] = [f"{'Stage':<24} {'Wall (s)':>10} {'CPU (s)':>10}{memory_header}  Rows"]
+
+        for record in self.stages:
+            rows: str = ", ".join(f"{counter}={rows:,}" for counter, rows in record.rows.items())
+            memory: str = f" {record.peak_memory_bytes / 2 ** 20:>18.1f}" if self.trace_memory else ""
+            lines.append(f"{record.name:<24} {record.wall_s:>10.3f} {record.cpu_s:>10.3f}{memory}  {rows}")
+
+        return "\n".join(lines)
+
+    def write_json(self, file_path: str) -> None:
+        """
+            Writes the measurements of the stages as a JSON trace
+
+            :param file_path: path of the file to write (str)
+        """
+
+        with open(file_path, 'w', encoding="utf-8") as outfile:
+            json.dump({
+                "memory": "peak_traced" if self.trace_memory else None,
+                "stages": [asdict(record) for record in self.stages]
+            }, outfile, indent=2)
+
+
+# Profiler that the hook functions report to, or None if profiling has not been started
+active_profiler: Profiler | None = None
+
+
+def start_profiling(trace_memory: bool = False) -> Profiler:
+    """
+        Starts profiling, so the hook functions report to a new profiler
+
+        :param trace_memory: bool to specify if the peak memory of each stage is traced, which slows it down
+
+        :returns: the new profiler (Profiler)
+    """
+
+    global active_profiler
+    active_profiler = Profiler(trace_memory)
+
+    return active_profiler
+
+
+def stop_profiling() -> None:
+    """Stops profiling, so the hook functions do nothing"""
+
+    global active_profiler
+    active_profiler = None
+
+
+@contextmanager
+def profile_stage(name: str) -> Iterator[None]:
+    """
+        Hook that measures a stage while the context is open, if profiling has been started
+
+        :param name: name of the stage (str)
+    """
+
+    if active_profiler is None:
+        yield
+        return
+
+    with active_profiler.stage(name):
+        yield
+
+
+def count_rows(rows: Iterable[T], counter: str) -> Iterable[T]:
+    """
+        Hook that counts rows as they are consumed, if profiling has been started.
+        The rows are returned unchanged if profiling has not been started.
+
+        :param rows: iterable of rows
+        :param counter: name of the counter (str)
+
+        :returns: iterable of rows
+    """
+
+    if active_profiler is None:
+        return rows
+
+    return active_profiler.count(rows, counter)
+
+
+def record_rows(counter: str, rows: int) -> None:
+    """
+        Hook that adds to a row counter of the current stage, if profiling has been started
+
+        :param counter: name of the counter (str)
+        :param rows: number of rows to add (int)
+    """
+
+    if active_profiler is not None:
+        active_profiler.add_rows(counter, rows)
@@ -0,0 +1,73 @@
+import tracemalloc
+import unittest
+from ..profiler import count_rows, profile_stage, record_rows, start_profiling, stop_profiling
+
+
+class TestProfiler(unittest.TestCase):
+    """Test case for the profiler hooks"""
+
+    def tearDown(self) -> None:
+        stop_profiling()
+
+    def test_hooks_do_nothing_when_inactive(self) -> None:
+        """Test that the hooks pass rows through unchanged when profiling has not been started"""
+
+        rows: list[int] = [1, 2, 3]
+
+        with profile_stage("stage"):
+            self.assertIs(count_rows(rows, "rows"), rows)
+            record_rows("rows", 3)
+
+    def test_stage_records_rows(self) -> None:
+        """Test that rows are counted in the stage that consumes them"""
+
+        profiler = start_profiling()
+        rows = count_rows(iter(range(5)), "rows_read")
+
+        with profile_stage("read"):
+            record_rows("batches", 1)
+
+        with profile_stage("calculate"):
+            self.assertEqual(sum(rows), 10)
+
+        self.assertEqual([record.name for record in profiler.stages], ["read", "calculate"])
+        self.assertEqual(profiler.stages[0].rows, {"batches": 1})
+        self.assertEqual(profiler.stages[1].rows, {"rows_read": 5})
+        self.assertGreaterEqual(profiler.stages[1].wall_s, 0)
+        self.assertIn("calculate", profiler.summary())
+
+    def test_stage_peak_memory(self) -> None:
+        """Test that each stage reports its own peak memory, and an outer stage the peak of its nested stages"""
+
+        profiler = start_profiling(trace_memory=True)
+
+        with profile_stage("outer"):
+            with profile_stage("large"):
+                large: bytes = bytes(16 * 2 ** 20)
+                del large
+
+            with profile_stage("small"):
+                small: bytes = bytes(2 ** 10)
+                del small
+
+        peaks: dict[str, int] = {record.name: record.peak_memory_bytes for record in profiler.stages}
+
+        self.assertGreaterEqual(peaks["large"], 16 * 2 ** 20)
+        self.assertLess(peaks["small"], 2 ** 20)
+        self.assertGreaterEqual(peaks["outer"], peaks["large"])
+        self.assertIn("Peak traced (MiB)", profiler.summary())
+
+    def test_memory_not_traced_by_default(self) -> None:
+        """Test that memory is only traced when asked for, so the timed stages are not slowed down"""
+
+        profiler = start_profiling()
+
+        with profile_stage("stage"):
+            self.assertFalse(tracemalloc.is_tracing())
+
+        self.assertIsNone(profiler.stages[0].peak_memory_bytes)
+        self.assertNotIn("Peak traced (MiB)", profiler.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
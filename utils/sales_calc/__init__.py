@@ -1 +1,10 @@
-from .calc_sales_rpt import calc_sales_rpt
+from .approx import calc_sales_rpt_approx
+from .calc_sales_rpt import add_sales, calc_sales_rpt
+from .columnar import calc_sales_rpt_columnar
+from .cube import calc_sales_cube, cube_prod_rpt, cube_team_rpt, slice_cube
+from .incremental import calc_sales_rpt_incremental
+from .parallel import calc_sales_rpt_parallel
+from .periods import calc_sales_rpt_period, query_period_index, update_period_index
+from .dense_rpt import DenseSalesRpt
+from .fixed_point import FixedSalesRpt, calc_sales_rpt_fixed
+from .validate import filter_invalid_sales, get_batch_ids, format_validation_report, validate_sales
@@ -0,0 +1,225 @@
+# Defines an approximate mode that estimates the team and product reports in one pass over the sales, with memory
+# that does not grow with the number of sales.
+# Gross revenue and discount cost are estimated from a uniform random sample of the sales, with a confidence interval
+# from the variance of the sample. Units sold are counted for every sale in a count-min sketch and a Space-Saving
+# summary, which give the products that sold the most units with guaranteed bounds on their units.
+# The units are added up by product first, and the summaries are only updated once the totals hold UNITS_FLUSH_KEYS
+# products, so they are updated about once per product rather than once per sale.
+# Batches of sales read as columns (SalesTable) are never converted to Sale objects. Only the sampled rows are copied.
+
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from functools import partial
+from math import sqrt
+from random import Random
+from .get_funcs import get_product, get_team
+from .sketches import CountMinSketch, Reservoir, SpaceSaving
+from ..models import ApproxProductSaleData, ApproxReport, Estimate, Product, Sale, SalesTable
+from ..profiling import record_rows
+
+# Number of sales kept in the sample
+APPROX_SAMPLE_SIZE: int = 100_000
+
+# Number of standard errors on each side of an estimate in its interval. 1.96 gives 95% confidence intervals.
+CONFIDENCE_Z: float = 1.96
+
+# Size of the count-min sketch. Units sold are overestimated by at most e / SKETCH_WIDTH of all units sold,
+# with probability 1 - exp(-SKETCH_DEPTH).
+SKETCH_WIDTH: int = 1 << 14
+SKETCH_DEPTH: int = 4
+
+# Number of products kept by the Space-Saving summary of units sold
+HEAVY_HITTERS: int = 1_000
+
+# Number of products whose units are added up before they are added to the summaries
+UNITS_FLUSH_KEYS: int = 1 << 16
+
+
+def copy_sale(sale: Sale) -> tuple[int, int, int, float]:
+    """
+        Copies the values of a sale to keep in the sample
+
+        :param sale: sale (Sale)
+
+        :returns: tuple of (product id, team id, lots sold, discount)
+    """
+
+    return sale.prod_id, sale.team_id, sale.lots_sold, float(sale.discount)
+
+
+def copy_table_row(table: SalesTable, row: int) -> tuple[int, int, int, float]:
+    """
+        Copies the values of a row of a sales table to keep in the sample, without creating a Sale
+
+        :param table: table of sales (SalesTable)
+        :param row: index of the row (int)
+
+        :returns: tuple of (product id, team id, lots sold, discount)
+    """
+
+    return (table.prod_ids[row], table.team_ids[row], table.lots_sold[row],
+            table.disc_mants[row] * 10.0 ** table.disc_exps[row])
+
+
+def add_units(units_sketch: CountMinSketch,
+              top_units: SpaceSaving,
+              prod_lots: dict[int, int],
+              prod_master: dict[int, Product],
+              hide_exc: bool
+              ) -> None:
+    """
+        Adds the lots sold of each product to the summaries of units sold, then clears the lots
+
+        :param units_sketch: count-min sketch of units sold (CountMinSketch)
+        :param top_units: Space-Saving summary of units sold (SpaceSaving)
+        :param prod_lots: dict with key = product id (int), value = lots sold (int)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+    """
+
+    for prod_id, lots in prod_lots.items():
+        units_sold: int = lots * get_product(prod_master, prod_id, hide_exc).lot_size
+
+        units_sketch.add(prod_id, units_sold)
+        top_units.add(prod_id, units_sold)
+
+    prod_lots.clear()
+
+
+def estimate_total(total: float, sum_squares: float, sampled: int, sales: int) -> Estimate:
+    """
+        Estimates the total of an amount over all sales from its total in a uniform sample of the sales.
+        The interval is the normal approximation, with the variance of a sample drawn without replacement,
+        and does not go below 0.
+
+        :param total: total of the amount over the sample (float)
+        :param sum_squares: total of the squares of the amount over the sample (float)
+        :param sampled: number of sales in the sample (int), at least 2 unless every sale is in the sample
+        :param sales: number of sales (int)
+
+        :returns: estimated total and its interval (Estimate)
+    """
+
+    value: float = total * sales / sampled
+
+    if sampled >= sales:
+        # Every sale is in the sample, so the total is known
+        return Estimate(value=value, low=value, high=value)
+
+    # Sales outside the group count as 0, so the variance is over the whole sample
+    variance: float = max(sum_squares - total * total / sampled, 0.0) / (sampled - 1)
+    error: float = CONFIDENCE_Z * sales * sqrt((1 - sampled / sales) * variance / sampled)
+
+    # Amounts of sales are never negative, so neither is their total
+    return Estimate(value=value, low=max(value - error, 0.0), high=value + error)
+
+
+def calc_sales_rpt_approx(*,
+                          team_map: dict[int, str],
+                          prod_master: dict[int, Product],
+                          sales_batches: Iterable[Sequence[Sale] | SalesTable],
+                          sample_size: int = APPROX_SAMPLE_SIZE,
+                          seed: int | None = None,
+                          hide_exc: bool = False
+                          ) -> ApproxReport:
+    """
+        Estimates the team report and product report, and the units sold of the products that sold the most units,
+        in one pass over the sales. Teams and products are only reported if a sale of theirs is in the sample,
+        and team ids are only looked up for the sales in the sample.
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_batches: iterable of batches of sales (Sale), or of tables of sales (SalesTable).
+            Use [read_sales(...)] for sales read all at once.
+        :param sample_size: number of sales kept in the sample (int), at least 2
+        :param seed: optional seed of the random sample and hash functions (int or None)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+
+        :returns: estimated reports (ApproxReport)
+
+        :raises ProductNotFoundError or TeamNotFoundError if a product id or a sampled team id is not found
+            and hide_exc = False
+    """
+
+    rng = Random(seed)
+
+    sample = Reservoir(sample_size, rng)
+    units_sketch = CountMinSketch(SKETCH_WIDTH, SKETCH_DEPTH, rng)
+    top_units = SpaceSaving(HEAVY_HITTERS)
+
+    prod_lots: defaultdict[int, int] = defaultdict(int)
+
+    for batch in sales_batches:
+        if isinstance(batch, SalesTable):
+            for prod_id, lots in zip(batch.prod_ids, batch.lots_sold):
+                prod_lots[prod_id] += lots
+
+            # Rows are indexed in the columns of the table, and only the sampled rows are copied
+            sample.add_batch(range(len(batch)), partial(copy_table_row, batch))
+
+        else:
+            for sale in batch:
+                prod_lots[sale.prod_id] += sale.lots_sold
+
+            sample.add_batch(batch, copy_sale)
+
+        if len(prod_lots) >= UNITS_FLUSH_KEYS:
+            add_units(units_sketch, top_units, prod_lots, prod_master, hide_exc)
+
+    add_units(units_sketch, top_units, prod_lots, prod_master, hide_exc)
+
+    # Totals and totals of squares of the amounts of the sampled sales of each team and product
+    team_sums: defaultdict[str, list[float]] = defaultdict(lambda: [0.0, 0.0])
+    prod_sums: defaultdict[str, list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0, 0.0])
+
+    # Name and revenue of one lot of each sampled product
+    lot_revs: dict[int, tuple[str, float]] = {}
+
+    for prod_id, team_id, lots_sold, discount in sample.items:
+        if prod_id not in lot_revs:
+            product: Product = get_product(prod_master, prod_id, hide_exc)
+            lot_revs[prod_id] = product.name, float(product.lot_size * product.unit_price)
+
+        name, lot_rev = lot_revs[prod_id]
+
+        revenue: float = lots_sold * lot_rev
+        disc_cost: float = revenue * discount / 100
+
+        sums: list[float] = team_sums[get_team(team_map, team_id, hide_exc)]
+        sums[0] += revenue
+        sums[1] += revenue * revenue
+
+        sums = prod_sums[name]
+        sums[0] += revenue
+        sums[1] += revenue * revenue
+        sums[2] += disc_cost
+        sums[3] += disc_cost * disc_cost
+
+    sampled: int = len(sample.items)
+
+    record_rows("sales", sample.seen)
+    record_rows("sampled_sales", sampled)
+
+    team_rpt: dict[str, Estimate] = {team: estimate_total(*sums, sampled, sample.seen)
+                                     for team, sums in team_sums.items()}
+
+    prod_rpt: dict[str, ApproxProductSaleData] = {
+        name: ApproxProductSaleData(gross_rev=estimate_total(sums[0], sums[1], sampled, sample.seen),
+                                    disc_cost=estimate_total(sums[2], sums[3], sampled, sample.seen))
+        for name, sums in prod_sums.items()
+    }
+
+    # The true units sold are at least the Space-Saving total minus its error, and at most both estimates.
+    # Products that share a name are added together.
+    units_rpt: dict[str, Estimate] = {}
+
+    for prod_id, total, error in top_units.items():
+        name: str = get_product(prod_master, prod_id, hide_exc).name
+        high: int = min(total, units_sketch.estimate(prod_id))
+        units: Estimate = units_rpt.setdefault(name, Estimate(value=0, low=0, high=0))
+
+        units.value += high
+        units.low += total - error
+        units.high += high
+
+    return ApproxReport(sales=sample.seen, sampled=sampled, team_rpt=team_rpt, prod_rpt=prod_rpt, top_units=units_rpt)
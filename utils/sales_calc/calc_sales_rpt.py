@@ -1,17 +1,49 @@
-# Defines function for calculating team and product reports from a team map, sales data, and product master.
+# Defines functions for calculating team and product reports from a team map, sales data, and product master.
+# The reports are keyed by name, and are resolved from the totals kept by id in DenseSalesRpt.
 # Decimal is used instead of float to represent money in order to avoid
 # rounding errors that floats are prone to
 
+from collections.abc import Iterable
 from decimal import Decimal
-from .update_rpts import update_prod_rpt, update_team_rpt
-from .get_funcs import get_product, get_team
+from .dense_rpt import DenseSalesRpt
 from ..models import Product, ProductSaleData, Sale
+from ..profiling import count_rows
+
+
+def add_sales(team_rpt: dict[str, Decimal],
+              prod_rpt: dict[str, ProductSaleData],
+              *,
+              team_map: dict[int, str],
+              prod_master: dict[int, Product],
+              sales_data: Iterable[Sale],
+              hide_exc: bool = False
+              ) -> None:
+    """
+        Adds sales data to an existing team report and product report
+
+        :param team_rpt: dict with key = team name (str) value = gross revenue (Decimal)
+        :param prod_rpt: dict with key = product name (str) value = ProductSaleData
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_data: iterable of sales (Sale)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+    """
+
+    # Sales are added by id, and names are resolved once per team and product
+    dense_rpt = DenseSalesRpt()
+
+    dense_rpt.add_sales(team_map=team_map,
+                        prod_master=prod_master,
+                        sales_data=sales_data,
+                        hide_exc=hide_exc)
+
+    dense_rpt.resolve_rpts(team_rpt, prod_rpt)
 
 
 def calc_sales_rpt(*,
                    team_map: dict[int, str],
                    prod_master: dict[int, Product],
-                   sales_data: tuple[Sale],
+                   sales_data: Iterable[Sale],
                    hide_exc: bool = False
                    ) -> tuple[dict[str, Decimal],
                               dict[str, ProductSaleData]]:
@@ -20,7 +52,8 @@ def calc_sales_rpt(*,
 
         :param team_map: dict with key = team id (int), value = team name (str)
         :param prod_master: dict with key = product id (int), value = Product
-        :param sales_data: tuple of sales (Sale)
+        :param sales_data: iterable of sales (Sale). Sales are consumed one at a time,
+            so a generator can be used to avoid holding all sales in memory
         :param hide_exc: bool to specify if exceptions should be hidden from console
 
         :returns: tuple of two dicts where the first dict contains team report information with
@@ -38,17 +71,10 @@ def calc_sales_rpt(*,
     team_rpt: dict[str, Decimal] = {}
     prod_rpt: dict[str, ProductSaleData] = {}
 
-    # Iterate through sales
-    sale: Sale
-    for sale in sales_data:
-        product: Product = get_product(prod_master, sale.prod_id, hide_exc)
-        team_name: str = get_team(team_map, sale.team_id, hide_exc)
-
-        units_sold: int = sale.lots_sold * product.lot_size
-        revenue: Decimal = units_sold * product.unit_price
-        disc_cost: Decimal = Decimal(revenue * Decimal(sale.discount) / 100)
-
-        update_team_rpt(team_rpt, team_name, revenue)
-        update_prod_rpt(prod_rpt, product.name, revenue, units_sold, disc_cost)
+    add_sales(team_rpt, prod_rpt,
+              team_map=team_map,
+              prod_master=prod_master,
+              sales_data=count_rows(sales_data, "sales"),
+              hide_exc=hide_exc)
 
     return team_rpt, prod_rpt
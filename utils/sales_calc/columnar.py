@@ -0,0 +1,139 @@
+# Defines a columnar engine for calculating team and product reports.
+# Sales are streamed in one pass into dense per-product and per-team integer accumulators, joined against
+# list-backed product and team tables, so memory does not grow with the number of sales.
+# Prices are kept in cents and discounts in basis points, so the totals match the Decimal engine to the cent.
+
+from collections.abc import Iterable, Iterator
+from decimal import Decimal
+from .get_funcs import get_product, get_scaled, get_team
+from .update_rpts import update_prod_rpt, update_team_rpt
+from ..models import BASIS_POINT_PLACES, CENT_PLACES, Product, ProductSaleData, Sale, SalesTable, from_scaled_int
+from ..profiling import count_rows
+
+# Discount cost = revenue (cents) * discount (basis points) / 100, so it is scaled by both plus 2 places
+DISC_COST_PLACES: int = CENT_PLACES + BASIS_POINT_PLACES + 2
+
+
+def iter_sale_values(sales_data: Iterable[Sale] | SalesTable, hide_exc: bool) -> Iterator[tuple[int, int, int, int]]:
+    """
+        Gets the values of each sale, with the discount in basis points.
+        A SalesTable is read straight from its columns without creating a Sale per row.
+
+        :param sales_data: iterable of sales (Sale) or table of sales (SalesTable)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+
+        :returns: iterator of (product id, team id, lots sold, discount in basis points)
+    """
+
+    if not isinstance(sales_data, SalesTable):
+        # Discounts take few distinct values, so each is scaled once
+        disc_bps: dict[Decimal, int] = {}
+
+        sale: Sale
+        for sale in sales_data:
+            disc: int | None = disc_bps.get(sale.discount)
+
+            if disc is None:
+                disc = disc_bps[sale.discount] = get_scaled(sale.discount, BASIS_POINT_PLACES, hide_exc)
+
+            yield sale.prod_id, sale.team_id, sale.lots_sold, disc
+
+        return
+
+    try:
+        yield from zip(sales_data.prod_ids,
+                       sales_data.team_ids,
+                       sales_data.lots_sold,
+                       sales_data.scaled_discounts(BASIS_POINT_PLACES))
+
+    except ValueError:
+        # Report the first discount that cannot be held in basis points
+        for sale in sales_data:
+            get_scaled(sale.discount, BASIS_POINT_PLACES, hide_exc)
+
+
+def calc_sales_rpt_columnar(*,
+                            team_map: dict[int, str],
+                            prod_master: dict[int, Product],
+                            sales_data: Iterable[Sale] | SalesTable,
+                            hide_exc: bool = False
+                            ) -> tuple[dict[str, Decimal],
+                                       dict[str, ProductSaleData]]:
+    """
+        Calculates the team report and product report from the team map, product master, and sales data
+        using integer columns instead of per-sale Decimal arithmetic
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_data: iterable of sales (Sale) or table of sales (SalesTable)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+
+        :returns: tuple of two dicts where the first dict contains team report information with
+
+            key = team name (str)
+            value = gross revenue (Decimal)
+
+            and the second dict contains product report information with
+
+            key = product name (str)
+            value = ProductSaleData
+
+        :raises AmountPrecisionError if a price has more than 2 decimal places or a discount has more than 2
+            decimal places and hide_exc = False
+    """
+
+    # Product and team tables, indexed by the row each id is assigned when it first appears in the sales
+    prod_rows: dict[int, int] = {}
+    prod_names: list[str] = []
+    prod_lot_sizes: list[int] = []
+    prod_lot_revs: list[int] = []  # revenue of one lot in cents
+
+    team_rows: dict[int, int] = {}
+    team_names: list[str] = []
+
+    # Dense accumulators, one entry per product or team row. Revenue and discount cost are linear in lots sold,
+    # so only lots need summing per product and the prices are applied once per product.
+    prod_lots: list[int] = []
+    prod_disc_lots: list[int] = []  # lots sold weighted by discount
+    team_revs: list[int] = []
+
+    # Reduce sales as they are streamed, joining product and team ids to table rows
+    for prod_id, team_id, lots, disc in count_rows(iter_sale_values(sales_data, hide_exc), "sales"):
+        prod_row: int | None = prod_rows.get(prod_id)
+
+        if prod_row is None:
+            product: Product = get_product(prod_master, prod_id, hide_exc)
+
+            prod_row = prod_rows[prod_id] = len(prod_names)
+            prod_names.append(product.name)
+            prod_lot_sizes.append(product.lot_size)
+            prod_lot_revs.append(product.lot_size * get_scaled(product.unit_price, CENT_PLACES, hide_exc))
+            prod_lots.append(0)
+            prod_disc_lots.append(0)
+
+        team_row: int | None = team_rows.get(team_id)
+
+        if team_row is None:
+            team_rows[team_id] = team_row = len(team_names)
+            team_names.append(get_team(team_map, team_id, hide_exc))
+            team_revs.append(0)
+
+        prod_lots[prod_row] += lots
+        prod_disc_lots[prod_row] += lots * disc
+        team_revs[team_row] += lots * prod_lot_revs[prod_row]
+
+    # Resolve names. Products or teams that share a name are combined, as in the Decimal engine.
+    team_rpt: dict[str, Decimal] = {}
+    prod_rpt: dict[str, ProductSaleData] = {}
+
+    for team_row, team_name in enumerate(team_names):
+        update_team_rpt(team_rpt, team_name, from_scaled_int(team_revs[team_row], CENT_PLACES))
+
+    for prod_row, prod_name in enumerate(prod_names):
+        update_prod_rpt(prod_rpt,
+                        prod_name,
+                        from_scaled_int(prod_lots[prod_row] * prod_lot_revs[prod_row], CENT_PLACES),
+                        prod_lots[prod_row] * prod_lot_sizes[prod_row],
+                        from_scaled_int(prod_disc_lots[prod_row] * prod_lot_revs[prod_row], DISC_COST_PLACES))
+
+    return team_rpt, prod_rpt
@@ -0,0 +1,124 @@
+# Defines functions for calculating a team by product cube of sales data in one pass over the sales,
+# and for deriving the team report, product report, and slices of the cube from it.
+# Cells are kept in a sparse dict, so only pairs of team and product that have sales take up memory.
+
+from collections.abc import Iterable
+from decimal import Decimal
+from .get_funcs import get_product, get_team
+from .update_rpts import update_prod_rpt, update_team_rpt
+from ..models import Product, ProductSaleData, Sale, SalesCube
+from ..profiling import count_rows
+
+
+def calc_sales_cube(*,
+                    team_map: dict[int, str],
+                    prod_master: dict[int, Product],
+                    sales_data: Iterable[Sale],
+                    hide_exc: bool = False
+                    ) -> SalesCube:
+    """
+        Calculates the sales data of each pair of team and product from the team map, product master, and sales data
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_data: iterable of sales (Sale)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+
+        :returns: cube of sales data with a cell for each (team id, product id) pair that has sales (SalesCube)
+    """
+
+    cube = SalesCube(cells={}, team_names={}, prod_names={})
+    products: dict[int, Product] = {}  # products that have been looked up
+
+    sale: Sale
+    for sale in count_rows(sales_data, "sales"):
+        product: Product | None = products.get(sale.prod_id)
+
+        if product is None:
+            product = products[sale.prod_id] = get_product(prod_master, sale.prod_id, hide_exc)
+            cube.prod_names[sale.prod_id] = product.name
+
+        if sale.team_id not in cube.team_names:
+            cube.team_names[sale.team_id] = get_team(team_map, sale.team_id, hide_exc)
+
+        units_sold: int = sale.lots_sold * product.lot_size
+        revenue: Decimal = units_sold * product.unit_price
+        disc_cost: Decimal = Decimal(revenue * Decimal(sale.discount) / 100)
+
+        cell: ProductSaleData | None = cube.cells.get((sale.team_id, sale.prod_id))
+
+        if cell is not None:
+            cell.gross_rev += revenue
+            cell.units_sold += units_sold
+            cell.disc_cost += disc_cost
+        else:
+            cube.cells[(sale.team_id, sale.prod_id)] = ProductSaleData(gross_rev=revenue,
+                                                                       units_sold=units_sold,
+                                                                       disc_cost=disc_cost)
+
+    return cube
+
+
+def cube_team_rpt(cube: SalesCube) -> dict[str, Decimal]:
+    """
+        Derives the team report from a cube
+
+        :param cube: cube of sales data (SalesCube)
+
+        :returns: dict with key = team name (str), value = gross revenue (Decimal)
+    """
+
+    team_revs: dict[int, Decimal] = {}
+
+    for (team_id, _), cell in cube.cells.items():
+        team_revs[team_id] = team_revs[team_id] + cell.gross_rev if team_id in team_revs else cell.gross_rev
+
+    team_rpt: dict[str, Decimal] = {}
+
+    for team_id, gross_rev in team_revs.items():
+        update_team_rpt(team_rpt, cube.team_names[team_id], gross_rev)
+
+    return team_rpt
+
+
+def cube_prod_rpt(cube: SalesCube) -> dict[str, ProductSaleData]:
+    """
+        Derives the product report from a cube
+
+        :param cube: cube of sales data (SalesCube)
+
+        :returns: dict with key = product name (str), value = ProductSaleData
+    """
+
+    prod_rpt: dict[str, ProductSaleData] = {}
+
+    for (_, prod_id), cell in cube.cells.items():
+        update_prod_rpt(prod_rpt, cube.prod_names[prod_id], cell.gross_rev, cell.units_sold, cell.disc_cost)
+
+    return prod_rpt
+
+
+def slice_cube(cube: SalesCube, team_name: str | None = None, prod_name: str | None = None) -> SalesCube:
+    """
+        Gets the cells of a cube for a team, a product, or both
+
+        :param cube: cube of sales data (SalesCube)
+        :param team_name: optional name of the team to keep (str or None). All teams are kept if None.
+        :param prod_name: optional name of the product to keep (str or None). All products are kept if None.
+
+        :returns: cube with only the cells of the team and product (SalesCube)
+    """
+
+    cells: dict[tuple[int, int], ProductSaleData] = {
+        (team_id, prod_id): cell
+        for (team_id, prod_id), cell in cube.cells.items()
+        if (team_name is None or cube.team_names[team_id] == team_name)
+        and (prod_name is None or cube.prod_names[prod_id] == prod_name)
+    }
+
+    team_ids: set[int] = {team_id for team_id, _ in cells}
+    prod_ids: set[int] = {prod_id for _, prod_id in cells}
+
+    return SalesCube(cells=cells,
+                     team_names={team_id: name for team_id, name in cube.team_names.items() if team_id in team_ids},
+                     prod_names={prod_id: name for prod_id, name in cube.prod_names.items() if prod_id in prod_ids})
@@ -0,0 +1,150 @@
+# Defines the aggregation core used to calculate team and product reports.
+# Sales are added by integer team id and product id instead of by name. Each id is compacted to a dense index the
+# first time it is seen, and the totals are kept in lists at those indexes, so adding a sale only hashes two ints.
+# Names are looked up once per team and product when the reports are resolved.
+
+from collections.abc import Iterable
+from decimal import Decimal
+from .get_funcs import get_product, get_team
+from .update_rpts import update_prod_rpt, update_team_rpt
+from ..models import Product, ProductSaleData, Sale
+
+
+class DenseSalesRpt:
+    """Team and product totals kept in lists indexed by compacted team and product ids"""
+
+    __slots__ = ("team_index", "team_ids", "team_names", "team_revs",
+                 "prod_index", "prod_ids", "prod_names", "lot_sizes", "unit_prices",
+                 "prod_revs", "prod_units", "prod_discs")
+
+    def __init__(self):
+        # Team id -> dense index, and the team id, name, and gross revenue at each index
+        self.team_index: dict[int, int] = {}
+        self.team_ids: list[int] = []
+        self.team_names: list[str] = []
+        self.team_revs: list[Decimal] = []
+
+        # Product id -> dense index, and the product id, name, price, and totals at each index
+        self.prod_index: dict[int, int] = {}
+        self.prod_ids: list[int] = []
+        self.prod_names: list[str] = []
+        self.lot_sizes: list[int] = []
+        self.unit_prices: list[Decimal] = []
+        self.prod_revs: list[Decimal] = []
+        self.prod_units: list[int] = []
+        self.prod_discs: list[Decimal] = []
+
+    def add_team(self, team_id: int, team_name: str) -> int:
+        """
+            Adds a team with no sales
+
+            :param team_id: id of the team (int)
+            :param team_name: name of the team (str)
+
+            :returns: dense index of the team (int)
+        """
+
+        index: int = len(self.team_ids)
+        self.team_index[team_id] = index
+
+        self.team_ids.append(team_id)
+        self.team_names.append(team_name)
+        self.team_revs.append(Decimal(0))
+
+        return index
+
+    def add_product(self, prod_id: int, product: Product) -> int:
+        """
+            Adds a product with no sales
+
+            :param prod_id: id of the product (int)
+            :param product: product information (Product)
+
+            :returns: dense index of the product (int)
+        """
+
+        index: int = len(self.prod_ids)
+        self.prod_index[prod_id] = index
+
+        self.prod_ids.append(prod_id)
+        self.prod_names.append(product.name)
+        self.lot_sizes.append(product.lot_size)
+        self.unit_prices.append(product.unit_price)
+        self.prod_revs.append(Decimal(0))
+        self.prod_units.append(0)
+        self.prod_discs.append(Decimal(0))
+
+        return index
+
+    def add_sales(self,
+                  *,
+                  team_map: dict[int, str],
+                  prod_master: dict[int, Product],
+                  sales_data: Iterable[Sale],
+                  hide_exc: bool = False
+                  ) -> None:
+        """
+            Adds sales data to the totals
+
+            :param team_map: dict with key = team id (int), value = team name (str)
+            :param prod_master: dict with key = product id (int), value = Product
+            :param sales_data: iterable of sales (Sale)
+            :param hide_exc: bool to specify if exceptions should be hidden from console
+        """
+
+        team_index, prod_index = self.team_index, self.prod_index
+        lot_sizes, unit_prices = self.lot_sizes, self.unit_prices
+        team_revs, prod_revs, prod_units, prod_discs = self.team_revs, self.prod_revs, self.prod_units, self.prod_discs
+
+        sale: Sale
+        for sale in sales_data:
+            prod: int | None = prod_index.get(sale.prod_id)
+
+            if prod is None:
+                prod = self.add_product(sale.prod_id, get_product(prod_master, sale.prod_id, hide_exc))
+
+            team: int | None = team_index.get(sale.team_id)
+
+            if team is None:
+                team = self.add_team(sale.team_id, get_team(team_map, sale.team_id, hide_exc))
+
+            units_sold: int = sale.lots_sold * lot_sizes[prod]
+            revenue: Decimal = units_sold * unit_prices[prod]
+
+            team_revs[team] += revenue
+            prod_revs[prod] += revenue
+            prod_units[prod] += units_sold
+            prod_discs[prod] += Decimal(revenue * Decimal(sale.discount) / 100)
+
+    def team_totals(self) -> Iterable[Decimal]:
+        """
+            Gets the gross revenue of each team, in the order of the dense indexes
+
+            :returns: iterable of gross revenues (Decimal)
+        """
+
+        return self.team_revs
+
+    def prod_totals(self) -> Iterable[tuple[Decimal, int, Decimal]]:
+        """
+            Gets the totals of each product, in the order of the dense indexes
+
+            :returns: iterable of (gross revenue, units sold, discount cost)
+        """
+
+        return zip(self.prod_revs, self.prod_units, self.prod_discs)
+
+    def resolve_rpts(self, team_rpt: dict[str, Decimal], prod_rpt: dict[str, ProductSaleData]) -> None:
+        """
+            Adds the totals to a team report and product report keyed by name.
+            Teams or products that share a name are combined, as the reports are keyed by name.
+
+            :param team_rpt: dict with key = team name (str) value = gross revenue (Decimal)
+            :param prod_rpt: dict with key = product name (str) value = ProductSaleData
+        """
+
+        for team_name, gross_rev in zip(self.team_names, self.team_totals()):
+            update_team_rpt(team_rpt, team_name, gross_rev)
+
+        for prod_name, (gross_rev, units_sold, disc_cost) in zip(self.prod_names, self.prod_totals()):
+            update_prod_rpt(prod_rpt, prod_name, gross_rev, units_sold, disc_cost)
@@ -14,3 +14,11 @@ class ProductNotFoundError(Exception):
     def __init__(self, product_id):
         message = f"Product ID {product_id} not found in team map file."
         super().__init__(message)
+
+
+class AmountPrecisionError(Exception):
+    """Defines exception for when an amount has more decimal places than a scaled integer can hold"""
+
+    def __init__(self, amount, places):
+        message = f"Amount {amount} has more than {places} decimal places."
+        super().__init__(message)
@@ -0,0 +1,190 @@
+# Defines a fixed-point engine for calculating team and product reports.
+# Prices are kept as integers in micro-cents and discounts in basis points, so every sale is added with integer
+# arithmetic instead of several Decimal operations. Integer sums are exact, and the totals are converted to Decimal
+# only once per team and product, so the rounded reports match the Decimal engine to the cent.
+
+from collections.abc import Iterable
+from decimal import Decimal
+from .dense_rpt import DenseSalesRpt
+from .get_funcs import get_product, get_scaled, get_team
+from ..models import BASIS_POINT_PLACES, MICRO_CENT_PLACES, Product, ProductSaleData, Sale, from_scaled_int
+from ..profiling import count_rows
+
+# Discount cost = revenue (micro-cents) * discount (basis points) / 100, so it is scaled by both plus 2 places
+FIXED_DISC_COST_PLACES: int = MICRO_CENT_PLACES + BASIS_POINT_PLACES + 2
+
+
+class FixedSalesRpt(DenseSalesRpt):
+    """Team and product totals kept as integers in micro-cents, in lists indexed by compacted ids"""
+
+    __slots__ = ("lot_revs", "prod_lots", "prod_disc_lots", "disc_bps")
+
+    def __init__(self):
+        super().__init__()
+
+        # Revenue of one lot, and lots sold and lots sold weighted by discount, of each product.
+        # Revenue and discount cost are linear in lots sold, so the prices are applied once per product.
+        self.lot_revs: list[int] = []
+        self.prod_lots: list[int] = []
+        self.prod_disc_lots: list[int] = []
+
+        # Discounts already converted to basis points, as sales reuse a few distinct discounts
+        self.disc_bps: dict[Decimal, int] = {}
+
+    def add_team(self, team_id: int, team_name: str) -> int:
+        """
+            Adds a team with no sales
+
+            :param team_id: id of the team (int)
+            :param team_name: name of the team (str)
+
+            :returns: dense index of the team (int)
+        """
+
+        index: int = len(self.team_ids)
+        self.team_index[team_id] = index
+
+        self.team_ids.append(team_id)
+        self.team_names.append(team_name)
+        self.team_revs.append(0)
+
+        return index
+
+    def add_product(self, prod_id: int, product: Product, hide_exc: bool = False) -> int:
+        """
+            Adds a product with no sales
+
+            :param prod_id: id of the product (int)
+            :param product: product information (Product)
+            :param hide_exc: bool to specify if exceptions should be hidden from console
+
+            :returns: dense index of the product (int)
+
+            :raises AmountPrecisionError if the unit price has more than 8 decimal places and hide_exc = False
+        """
+
+        index: int = len(self.prod_ids)
+        self.prod_index[prod_id] = index
+
+        self.prod_ids.append(prod_id)
+        self.prod_names.append(product.name)
+        self.lot_sizes.append(product.lot_size)
+        self.unit_prices.append(get_scaled(product.unit_price, MICRO_CENT_PLACES, hide_exc))
+        self.lot_revs.append(product.lot_size * self.unit_prices[index])
+        self.prod_lots.append(0)
+        self.prod_disc_lots.append(0)
+
+        return index
+
+    def add_sales(self,
+                  *,
+                  team_map: dict[int, str],
+                  prod_master: dict[int, Product],
+                  sales_data: Iterable[Sale],
+                  hide_exc: bool = False
+                  ) -> None:
+        """
+            Adds sales data to the totals
+
+            :param team_map: dict with key = team id (int), value = team name (str)
+            :param prod_master: dict with key = product id (int), value = Product
+            :param sales_data: iterable of sales (Sale)
+            :param hide_exc: bool to specify if exceptions should be hidden from console
+
+            :raises AmountPrecisionError if a discount has more than 2 decimal places and hide_exc = False
+        """
+
+        team_index, prod_index, disc_bps = self.team_index, self.prod_index, self.disc_bps
+        lot_revs, team_revs, prod_lots, prod_disc_lots = self.lot_revs, self.team_revs, self.prod_lots, \
+            self.prod_disc_lots
+
+        sale: Sale
+        for sale in sales_data:
+            prod: int | None = prod_index.get(sale.prod_id)
+
+            if prod is None:
+                prod = self.add_product(sale.prod_id, get_product(prod_master, sale.prod_id, hide_exc), hide_exc)
+
+            team: int | None = team_index.get(sale.team_id)
+
+            if team is None:
+                team = self.add_team(sale.team_id, get_team(team_map, sale.team_id, hide_exc))
+
+            disc: int | None = disc_bps.get(sale.discount)
+
+            if disc is None:
+                disc = disc_bps[sale.discount] = get_scaled(sale.discount, BASIS_POINT_PLACES, hide_exc)
+
+            lots: int = sale.lots_sold
+
+            team_revs[team] += lots * lot_revs[prod]
+            prod_lots[prod] += lots
+            prod_disc_lots[prod] += lots * disc
+
+    def team_totals(self) -> Iterable[Decimal]:
+        """
+            Gets the gross revenue of each team, in the order of the dense indexes
+
+            :returns: iterable of gross revenues (Decimal)
+        """
+
+        return (from_scaled_int(team_rev, MICRO_CENT_PLACES) for team_rev in self.team_revs)
+
+    def prod_totals(self) -> Iterable[tuple[Decimal, int, Decimal]]:
+        """
+            Gets the totals of each product, in the order of the dense indexes
+
+            :returns: iterable of (gross revenue, units sold, discount cost)
+        """
+
+        return ((from_scaled_int(lots * lot_rev, MICRO_CENT_PLACES),
+                 lots * lot_size,
+                 from_scaled_int(disc_lots * lot_rev, FIXED_DISC_COST_PLACES))
+                for lots, disc_lots, lot_rev, lot_size
+                in zip(self.prod_lots, self.prod_disc_lots, self.lot_revs, self.lot_sizes))
+
+
+def calc_sales_rpt_fixed(*,
+                         team_map: dict[int, str],
+                         prod_master: dict[int, Product],
+                         sales_data: Iterable[Sale],
+                         hide_exc: bool = False
+                         ) -> tuple[dict[str, Decimal],
+                                    dict[str, ProductSaleData]]:
+    """
+        Calculates the team report and product report from the team map, product master, and sales data
+        using fixed-point integer arithmetic instead of per-sale Decimal arithmetic
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_data: iterable of sales (Sale)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+
+        :returns: tuple of two dicts where the first dict contains team report information with
+
+            key = team name (str)
+            value = gross revenue (Decimal)
+
+            and the second dict contains product report information with
+
+            key = product name (str)
+            value = ProductSaleData
+
+        :raises AmountPrecisionError if a price has more than 8 decimal places or a discount has more than 2
+            decimal places and hide_exc = False
+    """
+
+    # Initialize output dicts
+    team_rpt: dict[str, Decimal] = {}
+    prod_rpt: dict[str, ProductSaleData] = {}
+
+    fixed_rpt = FixedSalesRpt()
+
+    fixed_rpt.add_sales(team_map=team_map,
+                        prod_master=prod_master,
+                        sales_data=count_rows(sales_data, "sales"),
+                        hide_exc=hide_exc)
+
+    fixed_rpt.resolve_rpts(team_rpt, prod_rpt)
+
+    return team_rpt, prod_rpt
@@ -1,5 +1,6 @@
-from .exceptions import ProductNotFoundError, TeamNotFoundError
-from ..models import Product
+from decimal import Decimal
+from .exceptions import AmountPrecisionError, ProductNotFoundError, TeamNotFoundError
+from ..models import Product, to_scaled_int
 
 
 def get_product(prod_master: dict[int, Product], prod_id: int, hide_exc: bool) -> Product:
@@ -48,3 +49,27 @@ def get_team(team_map: dict[int, str], team_id: int, hide_exc: bool) -> str:
         raise TeamNotFoundError(team_id)
 
     return team_name
+
+
+def get_scaled(amount: Decimal, places: int, hide_exc: bool) -> int:
+    """
+        Gets an amount as an integer scaled by 10 ** places
+
+        :param amount: amount to scale (Decimal)
+        :param places: number of decimal places to keep (int)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+
+        :return: scaled amount (int)
+
+        :raises AmountPrecisionError if the amount has more decimal places than can be kept
+            and hide_exc = False
+    """
+
+    try:
+        return to_scaled_int(amount, places)
+
+    except ValueError:
+        if hide_exc:
+            print(f"Error: Amount {amount} has more than {places} decimal places.")
+            exit()
+        raise AmountPrecisionError(amount, places)
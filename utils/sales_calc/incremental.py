@@ -0,0 +1,152 @@
+# Defines an incremental mode for calculating team and product reports from an append-only sales file.
+# The reports and the byte offset they cover are saved after each run, so the next run only adds the
+# sales appended since. If the covered part of the file or the reference data has changed, the reports are rebuilt.
+
+import hashlib
+import os
+from collections.abc import Callable
+from decimal import Decimal
+from itertools import chain
+from typing import TypeVar
+from .calc_sales_rpt import add_sales
+from ..file_IO.read import stream_sales_range
+from ..file_IO.state import get_sales_line_end, get_sales_stat, is_state_current, load_rpt_state, save_rpt_state, \
+    stamp_state
+from ..models import PeriodIndex, Product, ProductSaleData, ReportState, merge_prod_rpts, merge_team_rpts
+
+# Saved state of the sales file, a report state or a period index
+State = TypeVar("State", ReportState, PeriodIndex)
+
+
+def get_ref_checksum(team_map: dict[int, str], prod_master: dict[int, Product]) -> str:
+    """
+        Calculates a checksum of the team map and product master
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+
+        :returns: checksum (str)
+    """
+
+    ref_hash = hashlib.sha256()
+    ref_hash.update(repr(sorted(team_map.items())).encode("utf-8"))
+    ref_hash.update(repr(sorted(prod_master.items())).encode("utf-8"))
+
+    return ref_hash.hexdigest()
+
+
+def load_current_state(sales_fn: str,
+                       load_state: Callable[[str], State | None],
+                       *,
+                       ref_checksum: str,
+                       stat: os.stat_result,
+                       line_end: int,
+                       name: str
+                       ) -> State | None:
+    """
+        Loads the saved state of the sales file if the part of the file it covers and the reference data are unchanged
+
+        :param sales_fn: name of the sales file (str)
+        :param load_state: function that loads the saved state of a sales file, or returns None if there is none
+        :param ref_checksum: checksum of the team map and product master (str)
+        :param stat: status of the sales file, taken before it is read (os.stat_result)
+        :param line_end: offset just after the last complete line of the sales file (int)
+        :param name: name of what the state holds, used for messages (str)
+
+        :returns: saved state (ReportState or PeriodIndex), or None if it has to be rebuilt
+    """
+
+    state: State | None = load_state(sales_fn)
+
+    if state is None:
+        return None
+
+    if state.ref_checksum != ref_checksum or not is_state_current(sales_fn, state, stat, line_end):
+        print(f"Sales file or reference data changed since the last run. Rebuilding {name}.\n")
+        return None
+
+    return state
+
+
+def is_state_stale(state: ReportState | PeriodIndex, stat: os.stat_result, line_end: int) -> bool:
+    """
+        Checks if a state has to be saved again, because sales were added to it or the sales file has changed
+
+        :param state: report state or period index (ReportState or PeriodIndex)
+        :param stat: status of the sales file, taken before it was read (os.stat_result)
+        :param line_end: offset just after the last complete line of the sales file (int)
+
+        :returns: bool
+    """
+
+    return state.offset != line_end or state.file_size != stat.st_size or state.mtime_ns != stat.st_mtime_ns
+
+
+def calc_sales_rpt_incremental(*,
+                               team_map: dict[int, str],
+                               prod_master: dict[int, Product],
+                               sales_fn: str,
+                               hide_exc: bool = False
+                               ) -> tuple[dict[str, Decimal],
+                                          dict[str, ProductSaleData]]:
+    """
+        Calculates the team report and product report from the team map, product master, and sales file,
+        adding only the sales appended since the last run to the saved reports
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_fn: name of the sales file (str)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+
+        :returns: tuple of two dicts where the first dict contains team report information with
+
+            key = team name (str)
+            value = gross revenue (Decimal)
+
+            and the second dict contains product report information with
+
+            key = product name (str)
+            value = ProductSaleData
+    """
+
+    ref_checksum: str = get_ref_checksum(team_map, prod_master)
+
+    # The status is taken before the file is read, so a change made while it is read is found by the next run
+    stat: os.stat_result = get_sales_stat(sales_fn)
+    line_end, file_size = get_sales_line_end(sales_fn)
+
+    state: ReportState | None = load_current_state(sales_fn, load_rpt_state,
+                                                   ref_checksum=ref_checksum, stat=stat, line_end=line_end,
+                                                   name="reports")
+
+    if state is None:
+        # Rebuild the reports from the start of the file
+        state = ReportState(offset=0, checksum="", file_size=0, mtime_ns=0, ref_checksum=ref_checksum,
+                            team_rpt={}, prod_rpt={})
+
+    if is_state_stale(state, stat, line_end):
+        # Add the complete lines appended since the last run, and save the state
+        add_sales(state.team_rpt, state.prod_rpt,
+                  team_map=team_map,
+                  prod_master=prod_master,
+                  sales_data=chain.from_iterable(stream_sales_range(sales_fn, state.offset, line_end)),
+                  hide_exc=hide_exc)
+
+        stamp_state(sales_fn, state, stat, line_end)
+        save_rpt_state(sales_fn, state)
+
+    if line_end == file_size:
+        return state.team_rpt, state.prod_rpt
+
+    # A final line without a newline may still be being written, so it is included in the reports
+    # but not in the saved state
+    team_rpt: dict[str, Decimal] = merge_team_rpts(state.team_rpt)
+    prod_rpt: dict[str, ProductSaleData] = merge_prod_rpts(state.prod_rpt)
+
+    add_sales(team_rpt, prod_rpt,
+              team_map=team_map,
+              prod_master=prod_master,
+              sales_data=chain.from_iterable(stream_sales_range(sales_fn, line_end, file_size)),
+              hide_exc=hide_exc)
+
+    return team_rpt, prod_rpt
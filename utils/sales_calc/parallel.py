@@ -0,0 +1,95 @@
+# Defines a parallel mode for calculating team and product reports.
+# The sales file is split into byte ranges aligned to line boundaries, partial reports are calculated for each
+# range in a process pool, and the partial reports are merged into the final reports. Each range is parsed by the csv
+# reader, or by the memory-mapped reader, which maps the file in each worker and parses its range column by column.
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import chain
+from .calc_sales_rpt import calc_sales_rpt
+from ..file_IO.mmap_read import mmap_stream_sales_range
+from ..file_IO.read import get_sales_shards, stream_sales_range
+from ..models import Product, ProductSaleData, Sale, merge_prod_rpts, merge_team_rpts
+
+CalcFunc = Callable[..., tuple[dict[str, Decimal], dict[str, ProductSaleData]]]
+
+
+def calc_shard_rpt(sales_fn: str,
+                   start: int,
+                   end: int,
+                   team_map: dict[int, str],
+                   prod_master: dict[int, Product],
+                   hide_exc: bool,
+                   calc_func: CalcFunc,
+                   reader: str
+                   ) -> tuple[dict[str, Decimal], dict[str, ProductSaleData]]:
+    """
+        Calculates partial team and product reports from the sales in one byte range of the sales file
+
+        :param sales_fn: name of the sales file (str)
+        :param start: byte offset of the start of the range (int)
+        :param end: byte offset of the end of the range (int)
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+        :param calc_func: function used to calculate the reports, e.g. calc_sales_rpt
+        :param reader: backend used to parse the range, "csv" or "mmap" (str)
+
+        :returns: tuple of partial team report and partial product report
+    """
+
+    if reader == "mmap":
+        sales_data: Iterable[Sale] = chain.from_iterable(mmap_stream_sales_range(sales_fn, start, end))
+    else:
+        sales_data: Iterable[Sale] = chain.from_iterable(stream_sales_range(sales_fn, start, end))
+
+    return calc_func(team_map=team_map, prod_master=prod_master, sales_data=sales_data, hide_exc=hide_exc)
+
+
+def calc_sales_rpt_parallel(*,
+                            team_map: dict[int, str],
+                            prod_master: dict[int, Product],
+                            sales_fn: str,
+                            workers: int,
+                            hide_exc: bool = False,
+                            calc_func: CalcFunc = calc_sales_rpt,
+                            reader: str = "csv"
+                            ) -> tuple[dict[str, Decimal],
+                                       dict[str, ProductSaleData]]:
+    """
+        Calculates the team report and product report from the team map, product master, and sales file
+        using a pool of worker processes
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_fn: name of the sales file (str)
+        :param workers: number of worker processes (int)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+        :param calc_func: function used to calculate each partial report, e.g. calc_sales_rpt
+        :param reader: backend used to parse each range of the sales file, "csv" or "mmap" (str)
+
+        :returns: tuple of two dicts where the first dict contains team report information with
+
+            key = team name (str)
+            value = gross revenue (Decimal)
+
+            and the second dict contains product report information with
+
+            key = product name (str)
+            value = ProductSaleData
+    """
+
+    shards: list[tuple[int, int]] = get_sales_shards(sales_fn, max(workers, 1))
+
+    with ProcessPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = [executor.submit(calc_shard_rpt, sales_fn, start, end, team_map, prod_master, hide_exc, calc_func,
+                                   reader)
+                   for start, end in shards]
+
+        partial_rpts = [future.result() for future in futures]
+
+    team_rpt: dict[str, Decimal] = merge_team_rpts(*(team_rpt for team_rpt, _ in partial_rpts))
+    prod_rpt: dict[str, ProductSaleData] = merge_prod_rpts(*(prod_rpt for _, prod_rpt in partial_rpts))
+
+    return team_rpt, prod_rpt
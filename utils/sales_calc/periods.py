@@ -0,0 +1,237 @@
+# Defines a period index of team and product reports for each day in a dated sales file.
+# The index is saved between runs and updated with appended sales like the incremental mode, so reports for a week,
+# a month, or any range of dates are calculated by merging the reports of the days in the range
+# instead of reading the whole sales file again.
+
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+from .calc_sales_rpt import add_sales
+from .incremental import get_ref_checksum, is_state_stale, load_current_state
+from ..file_IO.read import parse_dated_sale, stream_sales_range
+from ..file_IO.state import get_sales_line_end, get_sales_stat, load_period_day, load_period_index, save_period_day, \
+    save_period_index, stamp_state
+from ..models import PeriodIndex, Product, ProductSaleData, Sale, merge_prod_rpts, merge_team_rpts
+
+
+def add_dated_sales(index: PeriodIndex,
+                    *,
+                    team_map: dict[int, str],
+                    prod_master: dict[int, Product],
+                    dated_sales: Iterable[list[tuple[date, Sale]]],
+                    hide_exc: bool = False
+                    ) -> None:
+    """
+        Adds dated sales to the reports of their day in a period index
+
+        :param index: period index to add the sales to (PeriodIndex)
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param dated_sales: iterable of batches of (sale date, Sale)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+    """
+
+    for batch in dated_sales:
+        # Group each batch by day so the reports of a day are updated together
+        day_sales: dict[date, list[Sale]] = {}
+
+        for day, sale in batch:
+            day_sales.setdefault(day, []).append(sale)
+
+        for day, sales in day_sales.items():
+            add_sales(index.team_rpts.setdefault(day, {}), index.prod_rpts.setdefault(day, {}),
+                      team_map=team_map,
+                      prod_master=prod_master,
+                      sales_data=sales,
+                      hide_exc=hide_exc)
+
+
+def in_date_range(day: date, start_date: date | None, end_date: date | None) -> bool:
+    """
+        Checks if a day is in a date range
+
+        :param day: day to check (date)
+        :param start_date: optional first day of the range, or None for no lower bound (date or None)
+        :param end_date: optional last day of the range, or None for no upper bound (date or None)
+
+        :returns: bool
+    """
+
+    return (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+
+
+def update_period_index(*,
+                        team_map: dict[int, str],
+                        prod_master: dict[int, Product],
+                        sales_fn: str,
+                        hide_exc: bool = False,
+                        rebuild: bool = False
+                        ) -> PeriodIndex:
+    """
+        Loads the saved period index of the sales file and adds the sales appended since the last run.
+        The index is rebuilt if the indexed part of the sales file or the reference data has changed.
+        Only the reports of the days with appended sales are loaded and saved again.
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_fn: name of the sales file (str)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+        :param rebuild: bool to specify if the saved index should be rebuilt even if it is unchanged
+
+        :returns: period index of the complete lines of the sales file (PeriodIndex). Its file size is the size of
+            the sales file when it was read.
+    """
+
+    ref_checksum: str = get_ref_checksum(team_map, prod_master)
+
+    # The status is taken before the file is read, so a change made while it is read is found by the next run
+    stat = get_sales_stat(sales_fn)
+    line_end, _ = get_sales_line_end(sales_fn)
+
+    index: PeriodIndex | None = None if rebuild else load_current_state(sales_fn, load_period_index,
+                                                                        ref_checksum=ref_checksum, stat=stat,
+                                                                        line_end=line_end, name="period index")
+
+    if index is None:
+        # Rebuild the index from the start of the file
+        index = PeriodIndex(offset=0, checksum="", file_size=0, mtime_ns=0, ref_checksum=ref_checksum,
+                            team_rpts={}, prod_rpts={})
+
+    if not is_state_stale(index, stat, line_end):
+        return index
+
+    # The appended sales are added up by day first, then merged into the saved reports of each of their days
+    appended = PeriodIndex(offset=index.offset, checksum="", file_size=0, mtime_ns=0, ref_checksum=ref_checksum,
+                           team_rpts={}, prod_rpts={})
+
+    add_dated_sales(appended,
+                    team_map=team_map,
+                    prod_master=prod_master,
+                    dated_sales=stream_sales_range(sales_fn, index.offset, line_end, parse_row=parse_dated_sale),
+                    hide_exc=hide_exc)
+
+    saved = True
+
+    for day in appended.team_rpts:
+        if day in index.days and day not in index.team_rpts and not load_period_day(sales_fn, index, day):
+            print("Period index is incomplete. Rebuilding period index.\n")
+            return update_period_index(team_map=team_map, prod_master=prod_master, sales_fn=sales_fn,
+                                       hide_exc=hide_exc, rebuild=True)
+
+        index.team_rpts[day] = merge_team_rpts(index.team_rpts.get(day, {}), appended.team_rpts[day])
+        index.prod_rpts[day] = merge_prod_rpts(index.prod_rpts.get(day, {}), appended.prod_rpts[day])
+        index.days[day] = line_end
+
+        saved = save_period_day(sales_fn, index, day) and saved
+
+    stamp_state(sales_fn, index, stat, line_end)
+
+    # The index is saved after the days, so a day saved by a run that fails part way does not match the saved index
+    if saved:
+        save_period_index(sales_fn, index)
+
+    else:
+        print("Warning: Period index could not be saved. The next run will rebuild the index.\n")
+
+    return index
+
+
+def query_period_index(index: PeriodIndex,
+                       start_date: date | None = None,
+                       end_date: date | None = None
+                       ) -> tuple[dict[str, Decimal],
+                                  dict[str, ProductSaleData]]:
+    """
+        Merges the reports of the days in a date range of a period index.
+        Only the days loaded into the index are merged, see load_period_days.
+
+        :param index: period index (PeriodIndex)
+        :param start_date: optional first day of the range, or None for no lower bound (date or None)
+        :param end_date: optional last day of the range, or None for no upper bound (date or None)
+
+        :returns: tuple of team report and product report of the sales in the range
+    """
+
+    days: list[date] = [day for day in index.team_rpts if in_date_range(day, start_date, end_date)]
+
+    return (merge_team_rpts(*(index.team_rpts[day] for day in days)),
+            merge_prod_rpts(*(index.prod_rpts[day] for day in days)))
+
+
+def load_period_days(sales_fn: str, index: PeriodIndex, start_date: date | None, end_date: date | None) -> bool:
+    """
+        Loads the saved reports of the days in a date range into a period index
+
+        :param sales_fn: name of the sales file (str)
+        :param index: period index (PeriodIndex)
+        :param start_date: optional first day of the range, or None for no lower bound (date or None)
+        :param end_date: optional last day of the range, or None for no upper bound (date or None)
+
+        :returns: bool indicating if the reports of every day in the range were loaded
+    """
+
+    return all(load_period_day(sales_fn, index, day) for day in index.days
+               if in_date_range(day, start_date, end_date) and day not in index.team_rpts)
+
+
+def calc_sales_rpt_period(*,
+                          team_map: dict[int, str],
+                          prod_master: dict[int, Product],
+                          sales_fn: str,
+                          start_date: date | None = None,
+                          end_date: date | None = None,
+                          hide_exc: bool = False
+                          ) -> tuple[dict[str, Decimal],
+                                     dict[str, ProductSaleData]]:
+    """
+        Calculates the team report and product report of the sales in a date range
+        from the team map, product master, and a dated sales file
+
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param sales_fn: name of the sales file (str)
+        :param start_date: optional first day of the range, or None for no lower bound (date or None)
+        :param end_date: optional last day of the range, or None for no upper bound (date or None)
+        :param hide_exc: bool to specify if exceptions should be hidden from console
+
+        :returns: tuple of two dicts where the first dict contains team report information with
+
+            key = team name (str)
+            value = gross revenue (Decimal)
+
+            and the second dict contains product report information with
+
+            key = product name (str)
+            value = ProductSaleData
+    """
+
+    index: PeriodIndex = update_period_index(team_map=team_map,
+                                             prod_master=prod_master,
+                                             sales_fn=sales_fn,
+                                             hide_exc=hide_exc)
+
+    if not load_period_days(sales_fn, index, start_date, end_date):
+        print("Period index is incomplete. Rebuilding period index.\n")
+        index = update_period_index(team_map=team_map, prod_master=prod_master, sales_fn=sales_fn,
+                                    hide_exc=hide_exc, rebuild=True)
+
+    team_rpt, prod_rpt = query_period_index(index, start_date, end_date)
+
+    if index.offset < index.file_size:
+        # A final line without a newline may still be being written, so it is included in the reports
+        # but not in the saved index
+        tail_index = PeriodIndex(offset=index.offset, checksum="", file_size=index.file_size, mtime_ns=0,
+                                 ref_checksum=index.ref_checksum, team_rpts={}, prod_rpts={})
+
+        add_dated_sales(tail_index,
+                        team_map=team_map,
+                        prod_master=prod_master,
+                        dated_sales=stream_sales_range(sales_fn, index.offset, index.file_size,
+                                                       parse_row=parse_dated_sale),
+                        hide_exc=hide_exc)
+
+        tail_team_rpt, tail_prod_rpt = query_period_index(tail_index, start_date, end_date)
+        team_rpt = merge_team_rpts(team_rpt, tail_team_rpt)
+        prod_rpt = merge_prod_rpts(prod_rpt, tail_prod_rpt)
+
+    return team_rpt, prod_rpt
@@ -0,0 +1,171 @@
+# Defines fixed-memory summaries of a stream of sales, used by the approximate mode.
+# Reservoir keeps a uniform random sample of a fixed number of items, skipping ahead between the items it takes
+# (Algorithm L), so items that are not sampled cost nothing. CountMinSketch counts the total of every key in a fixed
+# table of counters and never underestimates a total. SpaceSaving keeps the totals of a fixed number of keys, replacing
+# the smallest when a new key arrives, and bounds the true total of each key it keeps from both sides.
+
+import heapq
+import sys
+from collections.abc import Callable, Iterator, Sequence
+from math import exp, floor, log
+from random import Random
+from typing import Any
+
+# Modulus of the hash functions of the count-min sketch, a Mersenne prime larger than any id
+MERSENNE_PRIME: int = (1 << 61) - 1
+
+
+class Reservoir:
+    """Uniform random sample of a fixed number of items from a stream of batches of items"""
+
+    def __init__(self, size: int, rng: Random):
+        self.size: int = size
+        self.rng: Random = rng
+        self.items: list = []
+        self.seen: int = 0  # number of items in the stream so far
+
+        # Index in the stream of the next item to be sampled once the reservoir is full
+        self.weight: float = exp(log(self.uniform()) / size)
+        self.next_index: int = size + self.skip()
+
+    def uniform(self) -> float:
+        """
+            Draws a random number in the open interval (0, 1)
+
+            :returns: random number (float)
+        """
+
+        return self.rng.random() or sys.float_info.min
+
+    def skip(self) -> int:
+        """
+            Draws the number of items to skip before the next sampled item
+
+            :returns: number of items (int)
+        """
+
+        return floor(log(self.uniform()) / log(1 - self.weight))
+
+    def add_batch(self, batch: Sequence, copy_item: Callable[[Any], Any]) -> None:
+        """
+            Adds a batch of items of the stream, sampling some of them
+
+            :param batch: batch of items, which can be indexed (Sequence)
+            :param copy_item: function that copies an item to keep in the sample, so the sample does not keep the
+                batch in memory
+        """
+
+        start: int = self.seen
+        end: int = start + len(batch)
+
+        # The first items fill the reservoir
+        for index in range(min(self.size - len(self.items), len(batch))):
+            self.items.append(copy_item(batch[index]))
+
+        while self.next_index < end:
+            self.items[self.rng.randrange(self.size)] = copy_item(batch[self.next_index - start])
+
+            self.weight *= exp(log(self.uniform()) / self.size)
+            self.next_index += self.skip() + 1
+
+        self.seen = end
+
+
+class CountMinSketch:
+    """
+        Table of counters that estimates the total of any integer key. An estimate is never below the true total,
+        and is above it by at most e / width of the sum of all totals, with probability 1 - exp(-depth).
+    """
+
+    def __init__(self, width: int, depth: int, rng: Random):
+        self.width: int = width
+        self.rows: list[list[int]] = [[0] * width for _ in range(depth)]
+
+        # Each row has its own hash function (a * key + b) mod MERSENNE_PRIME mod width
+        self.hashes: list[tuple[int, int]] = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME))
+                                              for _ in range(depth)]
+
+    def add(self, key: int, count: int) -> None:
+        """
+            Adds to the total of a key
+
+            :param key: key (int)
+            :param count: amount to add (int), which cannot be negative
+        """
+
+        width: int = self.width
+
+        for row, (a, b) in zip(self.rows, self.hashes):
+            row[(a * key + b) % MERSENNE_PRIME % width] += count
+
+    def estimate(self, key: int) -> int:
+        """
+            Estimates the total of a key
+
+            :param key: key (int)
+
+            :returns: estimated total (int)
+        """
+
+        width: int = self.width
+
+        return min(row[(a * key + b) % MERSENNE_PRIME % width] for row, (a, b) in zip(self.rows, self.hashes))
+
+
+class SpaceSaving:
+    """
+        Totals of up to a fixed number of integer keys, keeping the keys with the largest totals. A key that arrives
+        when the summary is full replaces the key with the smallest total, and takes over that total as its error.
+        The true total of a kept key is between its total minus its error and its total.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity: int = capacity
+        self.totals: dict[int, int] = {}
+        self.errors: dict[int, int] = {}
+
+        # Min-heap of (total, key) with one entry for each kept key. Adding to a kept key does not update its entry,
+        # so an entry can be below the total of its key until it reaches the top of the heap.
+        self.heap: list[tuple[int, int]] = []
+
+    def add(self, key: int, count: int) -> None:
+        """
+            Adds to the total of a key
+
+            :param key: key (int)
+            :param count: amount to add (int), which cannot be negative
+        """
+
+        totals: dict[int, int] = self.totals
+
+        if key in totals:
+            totals[key] += count
+            return
+
+        if len(totals) < self.capacity:
+            totals[key] = count
+            self.errors[key] = 0
+            heapq.heappush(self.heap, (count, key))
+            return
+
+        # Bring the entries at the top of the heap up to date until the smallest total is found
+        while self.heap[0][0] != totals[self.heap[0][1]]:
+            heapq.heapreplace(self.heap, (totals[self.heap[0][1]], self.heap[0][1]))
+
+        min_total, min_key = self.heap[0]
+
+        del totals[min_key]
+        del self.errors[min_key]
+
+        totals[key] = min_total + count
+        self.errors[key] = min_total
+        heapq.heapreplace(self.heap, (min_total + count, key))
+
+    def items(self) -> Iterator[tuple[int, int, int]]:
+        """
+            Gets the kept keys
+
+            :returns: iterator of (key, total, error)
+        """
+
+        return ((key, total, self.errors[key]) for key, total in self.totals.items())
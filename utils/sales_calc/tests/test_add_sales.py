@@ -0,0 +1,58 @@
+import unittest
+from decimal import Decimal
+from ...models import Product, ProductSaleData, Sale
+from ..calc_sales_rpt import add_sales, calc_sales_rpt
+
+
+class TestAddSales(unittest.TestCase):
+    """Test case for add_sales"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a set of data"""
+
+        cls.team_map: dict[int, str] = {1: "Team A", 2: "Team B"}
+
+        cls.prod_master: dict[int, Product] = {
+            1: Product(name="Product A", unit_price=Decimal("35.5"), lot_size=10),
+            2: Product(name="Product B", unit_price=Decimal("45.21"), lot_size=1)
+        }
+
+        cls.sales_data: tuple[Sale] = (
+            Sale(prod_id=1, team_id=2, lots_sold=5, discount=Decimal(0)),
+            Sale(prod_id=1, team_id=1, lots_sold=1, discount=Decimal(5)),
+            Sale(prod_id=2, team_id=2, lots_sold=20, discount=Decimal(10))
+        )
+
+    def test_add_sales_in_batches(self) -> None:
+        """Test that adding sales in batches gives the same reports as adding them at once"""
+
+        expected_team_rpt, expected_prod_rpt = calc_sales_rpt(team_map=self.team_map,
+                                                              prod_master=self.prod_master,
+                                                              sales_data=self.sales_data)
+
+        team_rpt: dict[str, Decimal] = {}
+        prod_rpt: dict[str, ProductSaleData] = {}
+
+        for batch in (self.sales_data[:2], self.sales_data[2:]):
+            add_sales(team_rpt, prod_rpt,
+                      team_map=self.team_map,
+                      prod_master=self.prod_master,
+                      sales_data=batch)
+
+        self.assertEqual(team_rpt, expected_team_rpt)
+        self.assertEqual(prod_rpt, expected_prod_rpt)
+
+    def test_calc_sales_rpt_from_generator(self) -> None:
+        """Test that sales can be consumed from a generator"""
+
+        team_rpt, prod_rpt = calc_sales_rpt(team_map=self.team_map,
+                                            prod_master=self.prod_master,
+                                            sales_data=(sale for sale in self.sales_data))
+
+        self.assertEqual(team_rpt["Team B"], Decimal("2679.20"))
+        self.assertEqual(prod_rpt["Product A"].units_sold, 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
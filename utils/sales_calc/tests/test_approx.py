@@ -0,0 +1,140 @@
+import random
+import unittest
+from decimal import Decimal
+from ...models import Product, Sale, SalesTable
+from ..approx import calc_sales_rpt_approx, estimate_total
+from ..calc_sales_rpt import calc_sales_rpt
+
+
+class TestCalcSalesRptApprox(unittest.TestCase):
+    """Test case comparing calc_sales_rpt_approx with calc_sales_rpt on randomized data"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with randomized data, including products that share a name"""
+
+        rng = random.Random(25)
+
+        cls.team_map: dict[int, str] = {team_id: f"Team {team_id % 4}" for team_id in range(1, 6)}
+
+        cls.prod_master: dict[int, Product] = {
+            prod_id: Product(name=f"Product {prod_id % 8}",
+                             unit_price=Decimal(rng.randint(1, 10000)).scaleb(-2),
+                             lot_size=rng.randint(1, 20))
+            for prod_id in range(1, 11)
+        }
+
+        cls.sales_data: list[Sale] = [
+            Sale(prod_id=rng.randint(1, 10),
+                 team_id=rng.randint(1, 5),
+                 lots_sold=rng.randint(0, 100),
+                 discount=Decimal(rng.randint(0, 2000)).scaleb(-2))
+            for _ in range(20000)
+        ]
+
+        cls.team_rpt, cls.prod_rpt = calc_sales_rpt(team_map=cls.team_map,
+                                                    prod_master=cls.prod_master,
+                                                    sales_data=cls.sales_data)
+
+    def batches(self, size: int) -> list[list[Sale]]:
+        """Splits the sales into batches"""
+
+        return [self.sales_data[start:start + size] for start in range(0, len(self.sales_data), size)]
+
+    def test_full_sample(self) -> None:
+        """Test that a sample of every sale gives the exact reports, with intervals of no width"""
+
+        report = calc_sales_rpt_approx(team_map=self.team_map,
+                                       prod_master=self.prod_master,
+                                       sales_batches=self.batches(3000),
+                                       sample_size=len(self.sales_data),
+                                       seed=1)
+
+        self.assertEqual((report.sales, report.sampled), (20000, 20000))
+        self.assertEqual(report.team_rpt.keys(), self.team_rpt.keys())
+        self.assertEqual(report.prod_rpt.keys(), self.prod_rpt.keys())
+
+        for team, estimate in report.team_rpt.items():
+            self.assertAlmostEqual(estimate.value, float(self.team_rpt[team]), places=4)
+            self.assertEqual(estimate.low, estimate.high)
+
+        for name, data in report.prod_rpt.items():
+            self.assertAlmostEqual(data.gross_rev.value, float(self.prod_rpt[name].gross_rev), places=4)
+            self.assertAlmostEqual(data.disc_cost.value, float(self.prod_rpt[name].disc_cost), places=4)
+
+    def test_tables_match_sales(self) -> None:
+        """Test that sales tables as batches give the same sample and estimates as lists of sales"""
+
+        reports = [calc_sales_rpt_approx(team_map=self.team_map,
+                                         prod_master=self.prod_master,
+                                         sales_batches=batches,
+                                         sample_size=2000,
+                                         seed=4)
+                   for batches in (self.batches(3000), [SalesTable.from_sales(batch) for batch in self.batches(3000)])]
+
+        self.assertEqual(reports[0].team_rpt.keys(), reports[1].team_rpt.keys())
+        self.assertEqual(reports[0].top_units, reports[1].top_units)
+
+        for name, data in reports[0].prod_rpt.items():
+            self.assertAlmostEqual(data.gross_rev.value, reports[1].prod_rpt[name].gross_rev.value, places=4)
+            self.assertAlmostEqual(data.disc_cost.value, reports[1].prod_rpt[name].disc_cost.value, places=4)
+
+    def test_intervals(self) -> None:
+        """Test that most intervals estimated from a sample contain the exact amounts"""
+
+        covered: int = 0
+        intervals: int = 0
+
+        for seed in range(10):
+            report = calc_sales_rpt_approx(team_map=self.team_map,
+                                           prod_master=self.prod_master,
+                                           sales_batches=self.batches(3000),
+                                           sample_size=2000,
+                                           seed=seed)
+
+            self.assertEqual((report.sales, report.sampled), (20000, 2000))
+
+            for team, estimate in report.team_rpt.items():
+                covered += estimate.low <= self.team_rpt[team] <= estimate.high
+                intervals += 1
+
+            for name, data in report.prod_rpt.items():
+                covered += data.gross_rev.low <= self.prod_rpt[name].gross_rev <= data.gross_rev.high
+                covered += data.disc_cost.low <= self.prod_rpt[name].disc_cost <= data.disc_cost.high
+                intervals += 2
+
+        # 95% confidence intervals are expected to contain about 95% of the exact amounts
+        self.assertGreater(covered / intervals, 0.85)
+
+    def test_top_units(self) -> None:
+        """Test that the units sold of each product are within their bounds, with sales tables as batches"""
+
+        sales_tables: list[SalesTable] = [SalesTable.from_sales(batch) for batch in self.batches(3000)]
+
+        report = calc_sales_rpt_approx(team_map=self.team_map,
+                                       prod_master=self.prod_master,
+                                       sales_batches=sales_tables,
+                                       sample_size=500,
+                                       seed=3)
+
+        self.assertEqual(report.top_units.keys(), self.prod_rpt.keys())
+
+        for name, units in report.top_units.items():
+            self.assertLessEqual(units.low, self.prod_rpt[name].units_sold)
+            self.assertLessEqual(self.prod_rpt[name].units_sold, units.high)
+
+    def test_estimate_total(self) -> None:
+        """Test the estimate and interval of a total from a sample"""
+
+        estimate = estimate_total(total=10.0, sum_squares=50.0, sampled=4, sales=8)
+
+        self.assertEqual(estimate.value, 20.0)
+        self.assertAlmostEqual(estimate.high - estimate.value, 1.96 * 8 * (0.5 * 25 / 3 / 4) ** 0.5)
+        self.assertAlmostEqual(estimate.value - estimate.low, estimate.high - estimate.value)
+
+        # The interval does not go below 0
+        self.assertEqual(estimate_total(total=10.0, sum_squares=100.0, sampled=4, sales=8).low, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import random
+import unittest
+from decimal import Decimal
+from ...models import Product, Sale, SalesTable
+from ..calc_sales_rpt import calc_sales_rpt
+from ..columnar import calc_sales_rpt_columnar
+from ..exceptions import AmountPrecisionError
+
+
+class TestCalcSalesRptColumnar(unittest.TestCase):
+    """Test case for calc_sales_rpt_columnar"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a set of random data"""
+
+        rng = random.Random(0)
+
+        cls.team_map: dict[int, str] = {team_id: f"Team {team_id}" for team_id in range(1, 6)}
+
+        cls.prod_master: dict[int, Product] = {
+            prod_id: Product(name=f"Product {prod_id}",
+                             unit_price=Decimal(rng.randint(1, 100_000)) / 100,
+                             lot_size=rng.randint(1, 50))
+            for prod_id in range(1, 21)
+        }
+
+        cls.sales_data: tuple[Sale] = tuple(
+            Sale(prod_id=rng.randint(1, 20),
+                 team_id=rng.randint(1, 5),
+                 lots_sold=rng.randint(1, 100),
+                 discount=Decimal(rng.randint(0, 10_000)) / 100)
+            for _ in range(2_000)
+        )
+
+    def test_matches_decimal_engine(self) -> None:
+        """Test that the columnar engine gives exactly the same totals as the Decimal engine"""
+
+        expected_team_rpt, expected_prod_rpt = calc_sales_rpt(team_map=self.team_map,
+                                                              prod_master=self.prod_master,
+                                                              sales_data=self.sales_data)
+
+        actual_team_rpt, actual_prod_rpt = calc_sales_rpt_columnar(team_map=self.team_map,
+                                                                   prod_master=self.prod_master,
+                                                                   sales_data=self.sales_data)
+
+        self.assertEqual(actual_team_rpt, expected_team_rpt)
+        self.assertEqual(actual_prod_rpt, expected_prod_rpt)
+
+    def test_sales_table_matches_decimal_engine(self) -> None:
+        """Test that a SalesTable gives the same totals in both engines"""
+
+        sales_table: SalesTable = SalesTable.from_sales(self.sales_data)
+
+        expected_team_rpt, expected_prod_rpt = calc_sales_rpt(team_map=self.team_map,
+                                                              prod_master=self.prod_master,
+                                                              sales_data=sales_table)
+
+        actual_team_rpt, actual_prod_rpt = calc_sales_rpt_columnar(team_map=self.team_map,
+                                                                   prod_master=self.prod_master,
+                                                                   sales_data=sales_table)
+
+        self.assertEqual(actual_team_rpt, expected_team_rpt)
+        self.assertEqual(actual_prod_rpt, expected_prod_rpt)
+
+    def test_raises_error_on_sub_cent_price(self) -> None:
+        """Test with a price that cannot be held in cents"""
+
+        prod_master = {1: Product(name="Product A", unit_price=Decimal("0.125"), lot_size=1)}
+        sales_data = (Sale(prod_id=1, team_id=1, lots_sold=1, discount=Decimal(0)),)
+
+        self.assertRaises(AmountPrecisionError, calc_sales_rpt_columnar,
+                          team_map=self.team_map, prod_master=prod_master, sales_data=sales_data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from decimal import Decimal
+from ...models import Product, ProductSaleData, Sale, SalesCube
+from ..calc_sales_rpt import calc_sales_rpt
+from ..cube import calc_sales_cube, cube_prod_rpt, cube_team_rpt, slice_cube
+
+
+class TestCalcSalesCube(unittest.TestCase):
+    """Test case for calc_sales_cube and the reports derived from it"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a set of data"""
+
+        cls.team_map: dict[int, str] = {1: "Team A", 2: "Team B", 3: "Team C"}
+
+        cls.prod_master: dict[int, Product] = {
+            1: Product(name="Product A", unit_price=Decimal("35.5"), lot_size=10),
+            2: Product(name="Product B", unit_price=Decimal("45.21"), lot_size=1),
+            3: Product(name="Product C", unit_price=Decimal("9.87"), lot_size=35)
+        }
+
+        cls.sales_data: tuple[Sale] = (
+            Sale(prod_id=1, team_id=2, lots_sold=5, discount=Decimal(0)),
+            Sale(prod_id=1, team_id=1, lots_sold=1, discount=Decimal(5)),
+            Sale(prod_id=2, team_id=2, lots_sold=20, discount=Decimal(10)),
+            Sale(prod_id=3, team_id=1, lots_sold=10, discount=Decimal(100)),
+            Sale(prod_id=3, team_id=3, lots_sold=40, discount=Decimal(2)),
+            Sale(prod_id=1, team_id=2, lots_sold=2, discount=Decimal(50))
+        )
+
+        cls.cube: SalesCube = calc_sales_cube(team_map=cls.team_map,
+                                              prod_master=cls.prod_master,
+                                              sales_data=cls.sales_data)
+
+    def test_cells(self) -> None:
+        """Test that sales of the same team and product are combined in one cell"""
+
+        self.assertEqual(len(self.cube.cells), 5)
+        self.assertEqual(self.cube.cells[(2, 1)],
+                         ProductSaleData(gross_rev=Decimal(2485), units_sold=70, disc_cost=Decimal(355)))
+
+    def test_derived_rpts_match_calc_sales_rpt(self) -> None:
+        """Test that the reports derived from the cube match calc_sales_rpt"""
+
+        expected_team_rpt, expected_prod_rpt = calc_sales_rpt(team_map=self.team_map,
+                                                              prod_master=self.prod_master,
+                                                              sales_data=self.sales_data)
+
+        self.assertEqual(cube_team_rpt(self.cube), expected_team_rpt)
+        self.assertEqual(cube_prod_rpt(self.cube), expected_prod_rpt)
+
+    def test_slice_cube(self) -> None:
+        """Test slicing the cube to a team and to a product"""
+
+        team_slice: SalesCube = slice_cube(self.cube, team_name="Team A")
+        self.assertEqual(set(team_slice.cells), {(1, 1), (1, 3)})
+        self.assertEqual(team_slice.team_names, {1: "Team A"})
+
+        prod_slice: SalesCube = slice_cube(self.cube, prod_name="Product A")
+        self.assertEqual(set(prod_slice.cells), {(1, 1), (2, 1)})
+        self.assertEqual(cube_prod_rpt(prod_slice)["Product A"].units_sold, 80)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from decimal import Decimal
+from ...models import Product, ProductSaleData, Sale
+from ..dense_rpt import DenseSalesRpt
+
+
+class TestDenseSalesRpt(unittest.TestCase):
+    """Test case for DenseSalesRpt"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a set of data where two products share a name"""
+
+        cls.team_map: dict[int, str] = {1: "Team A", 2: "Team B"}
+
+        cls.prod_master: dict[int, Product] = {
+            1: Product(name="Product A", unit_price=Decimal("35.5"), lot_size=10),
+            2: Product(name="Product A", unit_price=Decimal("45.21"), lot_size=1),
+            3: Product(name="Product C", unit_price=Decimal("9.87"), lot_size=35)
+        }
+
+        cls.sales_data: tuple[Sale] = (
+            Sale(prod_id=1, team_id=2, lots_sold=5, discount=Decimal(0)),
+            Sale(prod_id=2, team_id=1, lots_sold=20, discount=Decimal(10)),
+            Sale(prod_id=3, team_id=1, lots_sold=10, discount=Decimal(100)),
+            Sale(prod_id=1, team_id=2, lots_sold=2, discount=Decimal(50))
+        )
+
+        cls.dense_rpt = DenseSalesRpt()
+
+        cls.dense_rpt.add_sales(team_map=cls.team_map,
+                                prod_master=cls.prod_master,
+                                sales_data=cls.sales_data)
+
+    def test_ids_compacted_in_order_seen(self) -> None:
+        """Test that ids are given dense indexes in the order they are first seen"""
+
+        self.assertEqual(self.dense_rpt.prod_index, {1: 0, 2: 1, 3: 2})
+        self.assertEqual(self.dense_rpt.team_index, {2: 0, 1: 1})
+
+    def test_resolve_rpts(self) -> None:
+        """Test that resolving by name combines products that share a name"""
+
+        team_rpt: dict[str, Decimal] = {}
+        prod_rpt: dict[str, ProductSaleData] = {}
+
+        self.dense_rpt.resolve_rpts(team_rpt, prod_rpt)
+
+        self.assertEqual(team_rpt, {"Team A": Decimal("4358.7"), "Team B": Decimal(2485)})
+
+        self.assertEqual(prod_rpt, {
+            "Product A": ProductSaleData(gross_rev=Decimal("3389.2"), units_sold=90, disc_cost=Decimal("445.42")),
+            "Product C": ProductSaleData(gross_rev=Decimal("3454.5"), units_sold=350, disc_cost=Decimal("3454.5"))
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
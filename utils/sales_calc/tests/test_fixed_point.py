@@ -0,0 +1,79 @@
+import random
+import unittest
+from decimal import Decimal
+from ...models import Product, Sale
+from ..calc_sales_rpt import calc_sales_rpt
+from ..exceptions import AmountPrecisionError
+from ..fixed_point import calc_sales_rpt_fixed
+
+
+class TestCalcSalesRptFixed(unittest.TestCase):
+    """Differential test case comparing calc_sales_rpt_fixed with calc_sales_rpt on randomized data"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with randomized data, including sub-cent prices and products that share a name"""
+
+        rng = random.Random(20)
+
+        cls.team_map: dict[int, str] = {team_id: f"Team {team_id % 15}" for team_id in range(1, 21)}
+
+        cls.prod_master: dict[int, Product] = {
+            prod_id: Product(name=f"Product {prod_id % 40}",
+                             unit_price=Decimal(rng.randint(1, 10 ** 8)).scaleb(-rng.randint(0, 8)),
+                             lot_size=rng.randint(1, 500))
+            for prod_id in range(1, 51)
+        }
+
+        cls.sales_data: list[Sale] = [
+            Sale(prod_id=rng.randint(1, 50),
+                 team_id=rng.randint(1, 20),
+                 lots_sold=rng.randint(0, 1000),
+                 discount=Decimal(rng.randint(0, 10000)).scaleb(-rng.randint(0, 2)).min(Decimal(100)))
+            for _ in range(5000)
+        ]
+
+    def test_matches_decimal_engine(self) -> None:
+        """Test that the reports are exactly equal to those of the Decimal engine"""
+
+        expected_team_rpt, expected_prod_rpt = calc_sales_rpt(team_map=self.team_map,
+                                                              prod_master=self.prod_master,
+                                                              sales_data=self.sales_data)
+
+        team_rpt, prod_rpt = calc_sales_rpt_fixed(team_map=self.team_map,
+                                                  prod_master=self.prod_master,
+                                                  sales_data=self.sales_data)
+
+        self.assertEqual(team_rpt, expected_team_rpt)
+        self.assertEqual(prod_rpt, expected_prod_rpt)
+
+    def test_rounded_output_matches(self) -> None:
+        """Test that the amounts written to the reports, rounded to the cent, are the same"""
+
+        expected_team_rpt, expected_prod_rpt = calc_sales_rpt(team_map=self.team_map,
+                                                              prod_master=self.prod_master,
+                                                              sales_data=self.sales_data)
+
+        team_rpt, prod_rpt = calc_sales_rpt_fixed(team_map=self.team_map,
+                                                  prod_master=self.prod_master,
+                                                  sales_data=self.sales_data)
+
+        self.assertEqual({team: str(round(revenue, 2)) for team, revenue in team_rpt.items()},
+                         {team: str(round(revenue, 2)) for team, revenue in expected_team_rpt.items()})
+
+        self.assertEqual({name: (str(round(data.gross_rev, 2)), data.units_sold, str(round(data.disc_cost, 2)))
+                          for name, data in prod_rpt.items()},
+                         {name: (str(round(data.gross_rev, 2)), data.units_sold, str(round(data.disc_cost, 2)))
+                          for name, data in expected_prod_rpt.items()})
+
+    def test_raises_error(self) -> None:
+        """Test with a discount that has too many decimal places"""
+
+        sales_data: list[Sale] = [Sale(prod_id=1, team_id=1, lots_sold=1, discount=Decimal("2.125"))]
+
+        self.assertRaises(AmountPrecisionError, calc_sales_rpt_fixed,
+                          team_map=self.team_map, prod_master=self.prod_master, sales_data=sales_data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import contextlib
+import io
+import os
+import unittest
+from decimal import Decimal
+from unittest import mock
+from ...file_IO.state import get_state_path
+from ...file_IO.tests.temp_folder import TempFolderTestCase
+from ...file_IO.write import get_temp_path
+from ...models import Product, Sale
+from .. import incremental
+from ..calc_sales_rpt import calc_sales_rpt
+from ..incremental import calc_sales_rpt_incremental
+
+
+class TestCalcSalesRptIncremental(TempFolderTestCase):
+    """Test case for calc_sales_rpt_incremental"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with a sales file"""
+
+        super().setUp()
+
+        self.team_map: dict[int, str] = {1: "Team A", 2: "Team B"}
+
+        self.prod_master: dict[int, Product] = {
+            1: Product(name="Product A", unit_price=Decimal("2.50"), lot_size=10),
+            2: Product(name="Product B", unit_price=Decimal("100"), lot_size=1)
+        }
+
+        self.rows: list[str] = ["1,1,1,2,0\n", "2,2,2,1,10\n"]
+        self.write_infile("Sales.csv", "".join(self.rows))
+
+    def append_rows(self, *rows: str) -> None:
+        """Appends rows to the sales file, changing its modification time"""
+
+        self.rows.extend(rows)
+        self.write_infile("Sales.csv", "".join(self.rows))
+
+    def calc(self) -> tuple[dict, dict]:
+        """Calculates the reports incrementally, hiding messages"""
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            return calc_sales_rpt_incremental(team_map=self.team_map, prod_master=self.prod_master,
+                                              sales_fn="Sales.csv")
+
+    def expected(self) -> tuple[dict, dict]:
+        """Calculates the reports from every row"""
+
+        return calc_sales_rpt(team_map=self.team_map,
+                              prod_master=self.prod_master,
+                              sales_data=[Sale(prod_id=int(fields[1]), team_id=int(fields[2]),
+                                               lots_sold=int(fields[3]), discount=Decimal(fields[4]))
+                                          for fields in (row.strip().split(",") for row in self.rows)])
+
+    def test_appended_rows(self) -> None:
+        """Test that appended rows are added to the saved reports, and a state file is left without a temporary file"""
+
+        self.assertEqual(self.calc(), self.expected())
+
+        self.append_rows("3,1,2,4,50\n")
+        self.assertEqual(self.calc(), self.expected())
+
+        self.assertTrue(os.path.exists(get_state_path("Sales.csv")))
+        self.assertFalse(os.path.exists(get_temp_path(get_state_path("Sales.csv"))))
+
+    def test_unchanged_file_is_not_read(self) -> None:
+        """Test that a sales file that has not changed since the last run is not read again"""
+
+        self.calc()
+
+        with mock.patch.object(incremental, "stream_sales_range") as stream_sales_range:
+            self.assertEqual(self.calc(), self.expected())
+
+        stream_sales_range.assert_not_called()
+
+    def test_changed_file_is_rebuilt(self) -> None:
+        """Test that the reports are rebuilt if a saved row changes"""
+
+        self.calc()
+
+        self.rows[0] = "1,2,1,2,0\n"
+        self.append_rows("3,1,2,4,50\n")
+
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            reports: tuple[dict, dict] = calc_sales_rpt_incremental(team_map=self.team_map,
+                                                                    prod_master=self.prod_master,
+                                                                    sales_fn="Sales.csv")
+
+        self.assertIn("Rebuilding reports", output.getvalue())
+        self.assertEqual(reports, self.expected())
+
+    def test_edit_far_before_offset_is_rebuilt(self) -> None:
+        """Test that a saved row edited more than 1 MiB before the end of the saved part is found"""
+
+        self.rows = [f"{sale_id},1,1,2,0\n" for sale_id in range(1, 100_000)]
+        self.write_infile("Sales.csv", "".join(self.rows))
+        self.calc()
+
+        # The edit keeps the size of the row, and an append changes the size and modification time of the file
+        self.rows[0] = "1,2,1,2,0\n"
+        self.append_rows("100000,1,2,4,50\n")
+
+        self.assertEqual(self.calc(), self.expected())
+
+    def test_partial_last_line(self) -> None:
+        """Test that a last line without a newline is in the reports, but added to the saved reports only once"""
+
+        self.append_rows("3,1,2,4,50")
+        self.assertEqual(self.calc(), self.expected())
+
+        self.rows[-1] += "\n"
+        self.append_rows()
+        self.assertEqual(self.calc(), self.expected())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+from decimal import Decimal
+from ...file_IO.tests.temp_folder import TempFolderTestCase
+from ...models import Product, Sale
+from ..calc_sales_rpt import calc_sales_rpt
+from ..parallel import calc_sales_rpt_parallel
+
+
+class TestCalcSalesRptParallel(TempFolderTestCase):
+    """Test case for calc_sales_rpt_parallel"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with a random sales file"""
+
+        super().setUp()
+
+        self.team_map: dict[int, str] = {team_id: f"Team {team_id}" for team_id in range(1, 6)}
+        self.prod_master: dict[int, Product] = {
+            prod_id: Product(name=f"Product {prod_id}", unit_price=Decimal(prod_id) / 4, lot_size=prod_id % 7 + 1)
+            for prod_id in range(1, 51)
+        }
+
+        rng = random.Random(0)
+
+        self.rows: list[str] = [f"{sale_id},{rng.randint(1, 50)},{rng.randint(1, 5)},"
+                                f"{rng.randint(1, 100)},{rng.randint(0, 10_000) / 100}\n"
+                                for sale_id in range(2_000)]
+        self.write_infile("Sales.csv", "".join(self.rows))
+
+    def expected(self) -> tuple[dict, dict]:
+        """Calculates the reports from every row in one process"""
+
+        return calc_sales_rpt(team_map=self.team_map,
+                              prod_master=self.prod_master,
+                              sales_data=[Sale(prod_id=int(fields[1]), team_id=int(fields[2]),
+                                               lots_sold=int(fields[3]), discount=Decimal(fields[4]))
+                                          for fields in (row.strip().split(",") for row in self.rows)])
+
+    def calc(self, workers: int, reader: str = "csv") -> tuple[dict, dict]:
+        """Calculates the reports in a pool of worker processes"""
+
+        return calc_sales_rpt_parallel(team_map=self.team_map, prod_master=self.prod_master, sales_fn="Sales.csv",
+                                       workers=workers, reader=reader)
+
+    def test_matches_calc_sales_rpt(self) -> None:
+        """Test that the merged reports of the ranges equal the reports of the whole file"""
+
+        self.assertEqual(self.calc(3), self.expected())
+
+    def test_mmap_reader(self) -> None:
+        """Test that ranges parsed by the memory-mapped reader give the same reports"""
+
+        self.assertEqual(self.calc(3, reader="mmap"), self.expected())
+
+    def test_edge_files(self) -> None:
+        """Test a file without a trailing newline, and more workers than lines, with both readers"""
+
+        self.rows = self.rows[:3]
+        self.write_infile("Sales.csv", "".join(self.rows).rstrip("\n"))
+
+        for reader in ("csv", "mmap"):
+            self.assertEqual(self.calc(8, reader=reader), self.expected())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import contextlib
+import io
+import json
+import random
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from ...file_IO.state import get_period_day_path
+from ...file_IO.tests.temp_folder import TempFolderTestCase
+from ...models import PeriodIndex, Product, Sale
+from .. import periods
+from ..calc_sales_rpt import calc_sales_rpt
+from ..periods import add_dated_sales, calc_sales_rpt_period, query_period_index
+
+
+class TestPeriodIndex(unittest.TestCase):
+    """Test case for add_dated_sales and query_period_index"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a period index of random dated sales"""
+
+        rng = random.Random(0)
+
+        cls.team_map: dict[int, str] = {team_id: f"Team {team_id}" for team_id in range(1, 6)}
+
+        cls.prod_master: dict[int, Product] = {
+            prod_id: Product(name=f"Product {prod_id}",
+                             unit_price=Decimal(rng.randint(1, 100_000)) / 100,
+                             lot_size=rng.randint(1, 50))
+            for prod_id in range(1, 21)
+        }
+
+        cls.dated_sales: list[tuple[date, Sale]] = [
+            (date(2024, 1, 1) + timedelta(days=rng.randint(0, 90)),
+             Sale(prod_id=rng.randint(1, 20),
+                  team_id=rng.randint(1, 5),
+                  lots_sold=rng.randint(1, 100),
+                  discount=Decimal(rng.randint(0, 10_000)) / 100))
+            for _ in range(2_000)
+        ]
+
+        cls.index = PeriodIndex(offset=0, checksum="", file_size=0, mtime_ns=0, ref_checksum="",
+                                team_rpts={}, prod_rpts={})
+
+        # Split the sales into batches to check that days spanning batches are combined
+        add_dated_sales(cls.index,
+                        team_map=cls.team_map,
+                        prod_master=cls.prod_master,
+                        dated_sales=(cls.dated_sales[i:i + 300] for i in range(0, len(cls.dated_sales), 300)))
+
+    def assert_range_matches(self, start_date: date | None, end_date: date | None) -> None:
+        """Asserts that a range query matches calculating the reports from the sales in the range"""
+
+        expected_team_rpt, expected_prod_rpt = calc_sales_rpt(
+            team_map=self.team_map,
+            prod_master=self.prod_master,
+            sales_data=(sale for day, sale in self.dated_sales
+                        if (start_date is None or day >= start_date) and (end_date is None or day <= end_date)))
+
+        team_rpt, prod_rpt = query_period_index(self.index, start_date, end_date)
+
+        self.assertEqual(team_rpt, expected_team_rpt)
+        self.assertEqual(prod_rpt, expected_prod_rpt)
+
+    def test_days(self) -> None:
+        """Test that the index has one bucket for each day with sales"""
+
+        self.assertEqual(set(self.index.team_rpts), {day for day, _ in self.dated_sales})
+        self.assertEqual(set(self.index.prod_rpts), set(self.index.team_rpts))
+
+    def test_whole_index(self) -> None:
+        """Test a query without bounds"""
+
+        self.assert_range_matches(None, None)
+
+    def test_month(self) -> None:
+        """Test a query for one month"""
+
+        self.assert_range_matches(date(2024, 2, 1), date(2024, 2, 29))
+
+    def test_open_ranges(self) -> None:
+        """Test queries with only one bound"""
+
+        self.assert_range_matches(date(2024, 3, 10), None)
+        self.assert_range_matches(None, date(2024, 1, 7))
+
+    def test_empty_range(self) -> None:
+        """Test a query for a range with no sales"""
+
+        self.assertEqual(query_period_index(self.index, date(2025, 1, 1), date(2025, 1, 31)), ({}, {}))
+
+    def test_query_does_not_modify_index(self) -> None:
+        """Test that merging the reports of a range leaves the index unchanged"""
+
+        day: date = self.dated_sales[0][0]
+        prod_rpt_before: dict = {name: data.units_sold for name, data in self.index.prod_rpts[day].items()}
+
+        query_period_index(self.index, day, day + timedelta(days=7))
+
+        self.assertEqual({name: data.units_sold for name, data in self.index.prod_rpts[day].items()},
+                         prod_rpt_before)
+
+
+class TestCalcSalesRptPeriod(TempFolderTestCase):
+    """Test case for calc_sales_rpt_period with a saved period index"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with a dated sales file"""
+
+        super().setUp()
+
+        self.team_map: dict[int, str] = {1: "Team A", 2: "Team B"}
+
+        self.prod_master: dict[int, Product] = {
+            1: Product(name="Product A", unit_price=Decimal("2.50"), lot_size=10),
+            2: Product(name="Product B", unit_price=Decimal("100"), lot_size=1)
+        }
+
+        self.rows: list[str] = ["1,1,1,2,0,2024-01-01\n", "2,2,2,1,10,2024-01-02\n", "3,1,2,4,50,2024-01-03\n"]
+        self.write_infile("Sales.csv", "".join(self.rows))
+
+    def calc(self, start_date: date | None, end_date: date | None, output: io.StringIO | None = None) -> tuple:
+        """Calculates the reports of a date range from the saved period index, hiding messages"""
+
+        with contextlib.redirect_stdout(output or io.StringIO()):
+            return calc_sales_rpt_period(team_map=self.team_map, prod_master=self.prod_master, sales_fn="Sales.csv",
+                                         start_date=start_date, end_date=end_date)
+
+    def expected(self, start_date: date, end_date: date) -> tuple[dict, dict]:
+        """Calculates the reports from the rows in a date range"""
+
+        return calc_sales_rpt(team_map=self.team_map,
+                              prod_master=self.prod_master,
+                              sales_data=[Sale(prod_id=int(fields[1]), team_id=int(fields[2]),
+                                               lots_sold=int(fields[3]), discount=Decimal(fields[4]))
+                                          for fields in (row.strip().split(",") for row in self.rows)
+                                          if start_date <= date.fromisoformat(fields[5]) <= end_date])
+
+    def test_query_loads_only_days_in_range(self) -> None:
+        """Test that a query of a saved index loads only the days in the range"""
+
+        self.calc(None, None)
+
+        with mock.patch.object(periods, "load_period_day", wraps=periods.load_period_day) as load_period_day:
+            self.assertEqual(self.calc(date(2024, 1, 2), date(2024, 1, 2)),
+                             self.expected(date(2024, 1, 2), date(2024, 1, 2)))
+
+        self.assertEqual([call.args[2] for call in load_period_day.call_args_list], [date(2024, 1, 2)])
+
+    def test_appended_rows(self) -> None:
+        """Test that rows appended to a day already in the index are added to its saved reports"""
+
+        self.calc(None, None)
+
+        self.rows.append("4,2,1,3,0,2024-01-02\n")
+        self.write_infile("Sales.csv", "".join(self.rows))
+
+        self.assertEqual(self.calc(date(2024, 1, 1), date(2024, 1, 3)),
+                         self.expected(date(2024, 1, 1), date(2024, 1, 3)))
+
+    def test_mismatched_day_is_rebuilt(self) -> None:
+        """Test that the index is rebuilt if the saved file of a day does not match the index"""
+
+        self.calc(None, None)
+
+        with open(get_period_day_path("Sales.csv", date(2024, 1, 2)), 'r+', encoding="utf-8") as day_file:
+            day_json: dict = json.load(day_file)
+            day_json["offset"] = 0
+            day_file.seek(0)
+            day_file.truncate()
+            json.dump(day_json, day_file)
+
+        output = io.StringIO()
+
+        self.assertEqual(self.calc(date(2024, 1, 2), date(2024, 1, 3), output),
+                         self.expected(date(2024, 1, 2), date(2024, 1, 3)))
+        self.assertIn("Rebuilding period index", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
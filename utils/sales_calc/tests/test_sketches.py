@@ -0,0 +1,86 @@
+import random
+import unittest
+from collections import Counter
+from ..sketches import CountMinSketch, Reservoir, SpaceSaving
+
+
+class TestSketches(unittest.TestCase):
+    """Test case for the fixed-memory summaries of the approximate mode, on a skewed randomized stream"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a stream of keys where a few keys have most of the total"""
+
+        rng = random.Random(25)
+
+        cls.stream: list[tuple[int, int]] = [(int(rng.paretovariate(1.2)), rng.randint(1, 100)) for _ in range(20000)]
+        cls.totals: Counter[int] = Counter()
+
+        for key, count in cls.stream:
+            cls.totals[key] += count
+
+    def test_count_min_sketch(self) -> None:
+        """Test that no total is underestimated, and that most are overestimated by less than the bound"""
+
+        sketch = CountMinSketch(width=64, depth=4, rng=random.Random(1))
+
+        for key, count in self.stream:
+            sketch.add(key, count)
+
+        bound: float = 2.72 / 64 * sum(self.totals.values())
+        errors: list[int] = [sketch.estimate(key) - total for key, total in self.totals.items()]
+
+        self.assertTrue(all(error >= 0 for error in errors))
+        self.assertGreater(sum(error <= bound for error in errors), 0.9 * len(errors))
+
+    def test_space_saving(self) -> None:
+        """Test that the true total of every kept key is within its bounds, and that the largest keys are kept"""
+
+        summary = SpaceSaving(capacity=20)
+
+        for key, count in self.stream:
+            summary.add(key, count)
+
+        kept: dict[int, tuple[int, int]] = {key: (total, error) for key, total, error in summary.items()}
+
+        self.assertEqual(len(kept), 20)
+
+        for key, (total, error) in kept.items():
+            self.assertLessEqual(total - error, self.totals[key])
+            self.assertLessEqual(self.totals[key], total)
+
+        for key, _ in self.totals.most_common(3):
+            self.assertIn(key, kept)
+
+    def test_reservoir(self) -> None:
+        """Test that every item is kept while the stream is smaller than the reservoir, and the size after that"""
+
+        reservoir = Reservoir(size=100, rng=random.Random(2))
+        reservoir.add_batch(range(60), int)
+
+        self.assertEqual(reservoir.items, list(range(60)))
+
+        for start in range(60, 10000, 700):
+            reservoir.add_batch(range(start, min(start + 700, 10000)), int)
+
+        self.assertEqual(reservoir.seen, 10000)
+        self.assertEqual(len(reservoir.items), 100)
+        self.assertEqual(len(set(reservoir.items)), 100)
+
+    def test_reservoir_uniform(self) -> None:
+        """Test that each item is sampled about as often as any other"""
+
+        sampled: Counter[int] = Counter()
+
+        for seed in range(400):
+            reservoir = Reservoir(size=10, rng=random.Random(seed))
+            reservoir.add_batch(range(50), int)
+            sampled.update(reservoir.items)
+
+        # Each item is expected to be sampled 80 times
+        self.assertEqual(sorted(sampled), list(range(50)))
+        self.assertTrue(all(40 < count < 120 for count in sampled.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
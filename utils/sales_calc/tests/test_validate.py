@@ -0,0 +1,101 @@
+import unittest
+from decimal import Decimal
+from ...models import Product, Sale, SalesTable
+from ..validate import MAX_SAMPLE_ROWS, filter_invalid_sales, format_validation_report, validate_sales
+
+
+class TestValidateSales(unittest.TestCase):
+    """Test case for validate_sales and filter_invalid_sales"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up test case with a set of data where some sales refer to unknown teams or products"""
+
+        cls.team_map: dict[int, str] = {1: "Team A", 2: "Team B"}
+
+        cls.prod_master: dict[int, Product] = {
+            1: Product(name="Product A", unit_price=Decimal("35.5"), lot_size=10),
+            2: Product(name="Product B", unit_price=Decimal("45.21"), lot_size=1)
+        }
+
+        cls.sales_batches: list[list[Sale]] = [
+            [Sale(prod_id=1, team_id=2, lots_sold=5, discount=Decimal(0)),
+             Sale(prod_id=9, team_id=1, lots_sold=1, discount=Decimal(5))],
+            [Sale(prod_id=2, team_id=8, lots_sold=20, discount=Decimal(10)),
+             Sale(prod_id=9, team_id=8, lots_sold=10, discount=Decimal(100)),
+             Sale(prod_id=2, team_id=1, lots_sold=40, discount=Decimal(2))]
+        ]
+
+    def test_validate_sales(self) -> None:
+        """Test that every unknown id is counted with the row numbers of its sales"""
+
+        report = validate_sales(self.sales_batches, team_map=self.team_map, prod_master=self.prod_master)
+
+        self.assertEqual(report.rows, 5)
+        self.assertEqual(report.invalid_rows, 3)
+        self.assertEqual({prod_id: (data.count, data.sample_rows) for prod_id, data in report.unknown_prods.items()},
+                         {9: (2, [2, 4])})
+        self.assertEqual({team_id: (data.count, data.sample_rows) for team_id, data in report.unknown_teams.items()},
+                         {8: (2, [3, 4])})
+
+    def test_valid_sales(self) -> None:
+        """Test with no unknown ids"""
+
+        report = validate_sales([self.sales_batches[0][:1]], team_map=self.team_map, prod_master=self.prod_master)
+
+        self.assertEqual(report.invalid_rows, 0)
+        self.assertEqual(report.unknown_prods, {})
+        self.assertEqual(report.unknown_teams, {})
+
+    def test_sample_rows_limited(self) -> None:
+        """Test that only the first row numbers of an unknown id are kept"""
+
+        sales: list[Sale] = [Sale(prod_id=9, team_id=1, lots_sold=1, discount=Decimal(0))] * (MAX_SAMPLE_ROWS + 3)
+        report = validate_sales([sales], team_map=self.team_map, prod_master=self.prod_master)
+
+        self.assertEqual(report.unknown_prods[9].count, MAX_SAMPLE_ROWS + 3)
+        self.assertEqual(report.unknown_prods[9].sample_rows, list(range(1, MAX_SAMPLE_ROWS + 1)))
+
+    def test_filter_invalid_sales(self) -> None:
+        """Test that invalid sales are removed from each batch and quarantined with their row numbers"""
+
+        report = validate_sales([], team_map=self.team_map, prod_master=self.prod_master)
+        quarantine: list = []
+
+        batches: list = list(filter_invalid_sales(self.sales_batches, report,
+                                                  team_map=self.team_map,
+                                                  prod_master=self.prod_master,
+                                                  quarantine=quarantine.extend))
+
+        self.assertEqual(batches, [[self.sales_batches[0][0]], [self.sales_batches[1][2]]])
+        self.assertEqual([row[:3] for row in quarantine], [(2, 9, 1), (3, 2, 8), (4, 9, 8)])
+        self.assertEqual(report.invalid_rows, 3)
+
+    def test_filter_sales_table(self) -> None:
+        """Test that invalid sales are removed from a table of sales"""
+
+        report = validate_sales([], team_map=self.team_map, prod_master=self.prod_master)
+        table: SalesTable = SalesTable.from_sales(self.sales_batches[1])
+
+        filtered: SalesTable = next(filter_invalid_sales([table], report,
+                                                         team_map=self.team_map,
+                                                         prod_master=self.prod_master))
+
+        self.assertIsInstance(filtered, SalesTable)
+        self.assertEqual(list(filtered.prod_ids), [2])
+        self.assertEqual(list(filtered.team_ids), [1])
+        self.assertEqual(filtered[0].discount, Decimal(2))
+
+    def test_format_validation_report(self) -> None:
+        """Test that the report lists each unknown id"""
+
+        report = validate_sales(self.sales_batches, team_map=self.team_map, prod_master=self.prod_master)
+        formatted: str = format_validation_report(report)
+
+        self.assertIn("3 of 5 sales", formatted)
+        self.assertIn("Product ID 9: 2 sales, e.g. rows 2, 4", formatted)
+        self.assertIn("Team ID 8: 2 sales, e.g. rows 3, 4", formatted)
+
+
+if __name__ == "__main__":
+    unittest.main()
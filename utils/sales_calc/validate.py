@@ -0,0 +1,227 @@
+# Defines functions for checking that every sale refers to a team in the team map and a product in the product master.
+# Each batch of sales is checked with set membership of its distinct ids, so rows are only scanned one at a time
+# in the rare batches that have an unknown id. Every violation is collected into one report, instead of stopping at
+# the first unknown id as get_team and get_product do.
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from decimal import Decimal
+from itertools import compress
+from ..models import InvalidId, Product, Sale, SalesTable, ValidationReport
+
+# Number of row numbers kept for each unknown id
+MAX_SAMPLE_ROWS: int = 5
+
+# Number of unknown ids of each kind listed in a formatted report
+MAX_REPORTED_IDS: int = 10
+
+
+def get_batch_ids(batch: list[Sale] | SalesTable) -> tuple[Sequence[int], Sequence[int]]:
+    """
+        Gets the product id and team id columns of a batch of sales
+
+        :param batch: batch of sales (Sale), or table of sales (SalesTable)
+
+        :returns: tuple of product ids and team ids, in the order of the sales
+    """
+
+    if isinstance(batch, SalesTable):
+        return batch.prod_ids, batch.team_ids
+
+    return [sale.prod_id for sale in batch], [sale.team_id for sale in batch]
+
+
+def record_invalid_id(invalid_ids: dict[int, InvalidId], id_: int, row_num: int) -> None:
+    """
+        Counts a sale with an unknown id, keeping the row numbers of the first sales with the id
+
+        :param invalid_ids: dict with key = unknown id (int), value = InvalidId
+        :param id_: unknown team or product id (int)
+        :param row_num: row number of the sale in the sales file (int)
+    """
+
+    invalid_id: InvalidId | None = invalid_ids.get(id_)
+
+    if invalid_id is None:
+        invalid_ids[id_] = InvalidId(count=1, sample_rows=[row_num])
+
+    else:
+        invalid_id.count += 1
+
+        if len(invalid_id.sample_rows) < MAX_SAMPLE_ROWS:
+            invalid_id.sample_rows.append(row_num)
+
+
+def check_batch(report: ValidationReport,
+                batch: list[Sale] | SalesTable,
+                *,
+                team_map: Mapping[int, str],
+                prod_master: Mapping[int, Product]
+                ) -> list[int]:
+    """
+        Checks the team and product ids of a batch of sales, adding any violations to a report.
+        Rows are numbered from 1 in the order that batches are checked.
+
+        :param report: report of the sales checked so far (ValidationReport)
+        :param batch: batch of sales (Sale), or table of sales (SalesTable)
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+
+        :returns: indexes in the batch of the sales with an unknown team id or product id (list[int])
+    """
+
+    prod_ids, team_ids = get_batch_ids(batch)
+    first_row: int = report.rows + 1
+    report.rows += len(prod_ids)
+
+    # Only the distinct ids of the batch are looked up
+    unknown_prods: set[int] = {prod_id for prod_id in set(prod_ids) if prod_id not in prod_master}
+    unknown_teams: set[int] = {team_id for team_id in set(team_ids) if team_id not in team_map}
+
+    if not unknown_prods and not unknown_teams:
+        return []
+
+    invalid_rows: list[int] = []
+
+    for index, (prod_id, team_id) in enumerate(zip(prod_ids, team_ids)):
+        if prod_id in unknown_prods:
+            record_invalid_id(report.unknown_prods, prod_id, first_row + index)
+
+        if team_id in unknown_teams:
+            record_invalid_id(report.unknown_teams, team_id, first_row + index)
+
+        if prod_id in unknown_prods or team_id in unknown_teams:
+            invalid_rows.append(index)
+
+    report.invalid_rows += len(invalid_rows)
+
+    return invalid_rows
+
+
+def validate_sales(sales_batches: Iterable[list[Sale] | SalesTable],
+                   *,
+                   team_map: Mapping[int, str],
+                   prod_master: Mapping[int, Product]
+                   ) -> ValidationReport:
+    """
+        Checks the team and product ids of every sale before any sales are aggregated
+
+        :param sales_batches: iterable of batches of sales (Sale), or of tables of sales (SalesTable)
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+
+        :returns: report of every sale with an unknown team id or product id (ValidationReport)
+    """
+
+    report = ValidationReport()
+
+    for batch in sales_batches:
+        check_batch(report, batch, team_map=team_map, prod_master=prod_master)
+
+    return report
+
+
+def drop_rows(batch: list[Sale] | SalesTable, rows: list[int]) -> list[Sale] | SalesTable:
+    """
+        Removes sales from a batch
+
+        :param batch: batch of sales (Sale), or table of sales (SalesTable)
+        :param rows: indexes in the batch of the sales to remove (list[int])
+
+        :returns: batch without the removed sales, of the same kind as the batch given
+    """
+
+    removed: set[int] = set(rows)
+    keep: list[bool] = [index not in removed for index in range(len(batch))]
+
+    if isinstance(batch, SalesTable):
+        return SalesTable.from_columns({name: array(column.typecode, compress(column, keep))
+                                        for name, column in batch.columns().items()})
+
+    return list(compress(batch, keep))
+
+
+def filter_invalid_sales(sales_batches: Iterable[list[Sale] | SalesTable],
+                         report: ValidationReport,
+                         *,
+                         team_map: Mapping[int, str],
+                         prod_master: Mapping[int, Product],
+                         quarantine: Callable[[list[tuple[int, int, int, int, Decimal]]], None] | None = None
+                         ) -> Iterator[list[Sale] | SalesTable]:
+    """
+        Checks each batch of sales as it is streamed, and removes the sales with an unknown team id or product id
+        before the batch is aggregated. Violations are added to the report.
+
+        :param sales_batches: iterable of batches of sales (Sale), or of tables of sales (SalesTable)
+        :param report: report to add violations to (ValidationReport)
+        :param team_map: dict with key = team id (int), value = team name (str)
+        :param prod_master: dict with key = product id (int), value = Product
+        :param quarantine: optional function called with the sales removed from each batch, as a list of
+            (row number, product id, team id, lots sold, discount), e.g. QuarantineWriter.write_rows
+
+        :returns: iterator of batches of valid sales
+    """
+
+    for batch in sales_batches:
+        first_row: int = report.rows + 1
+        invalid_rows: list[int] = check_batch(report, batch, team_map=team_map, prod_master=prod_master)
+
+        if not invalid_rows:
+            yield batch
+            continue
+
+        if quarantine is not None:
+            removed: list[tuple[int, int, int, int, Decimal]] = []
+
+            for index in invalid_rows:
+                sale: Sale = batch[index]
+                removed.append((first_row + index, sale.prod_id, sale.team_id, sale.lots_sold, sale.discount))
+
+            quarantine(removed)
+
+        yield drop_rows(batch, invalid_rows)
+
+
+def format_invalid_ids(kind: str, invalid_ids: dict[int, InvalidId]) -> list[str]:
+    """
+        Formats the unknown ids of one kind, most frequent first
+
+        :param kind: kind of id, e.g. "Product" (str)
+        :param invalid_ids: dict with key = unknown id (int), value = InvalidId
+
+        :returns: lines of the report (list[str])
+    """
+
+    ranked_ids: list[tuple[int, InvalidId]] = sorted(invalid_ids.items(), key=lambda item: item[1].count, reverse=True)
+
+    lines: list[str] = [
+        f"  {kind} ID {id_}: {invalid_id.count:,} sales, e.g. rows {', '.join(map(str, invalid_id.sample_rows))}"
+        for id_, invalid_id in ranked_ids[:MAX_REPORTED_IDS]
+    ]
+
+    if len(ranked_ids) > MAX_REPORTED_IDS:
+        lines.append(f"  ... and {len(ranked_ids) - MAX_REPORTED_IDS:,} more {kind.lower()} IDs")
+
+    return lines
+
+
+def format_validation_report(report: ValidationReport) -> str:
+    """
+        Formats a validation report to print
+
+        :param report: report of the sales checked (ValidationReport)
+
+        :returns: formatted report (str)
+    """
+
+    lines: list[str] = [f"{report.invalid_rows:,} of {report.rows:,} sales refer to an unknown team or product."]
+
+    if report.unknown_prods:
+        lines.append(f"{len(report.unknown_prods):,} product IDs not found in product master:")
+        lines += format_invalid_ids("Product", report.unknown_prods)
+
+    if report.unknown_teams:
+        lines.append(f"{len(report.unknown_teams):,} team IDs not found in team map:")
+        lines += format_invalid_ids("Team", report.unknown_teams)
+
+    return "\n".join(lines)
@@ -0,0 +1,2 @@
+from .caches import ReferenceTables, ResultCache
+from .server import ReportService, make_server
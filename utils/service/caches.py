@@ -0,0 +1,160 @@
+# Defines the caches kept in memory by the report service.
+# The team map and product master are kept loaded and only read again when one of their files changes on disk.
+# Recent results are kept in a least recently used cache that is limited by the estimated size of its results
+# rather than by their number, since the reports of a sales file can have a few rows or many thousands.
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping
+from decimal import Decimal
+from ..file_IO.config import DEFAULT_PROD_MASTER_FILE, DEFAULT_TEAM_MAP_FILE, SOURCE_FOLDER
+from ..file_IO.read import read_prod_master, read_team_map
+from ..models import Product, ProductSaleData
+
+
+def get_file_stamp(file_name: str) -> tuple[int, int] | None:
+    """
+        Gets the modification time and size of an input file, which change when the file is written
+
+        :param file_name: name of source file (str)
+
+        :returns: tuple of modification time in nanoseconds and size in bytes, or None if the file does not exist
+    """
+
+    try:
+        stat: os.stat_result = os.stat(f"{SOURCE_FOLDER}\\{file_name}")
+
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ReferenceTables:
+    """Team map and product master kept in memory, and read again only when one of their files changes"""
+
+    def __init__(self, team_map_fn: str | None = None, prod_master_fn: str | None = None, use_cache: bool = True):
+        self.team_map_fn: str = team_map_fn if team_map_fn is not None else DEFAULT_TEAM_MAP_FILE
+        self.prod_master_fn: str = prod_master_fn if prod_master_fn is not None else DEFAULT_PROD_MASTER_FILE
+        self.use_cache: bool = use_cache
+
+        self.team_map: dict[int, str] = {}
+        self.prod_master: Mapping[int, Product] = {}
+        self.stamps: tuple | None = None  # stamps of both files when they were last read
+        self.version: int = 0  # number of times the files have been read
+        self.lock = threading.Lock()
+
+    def get(self) -> tuple[dict[int, str], Mapping[int, Product], int]:
+        """
+            Gets the team map and product master, reading them again if either file has changed since they were read
+
+            :returns: tuple of team map, product master, and the version of the tables (int), which changes each
+                time they are read
+        """
+
+        with self.lock:
+            stamps: tuple = (get_file_stamp(self.team_map_fn), get_file_stamp(self.prod_master_fn))
+
+            if stamps != self.stamps:
+                # The stamps are only kept once both files are read, so a failed read is tried again next time
+                self.team_map = read_team_map(self.team_map_fn, self.use_cache)
+                self.prod_master = read_prod_master(self.prod_master_fn, self.use_cache)
+                self.stamps = stamps
+                self.version += 1
+
+            return self.team_map, self.prod_master, self.version
+
+
+def estimate_rpt_size(team_rpt: dict[str, Decimal], prod_rpt: dict[str, ProductSaleData]) -> int:
+    """
+        Estimates the memory used by a team report and product report
+
+        :param team_rpt: dict with key = team name (str) value = gross revenue (Decimal)
+        :param prod_rpt: dict with key = product name (str) value = ProductSaleData
+
+        :returns: estimated size in bytes (int)
+    """
+
+    size: int = sys.getsizeof(team_rpt) + sys.getsizeof(prod_rpt)
+    size += sum(sys.getsizeof(team) + sys.getsizeof(revenue) for team, revenue in team_rpt.items())
+    size += sum(sys.getsizeof(name) + sys.getsizeof(data) + sys.getsizeof(data.gross_rev)
+                + sys.getsizeof(data.units_sold) + sys.getsizeof(data.disc_cost)
+                for name, data in prod_rpt.items())
+
+    return size
+
+
+class ResultCache:
+    """Least recently used cache of results, evicted once the total estimated size of the results exceeds a limit"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes: int = max_bytes
+        self.entries: OrderedDict[Hashable, tuple[object, int]] = OrderedDict()  # value = (result, size)
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> object | None:
+        """
+            Gets a result, marking it as the most recently used
+
+            :param key: key of the result
+
+            :returns: result, or None if it is not cached
+        """
+
+        with self.lock:
+            entry: tuple[object, int] | None = self.entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[0]
+
+    def put(self, key: Hashable, result: object, size: int) -> None:
+        """
+            Adds a result, evicting the least recently used results until the cache fits in its limit.
+            A result larger than the limit is not cached.
+
+            :param key: key of the result
+            :param result: result to cache
+            :param size: estimated size of the result in bytes (int)
+        """
+
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+
+            if size > self.max_bytes:
+                return
+
+            self.entries[key] = (result, size)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        """
+            Gets the counters of the cache
+
+            :returns: dict with key = name of counter (str), value = count (int)
+        """
+
+        with self.lock:
+            return {"entries": len(self.entries),
+                    "bytes": self.size,
+                    "max_bytes": self.max_bytes,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions}
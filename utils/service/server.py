@@ -0,0 +1,270 @@
+# Defines a resident report service that answers report requests over local HTTP or a Unix socket.
+# The service stays running, so each request is answered without importing the package, parsing arguments, or
+# reading the team map and product master again. Results are cached by the sales file and the version of the
+# reference tables, so a request for a sales file that has not changed is answered without reading it.
+
+import contextlib
+import io
+import json
+import os
+import socketserver
+import stat
+import threading
+import time
+from collections.abc import Callable
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain
+from urllib.parse import parse_qs, urlsplit
+from .caches import ReferenceTables, ResultCache, estimate_rpt_size, get_file_stamp
+from ..file_IO.config import DEFAULT_SALES_FILE
+from ..file_IO.read import stream_sales
+from ..file_IO.write import rank_rpt_items, write_prod_rpt, write_team_rpt
+from ..models import ProductSaleData
+from ..sales_calc import calc_sales_rpt, calc_sales_rpt_columnar, calc_sales_rpt_fixed
+
+# Functions used to calculate the reports with each engine
+ENGINES: dict[str, Callable] = {
+    "decimal": calc_sales_rpt,
+    "columnar": calc_sales_rpt_columnar,
+    "fixed": calc_sales_rpt_fixed
+}
+
+
+# Request parameters that name a file in the input or output folder
+FILE_PARAMS: tuple[str, ...] = ("sales", "team-report", "product-report")
+
+
+def is_plain_file_name(file_name: str) -> bool:
+    """
+        Checks if a file name names a file directly inside a folder, without a path
+
+        :param file_name: name of the file (str)
+
+        :returns: bool
+    """
+
+    return file_name != "" and "/" not in file_name and "\\" not in file_name and ".." not in file_name
+
+
+class ReportService:
+    """Calculates reports with reference tables and recent results kept in memory between requests"""
+
+    def __init__(self, reference_tables: ReferenceTables, result_cache: ResultCache, use_cache: bool = True):
+        self.reference_tables: ReferenceTables = reference_tables
+        self.result_cache: ResultCache = result_cache
+        self.use_cache: bool = use_cache
+        self.requests: int = 0
+
+        # Requests are answered on their own threads, so the request counter is updated under a lock
+        self.requests_lock = threading.Lock()
+
+        # Reports are calculated one at a time, as the calculation holds the GIL and messages are captured
+        # by redirecting stdout
+        self.calc_lock = threading.Lock()
+
+    def calc_reports(self, sales_fn: str, engine: str) -> tuple[dict[str, Decimal], dict[str, ProductSaleData], bool]:
+        """
+            Gets the team report and product report of a sales file, from the cache if the sales file
+            and reference tables have not changed since they were calculated
+
+            :param sales_fn: name of the sales file (str)
+            :param engine: name of the engine used to calculate the reports (str)
+
+            :returns: tuple of team report, product report, and bool indicating if the reports were cached
+        """
+
+        team_map, prod_master, version = self.reference_tables.get()
+
+        sales_stamp: tuple[int, int] | None = get_file_stamp(sales_fn)
+        key: tuple = (sales_fn, sales_stamp, version, engine)
+
+        cached: tuple | None = self.result_cache.get(key) if sales_stamp is not None else None
+
+        if cached is not None:
+            return *cached, True
+
+        team_rpt, prod_rpt = ENGINES[engine](team_map=team_map,
+                                             prod_master=prod_master,
+                                             sales_data=chain.from_iterable(stream_sales(sales_fn,
+                                                                                         use_cache=self.use_cache)),
+                                             hide_exc=True)
+
+        if sales_stamp is not None:
+            self.result_cache.put(key, (team_rpt, prod_rpt), estimate_rpt_size(team_rpt, prod_rpt))
+
+        return team_rpt, prod_rpt, False
+
+    def handle_report(self, params: dict[str, str]) -> tuple[int, dict]:
+        """
+            Answers a report request. The reports are written to output files if their names are given,
+            and are always returned ordered from highest to lowest revenue.
+
+            :param params: dict with key = name of request parameter (str), value = value (str).
+                Parameters are sales, team-report, product-report, top, and engine, as for report.py.
+
+            :returns: tuple of HTTP status (int) and response body (dict)
+        """
+
+        start: float = time.perf_counter()
+
+        with self.requests_lock:
+            self.requests += 1
+
+        sales_fn: str = params.get("sales", DEFAULT_SALES_FILE)
+        engine: str = params.get("engine", "decimal")
+
+        if engine not in ENGINES:
+            return 400, {"error": f"Engine must be one of {', '.join(ENGINES)}"}
+
+        # Requests can come from any local client, so files are only read and written inside their folders
+        for param in FILE_PARAMS:
+            if param in params and not is_plain_file_name(params[param]):
+                return 400, {"error": f"{param} must be a file name without a path or '..'"}
+
+        try:
+            top: int | None = int(params["top"]) if "top" in params else None
+
+        except ValueError:
+            return 400, {"error": "top must be a whole number"}
+
+        if top is not None and top < 1:
+            return 400, {"error": "top must be at least 1"}
+
+        output = io.StringIO()
+
+        with self.calc_lock, contextlib.redirect_stdout(output):
+            try:
+                team_rpt, prod_rpt, cached = self.calc_reports(sales_fn, engine)
+
+                success = True
+
+                if "team-report" in params:
+                    success = write_team_rpt(params["team-report"], team_rpt, top) and success
+
+                if "product-report" in params:
+                    success = write_prod_rpt(params["product-report"], prod_rpt, top) and success
+
+            except SystemExit:
+                # Readers exit after printing the reason a file is invalid
+                return 400, {"error": output.getvalue().strip()}
+
+            except Exception as exc:
+                # The request fails with an error instead of dropping the connection
+                return 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+        if not success:
+            return 500, {"error": output.getvalue().strip()}
+
+        # Amounts are rounded to the cent as in the report files
+        return 200, {
+            "sales": sales_fn,
+            "cached": cached,
+            "seconds": round(time.perf_counter() - start, 6),
+            "team_report": [[team, str(round(revenue, 2))]
+                            for team, revenue in rank_rpt_items(team_rpt.items(), lambda item: item[1], top)],
+            "product_report": [[name, str(round(data.gross_rev, 2)), data.units_sold, str(round(data.disc_cost, 2))]
+                               for name, data in rank_rpt_items(prod_rpt.items(),
+                                                                lambda item: item[1].gross_rev,
+                                                                top)]
+        }
+
+    def stats(self) -> dict:
+        """
+            Gets the counters of the service
+
+            :returns: dict of the number of requests, the version of the reference tables, and the result cache
+                counters
+        """
+
+        with self.requests_lock:
+            requests: int = self.requests
+
+        return {"requests": requests,
+                "reference_version": self.reference_tables.version,
+                "result_cache": self.result_cache.stats()}
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """Handles GET /report and GET /stats requests, answering with JSON"""
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params: dict[str, str] = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        service: ReportService = self.server.service
+
+        if url.path == "/report":
+            status, body = service.handle_report(params)
+
+        elif url.path == "/stats":
+            status, body = 200, service.stats()
+
+        else:
+            status, body = 404, {"error": f"Unknown path {url.path}. Use /report or /stats"}
+
+        data: bytes = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Clients of a Unix socket have no address
+        return str(self.client_address[0]) if self.client_address else "unix socket"
+
+
+class ReportHTTPServer(ThreadingHTTPServer):
+    """HTTP server of a report service"""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: ReportService):
+        super().__init__(address, ReportRequestHandler)
+        self.service: ReportService = service
+
+
+# Unix sockets are not available on every platform, e.g. Windows
+UNIX_SOCKETS: bool = hasattr(socketserver, "ThreadingUnixStreamServer")
+
+if UNIX_SOCKETS:
+    class ReportUnixServer(socketserver.ThreadingUnixStreamServer):
+        """HTTP over Unix socket server of a report service"""
+
+        daemon_threads = True
+
+        def __init__(self, socket_path: str, service: ReportService):
+            with contextlib.suppress(FileNotFoundError):
+                # Remove the socket left by a previous run
+                if stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                    os.unlink(socket_path)
+
+            super().__init__(socket_path, ReportRequestHandler)
+            self.service: ReportService = service
+
+
+def make_server(service: ReportService,
+                host: str,
+                port: int,
+                socket_path: str | None = None
+                ) -> socketserver.BaseServer:
+    """
+        Creates a server for a report service, listening on a Unix socket if a path is given or on host and port
+
+        :param service: service that answers the requests (ReportService)
+        :param host: host to listen on (str)
+        :param port: port to listen on (int)
+        :param socket_path: optional path of a Unix socket to listen on instead (str or None)
+
+        :returns: server, started with serve_forever
+    """
+
+    if socket_path is not None:
+        if not UNIX_SOCKETS:
+            print("Error: Unix sockets are not supported on this platform. Use --host and --port instead.\n")
+            exit()
+
+        return ReportUnixServer(socket_path, service)
+
+    return ReportHTTPServer((host, port), service)
@@ -0,0 +1,148 @@
+import os
+import threading
+import unittest
+from unittest import mock
+from ..caches import ReferenceTables, ResultCache
+from ..server import ReportService
+from ...file_IO.config import DESTINATION_FOLDER
+from ...file_IO.tests.temp_folder import TempFolderTestCase
+
+
+class TestResultCache(unittest.TestCase):
+    """Test case for ResultCache"""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the least recently used results are evicted once the cache is over its size"""
+
+        cache = ResultCache(max_bytes=100)
+
+        cache.put("a", 1, 40)
+        cache.put("b", 2, 40)
+        self.assertEqual(cache.get("a"), 1)
+
+        cache.put("c", 3, 40)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["bytes"], 80)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_result_larger_than_cache(self) -> None:
+        """Test that a result larger than the cache is not cached"""
+
+        cache = ResultCache(max_bytes=100)
+        cache.put("a", 1, 101)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+
+class TestReportService(TempFolderTestCase):
+    """Test case for ReportService and ReferenceTables"""
+
+    def setUp(self) -> None:
+        """Set up a temporary working folder with the input files"""
+
+        super().setUp()
+
+        self.write_infile("TeamMap.csv", "TeamId,Name\n1,Team A\n2,Team B\n")
+        self.write_infile("ProductMaster.csv", "1,Product A,2.50,10\n2,Product B,100,1\n")
+        self.write_infile("Sales.csv", "1,1,1,2,0\n2,2,2,1,10\n")
+
+        self.service = ReportService(ReferenceTables(), ResultCache(max_bytes=1 << 20), use_cache=False)
+
+    def test_report(self) -> None:
+        """Test that a report is calculated, written, and then served from the cache"""
+
+        status, body = self.service.handle_report({"sales": "Sales.csv", "team-report": "Team.csv"})
+
+        self.assertEqual(status, 200)
+        self.assertFalse(body["cached"])
+        self.assertEqual(body["team_report"], [["Team B", "100.00"], ["Team A", "50.00"]])
+        self.assertEqual(body["product_report"], [["Product B", "100.00", 1, "10.00"],
+                                                  ["Product A", "50.00", 20, "0.00"]])
+
+        with open(f"{DESTINATION_FOLDER}\\Team.csv") as outfile:
+            self.assertEqual(outfile.read().splitlines(), ["Team,GrossRevenue", "Team B,100.00", "Team A,50.00"])
+
+        status, body = self.service.handle_report({"sales": "Sales.csv", "top": "1"})
+
+        self.assertEqual(status, 200)
+        self.assertTrue(body["cached"])
+        self.assertEqual(body["team_report"], [["Team B", "100.00"]])
+
+    def test_reloads_changed_files(self) -> None:
+        """Test that a changed reference file or sales file is read again"""
+
+        self.service.handle_report({"sales": "Sales.csv"})
+        self.write_infile("TeamMap.csv", "TeamId,Name\n1,Team A\n2,Team C\n")
+
+        status, body = self.service.handle_report({"sales": "Sales.csv"})
+
+        self.assertFalse(body["cached"])
+        self.assertEqual(body["team_report"], [["Team C", "100.00"], ["Team A", "50.00"]])
+        self.assertEqual(self.service.reference_tables.version, 2)
+
+        self.write_infile("Sales.csv", "1,1,1,2,0\n")
+        status, body = self.service.handle_report({"sales": "Sales.csv"})
+
+        self.assertFalse(body["cached"])
+        self.assertEqual(body["team_report"], [["Team A", "50.00"]])
+        self.assertEqual(self.service.reference_tables.version, 2)
+
+    def test_invalid_requests(self) -> None:
+        """Test that an invalid request or sales file is answered with an error instead of exiting"""
+
+        status, body = self.service.handle_report({"sales": "Missing.csv"})
+
+        self.assertEqual(status, 400)
+        self.assertIn("Input file not found", body["error"])
+
+        self.assertEqual(self.service.handle_report({"engine": "float"})[0], 400)
+        self.assertEqual(self.service.handle_report({"top": "ten"})[0], 400)
+        self.assertEqual(self.service.handle_report({"top": "0"})[0], 400)
+
+    def test_file_names_with_paths(self) -> None:
+        """Test that files outside the input and output folders are not read or written"""
+
+        for params in ({"sales": "Sales.csv", "team-report": "..\\Team.csv"},
+                       {"sales": "Sales.csv", "product-report": "../Product.csv"},
+                       {"sales": "Sales.csv", "team-report": "Reports\\Team.csv"},
+                       {"sales": "..\\Input Files\\Sales.csv"}):
+            status, body = self.service.handle_report(params)
+
+            self.assertEqual(status, 400)
+            self.assertIn("without a path", body["error"])
+
+        self.assertFalse(os.path.exists("../Product.csv"))
+        self.assertEqual([name for name in os.listdir(".") + os.listdir(DESTINATION_FOLDER) if "Team.csv" in name], [])
+
+    def test_unexpected_error(self) -> None:
+        """Test that an unexpected error is answered with an error instead of dropping the request"""
+
+        with mock.patch.object(self.service, "calc_reports", side_effect=RuntimeError("Disk on fire")):
+            status, body = self.service.handle_report({"sales": "Sales.csv"})
+
+        self.assertEqual((status, body), (500, {"error": "RuntimeError: Disk on fire"}))
+
+    def test_requests_counted_across_threads(self) -> None:
+        """Test that every request is counted when requests are answered on several threads at once"""
+
+        def send_requests() -> None:
+            for _ in range(500):
+                self.service.handle_report({"engine": "float"})
+
+        threads: list[threading.Thread] = [threading.Thread(target=send_requests) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.service.stats()["requests"], 4_000)
+
+
+if __name__ == "__main__":
+    unittest.main()